@@ -39,6 +39,7 @@ from .jar_utils import (
 )
 from .tree_sitter_utils import (
     extract_ast_mappings,
+    extract_jar_mappings,
     extract_strings_from_file,
     get_parser,
     initialize_languages,
@@ -48,6 +49,8 @@ from .yaml_utils import (
     save_yaml_mappings,
     generate_initial_yaml_mappings,
     apply_yaml_mapping,
+    write_yaml_mapping,
+    MappingRuleIndex,
     create_yaml_mapping_from_directory,
     update_yaml_mapping,
     YAMLMappingValidator,
@@ -62,6 +65,7 @@ from .yaml_utils import (
     generate_translation_rules,
     generate_incremental_rules,
     update_translation_rules,
+    merge_translation_rules,
     generate_translation_report,
 )
 # 临时禁用以下模块，优先完成核心功能开发
@@ -70,8 +74,11 @@ from .yaml_utils import (
 #     get_fuzzy_suggestions,
 #     get_contextual_suggestions,
 #     get_combined_suggestions,
+#     get_ranked_suggestions,
 #     find_best_match,
 #     LevenshteinDistance,
+#     FuzzyMatchIndex,
+#     ContextSignatureIndex,
 # )
 # from .suggestion_generator import SuggestionGenerator, generate_suggestions_for_yaml_file, create_localization_db_from_directory
 # from .tools_integrator import ToolsIntegrator
@@ -127,6 +134,7 @@ __all__ = [
     "get_decompiler_path",
     "tree_sitter_utils",
     "extract_ast_mappings",
+    "extract_jar_mappings",
     "extract_strings_from_file",
     "get_parser",
     "initialize_languages",
@@ -135,6 +143,8 @@ __all__ = [
     "save_yaml_mappings",
     "generate_initial_yaml_mappings",
     "apply_yaml_mapping",
+    "write_yaml_mapping",
+    "MappingRuleIndex",
     "create_yaml_mapping_from_directory",
     "update_yaml_mapping",
     "YAMLMappingValidator",
@@ -149,6 +159,7 @@ __all__ = [
     "generate_translation_rules",
     "generate_incremental_rules",
     "update_translation_rules",
+    "merge_translation_rules",
     "generate_translation_report",
     "logger_utils",
     "setup_logger",
@@ -3,89 +3,264 @@
 缓存管理工具模块
 
 该模块提供了文件哈希计算、缓存数据管理和增量更新支持功能，用于优化ModLocale的性能。
+缓存数据保存在SQLite数据库中，支持批量延迟写入。
 """
 
 import os
 import hashlib
 import json
-from typing import Dict, Any, Optional
+import sqlite3
+import zlib
+from typing import Dict, Any, List, Optional, Set, Tuple
 from datetime import datetime
 
+# xxhash为可选依赖，不可用时使用标准库中的blake2b
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    xxhash = None
+    XXHASH_AVAILABLE = False
+
+# 文件内容哈希算法
+HASH_ALGORITHM = "xxh3_128" if XXHASH_AVAILABLE else "blake2b"
+
+# 旧版缓存(没有hash_algorithm字段的记录)使用的哈希算法
+LEGACY_HASH_ALGORITHM = "sha256"
+
+# 由update_file_cache写入的字段，迁移旧版记录时不作为额外元数据保留
+_CACHE_ENTRY_FIELDS = ("hash", "hash_algorithm", "last_modified", "size", "mtime_ns", "inode", "timestamp")
+
+
+def _new_hasher() -> Any:
+    """
+    创建文件内容哈希对象
+    """
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=32)
+
+
+def hash_file(file_path: str) -> str:
+    """
+    计算文件的内容哈希值(xxh3_128，xxhash不可用时为blake2b)
+    
+    Args:
+        file_path: 文件路径
+    
+    Returns:
+        str: 十六进制哈希值
+    
+    Raises:
+        OSError: 文件不存在或无法读取
+    """
+    with open(file_path, "rb") as f:
+        hasher = _new_hasher()
+        while chunk := f.read(1024 * 1024):
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+
+def _stat_signature(stat: os.stat_result) -> Tuple[int, int, int]:
+    """
+    获取用于快速变更检测的文件状态签名(size, mtime_ns, inode)
+    """
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
 
 class FileCacheManager:
     """
     文件缓存管理器，用于跟踪文件变更和管理缓存数据
+
+    缓存保存在SQLite数据库中。默认每次修改后立即写入；作为上下文管理器使用时，
+    修改会在内存中累积，退出时（或调用flush()时）在单个事务中一次性写入。
+
+    变更检测优先比较(size, mtime_ns, inode)，状态一致时不读取文件内容；
+    仅在状态不一致或启用verify时计算内容哈希。
     """
     
-    def __init__(self, cache_dir: str = ".cache"):
+    def __init__(self, cache_dir: str = ".cache", deferred: bool = False, verify: bool = False):
         """
         初始化缓存管理器
         
         Args:
             cache_dir: 缓存目录路径
+            deferred: 是否延迟写入，启用后需要调用flush()保存变更
+            verify: 是否始终通过内容哈希校验文件，忽略文件状态快速路径
         """
         self.cache_dir = cache_dir
-        self.cache_file = os.path.join(cache_dir, "file_cache.json")
+        self.verify = verify
+        self.hash_algorithm = HASH_ALGORITHM
+        self.cache_file = os.path.join(cache_dir, "file_cache.db")
+        # 旧版本使用的JSON缓存文件，首次加载时迁移到数据库
+        self.legacy_cache_file = os.path.join(cache_dir, "file_cache.json")
         self.cache_data: Dict[str, Any] = {
-            "version": "1.0",
+            "version": "2.0",
             "last_updated": datetime.now().isoformat(),
             "files": {}
         }
         
+        # 待写入的变更
+        self._dirty_files: Set[str] = set()
+        self._removed_files: Set[str] = set()
+        self._cleared = False
+        # 是否延迟写入，作为上下文管理器使用时同样启用
+        self._deferred = deferred
+        # 变更检测时计算出的哈希值，避免update_file_cache再次读取文件
+        self._hash_memo: Dict[str, Tuple[int, int, str]] = {}
+        
         # 确保缓存目录存在
         os.makedirs(cache_dir, exist_ok=True)
         
         # 加载现有缓存数据
         self._load_cache()
     
+    def __enter__(self) -> "FileCacheManager":
+        self._deferred = True
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.flush()
+    
     def _load_cache(self) -> None:
         """
         加载现有缓存数据
         """
         if os.path.exists(self.cache_file):
             try:
-                with open(self.cache_file, "r", encoding="utf-8") as f:
-                    self.cache_data = json.load(f)
-                    # 确保缓存结构完整
-                    if "files" not in self.cache_data:
-                        self.cache_data["files"] = {}
+                conn = sqlite3.connect(self.cache_file)
+                try:
+                    for key, value in conn.execute("SELECT key, value FROM meta"):
+                        self.cache_data[key] = value
+                    for file_key, entry in conn.execute("SELECT path, entry FROM files"):
+                        self.cache_data["files"][file_key] = json.loads(entry)
+                finally:
+                    conn.close()
+            except (sqlite3.Error, ValueError) as e:
+                print(f"[WARN] 加载缓存失败: {e}，将使用新缓存")
+                self.cache_data["files"] = {}
+        elif os.path.exists(self.legacy_cache_file):
+            try:
+                with open(self.legacy_cache_file, "r", encoding="utf-8") as f:
+                    legacy_data = json.load(f)
+                self.cache_data["files"] = legacy_data.get("files", {})
+                # 下次写入时将旧缓存全部迁移到数据库
+                self._dirty_files.update(self.cache_data["files"])
             except (json.JSONDecodeError, IOError) as e:
                 print(f"[WARN] 加载缓存失败: {e}，将使用新缓存")
     
     def _save_cache(self) -> None:
         """
-        保存缓存数据到文件
+        在单个事务中将待写入的变更保存到数据库
         """
         self.cache_data["last_updated"] = datetime.now().isoformat()
+        files = self.cache_data["files"]
         try:
-            with open(self.cache_file, "w", encoding="utf-8") as f:
-                json.dump(self.cache_data, f, ensure_ascii=False, indent=2)
-        except IOError as e:
+            conn = sqlite3.connect(self.cache_file)
+            try:
+                with conn:
+                    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+                    conn.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, entry TEXT NOT NULL)")
+                    if self._cleared:
+                        conn.execute("DELETE FROM files")
+                    conn.executemany(
+                        "DELETE FROM files WHERE path = ?",
+                        [(file_key,) for file_key in self._removed_files]
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?)",
+                        [
+                            (file_key, json.dumps(files[file_key], ensure_ascii=False, separators=(",", ":")))
+                            for file_key in self._dirty_files if file_key in files
+                        ]
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                        [("version", self.cache_data["version"]), ("last_updated", self.cache_data["last_updated"])]
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
             print(f"[WARN] 保存缓存失败: {e}")
+            return
+        
+        self._dirty_files.clear()
+        self._removed_files.clear()
+        self._cleared = False
+    
+    def _mark_changed(self) -> None:
+        """
+        记录缓存已修改，非延迟模式下立即写入
+        """
+        if not self._deferred:
+            self._save_cache()
+    
+    def flush(self) -> None:
+        """
+        将累积的缓存变更写入磁盘，没有变更时不执行写入
+        """
+        if self._dirty_files or self._removed_files or self._cleared:
+            self._save_cache()
     
     def calculate_file_hash(self, file_path: str) -> Optional[str]:
         """
-        计算文件的SHA-256哈希值
+        计算文件的内容哈希值(xxh3_128，xxhash不可用时为blake2b)
         
         Args:
             file_path: 文件路径
         
         Returns:
-            Optional[str]: 文件的SHA-256哈希值，如果文件不存在或无法读取则返回None
+            Optional[str]: 文件的哈希值，如果文件不存在或无法读取则返回None
         """
         if not os.path.exists(file_path):
             return None
         
         try:
-            with open(file_path, "rb") as f:
-                hasher = hashlib.sha256()
-                while chunk := f.read(4096):
-                    hasher.update(chunk)
-                return hasher.hexdigest()
+            return hash_file(file_path)
         except IOError as e:
             print(f"[WARN] 计算文件哈希失败: {file_path} - {e}")
             return None
     
+    def _get_memoized_hash(self, file_path: str) -> Optional[str]:
+        """
+        获取变更检测时计算的哈希值，文件在此之后被修改则返回None
+        """
+        file_key = os.path.abspath(file_path)
+        memo = self._hash_memo.get(file_key)
+        if memo is None:
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != memo[:2]:
+            return None
+        return memo[2]
+    
+    def _check_legacy_entry(self, file_path: str, cached: Dict[str, Any]) -> bool:
+        """
+        用SHA-256校验旧版缓存记录，内容未变时按当前哈希算法重写记录，之后走快速路径
+        
+        Args:
+            file_path: 文件路径
+            cached: 旧版缓存记录
+        
+        Returns:
+            bool: True表示文件已变更，False表示文件未变更
+        """
+        hasher = hashlib.new(LEGACY_HASH_ALGORITHM)
+        try:
+            with open(file_path, "rb") as f:
+                while chunk := f.read(1024 * 1024):
+                    hasher.update(chunk)
+        except OSError:
+            return True
+        if hasher.hexdigest() != cached.get("hash"):
+            return True
+        
+        metadata = {key: value for key, value in cached.items() if key not in _CACHE_ENTRY_FIELDS}
+        return self.update_file_cache(file_path, metadata) is None
+    
     def is_file_changed(self, file_path: str) -> bool:
         """
         检查文件是否已变更
@@ -96,38 +271,82 @@ class FileCacheManager:
         Returns:
             bool: True表示文件已变更，False表示文件未变更
         """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return True
+        
+        file_key = os.path.abspath(file_path)
+        cached = self.cache_data["files"].get(file_key)
+        if cached is None:
+            return True
+        if "hash_algorithm" not in cached:
+            return self._check_legacy_entry(file_path, cached)
+        # 哈希算法不同的缓存记录无法比较
+        if cached["hash_algorithm"] != self.hash_algorithm:
+            return True
+        
+        cached_signature = (cached.get("size"), cached.get("mtime_ns"), cached.get("inode"))
+        if not self.verify and _stat_signature(stat) == cached_signature:
+            # 文件状态未变，直接信任缓存的哈希值
+            self._hash_memo[file_key] = (stat.st_size, stat.st_mtime_ns, cached["hash"])
+            return False
+        
         current_hash = self.calculate_file_hash(file_path)
         if current_hash is None:
             return True
         
-        file_key = os.path.abspath(file_path)
-        cached_hash = self.cache_data["files"].get(file_key, {}).get("hash")
+        self._hash_memo[file_key] = (stat.st_size, stat.st_mtime_ns, current_hash)
+        if current_hash != cached["hash"]:
+            return True
         
-        return current_hash != cached_hash
+        # 内容未变但文件状态变化(如touch或复制)，刷新状态以便下次走快速路径
+        if _stat_signature(stat) != cached_signature:
+            cached["size"], cached["mtime_ns"], cached["inode"] = _stat_signature(stat)
+            cached["last_modified"] = stat.st_mtime
+            self._dirty_files.add(file_key)
+        return False
     
-    def update_file_cache(self, file_path: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+    def update_file_cache(self, file_path: str, metadata: Optional[Dict[str, Any]] = None,
+                          file_hash: Optional[str] = None) -> Optional[str]:
         """
         更新文件缓存信息
         
         Args:
             file_path: 文件路径
             metadata: 额外的元数据信息
+            file_hash: 已知的文件哈希值，未提供时复用变更检测的结果或重新计算
+        
+        Returns:
+            Optional[str]: 记录的文件哈希值，文件无法读取时返回None
         """
-        current_hash = self.calculate_file_hash(file_path)
+        current_hash = file_hash or self._get_memoized_hash(file_path) or self.calculate_file_hash(file_path)
         if current_hash is None:
-            return
+            return None
+        
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
         
         file_key = os.path.abspath(file_path)
+        size, mtime_ns, inode = _stat_signature(stat)
         self.cache_data["files"][file_key] = {
             "hash": current_hash,
-            "last_modified": os.path.getmtime(file_path),
-            "size": os.path.getsize(file_path),
+            "hash_algorithm": self.hash_algorithm,
+            "last_modified": stat.st_mtime,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "inode": inode,
             "timestamp": datetime.now().isoformat(),
             **(metadata or {})
         }
+        self._dirty_files.add(file_key)
+        self._removed_files.discard(file_key)
         
         # 保存缓存
-        self._save_cache()
+        self._mark_changed()
+        return current_hash
     
     def get_changed_files(self, file_paths: list[str]) -> list[str]:
         """
@@ -150,7 +369,10 @@ class FileCacheManager:
         清空所有缓存数据
         """
         self.cache_data["files"] = {}
-        self._save_cache()
+        self._dirty_files.clear()
+        self._removed_files.clear()
+        self._cleared = True
+        self._mark_changed()
     
     def remove_file_cache(self, file_path: str) -> None:
         """
@@ -162,7 +384,9 @@ class FileCacheManager:
         file_key = os.path.abspath(file_path)
         if file_key in self.cache_data["files"]:
             del self.cache_data["files"][file_key]
-            self._save_cache()
+            self._dirty_files.discard(file_key)
+            self._removed_files.add(file_key)
+            self._mark_changed()
     
     def get_cached_files(self) -> Dict[str, Any]:
         """
@@ -192,6 +416,146 @@ class FileCacheManager:
         }
 
 
+class ExtractionResultCache:
+    """
+    提取结果缓存，按文件内容哈希保存每个源文件的字符串提取结果
+
+    结果以压缩JSON的形式存放在单个SQLite数据库中，未变更的文件可以直接回放缓存结果，
+    无需重新解析。缓存的结果已经过字符串过滤，因此版本中包含过滤规则的摘要，
+    规则变更后所有缓存结果失效。
+    """
+
+    # 提取逻辑或缓存格式变更时递增，使旧的缓存结果全部失效
+    RESULT_VERSION = "2"
+
+    def __init__(self, cache_dir: str = ".cache", rules_digest: str = ""):
+        """
+        初始化提取结果缓存
+
+        Args:
+            cache_dir: 缓存目录路径
+            rules_digest: 字符串过滤规则的摘要(StringFilter.digest)
+        """
+        self.cache_dir = cache_dir
+        self.version = f"{self.RESULT_VERSION}:{rules_digest}"
+        self.db_file = os.path.join(cache_dir, "extract_results.db")
+        self._pending: List[tuple] = []
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_file)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, hash TEXT NOT NULL, mtime REAL, version TEXT NOT NULL, data BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _make_key(file_path: str, root_dir: Optional[str]) -> str:
+        """
+        生成缓存键，提取结果中的rel_path和id依赖于root_dir，因此两者共同组成键
+        """
+        root_key = os.path.abspath(root_dir) if root_dir else ""
+        return f"{os.path.abspath(file_path)}|{root_key}"
+
+    def get_entry(self, file_path: str, root_dir: Optional[str],
+                  file_hash: str) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, int]]]:
+        """
+        获取文件的缓存提取结果和提取时的过滤计数
+
+        Args:
+            file_path: 文件路径
+            root_dir: 提取时使用的根目录
+            file_hash: 文件当前内容的哈希值
+
+        Returns:
+            Optional[Tuple[List[Dict[str, Any]], Dict[str, int]]]: (提取结果, 规则名 -> 过滤数量)，
+                哈希或版本(包括过滤规则)不匹配或不存在时返回None
+        """
+        if not file_hash:
+            return None
+
+        row = self._conn.execute(
+            "SELECT hash, version, data FROM results WHERE key = ?",
+            (self._make_key(file_path, root_dir),)
+        ).fetchone()
+        if row is None or row[0] != file_hash or row[1] != self.version:
+            return None
+
+        try:
+            entry = json.loads(zlib.decompress(row[2]).decode("utf-8"))
+            return entry["strings"], entry["filter_stats"]
+        except (zlib.error, ValueError, KeyError, TypeError) as e:
+            print(f"[WARN] 读取提取结果缓存失败: {file_path} - {e}")
+            return None
+
+    def get(self, file_path: str, root_dir: Optional[str], file_hash: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        获取文件的缓存提取结果
+
+        Args:
+            file_path: 文件路径
+            root_dir: 提取时使用的根目录
+            file_hash: 文件当前内容的哈希值
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: 缓存的提取结果，哈希不匹配或不存在时返回None
+        """
+        entry = self.get_entry(file_path, root_dir, file_hash)
+        return entry[0] if entry is not None else None
+
+    def put(self, file_path: str, root_dir: Optional[str], file_hash: str, strings: List[Dict[str, Any]],
+            filter_stats: Optional[Dict[str, int]] = None) -> None:
+        """
+        记录文件的提取结果，调用flush()后写入磁盘
+
+        Args:
+            file_path: 文件路径
+            root_dir: 提取时使用的根目录
+            file_hash: 文件内容的哈希值
+            strings: 提取结果
+            filter_stats: 提取该文件时每条规则过滤的字符串数量，回放缓存时计入过滤统计
+        """
+        if not file_hash:
+            return
+
+        entry = {"strings": strings, "filter_stats": filter_stats or {}}
+        data = zlib.compress(json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        try:
+            mtime = os.path.getmtime(file_path)
+        except OSError:
+            mtime = None
+        self._pending.append((self._make_key(file_path, root_dir), file_hash, mtime, self.version, data))
+
+    def flush(self) -> None:
+        """
+        将待写入的提取结果批量写入数据库
+        """
+        if not self._pending:
+            return
+        try:
+            self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", self._pending)
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"[WARN] 保存提取结果缓存失败: {e}")
+        self._pending = []
+
+    def clear(self) -> None:
+        """
+        清空所有提取结果缓存
+        """
+        self._pending = []
+        self._conn.execute("DELETE FROM results")
+        self._conn.commit()
+
+    def close(self) -> None:
+        """
+        写入待保存的结果并关闭数据库连接
+        """
+        self.flush()
+        self._conn.close()
+
+
 def get_cached_files(root_dir: str, extensions: list[str]) -> list[str]:
     """
     获取指定目录下所有符合扩展名要求的文件路径列表
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+常驻反编译进程模块
+
+该模块启动长期运行的反编译JVM(tools/decompiler-worker/DecompilerWorker.java)，
+通过标准输入输出逐个提交"JAR -> 输出目录"任务：
+1. 每个JVM只启动和预热一次，之后的任务不再支付JVM启动和JIT预热的开销
+2. 进程池的大小按可用内存和每个JVM的堆大小计算，避免并行反编译时多个JVM争用内存
+3. 常驻进程无法启动(例如Java版本低于11)或任务执行中进程退出时返回None，调用方回退到每个JAR启动一个java进程
+"""
+
+import os
+import queue
+import subprocess
+import threading
+from typing import List, Optional, Set
+
+# 常驻反编译进程的Java源文件，使用Java 11+的单文件源码模式运行
+WORKER_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             "tools", "decompiler-worker", "DecompilerWorker.java")
+
+# 每个常驻进程的最大堆内存(MB)
+WORKER_HEAP_MB = 1024
+
+# 堆以外的JVM内存开销估计(MB)，用于计算进程池大小
+WORKER_OVERHEAD_MB = 256
+
+# 等待常驻进程启动的时间(秒)，单文件源码模式需要先在内存中编译
+WORKER_START_TIMEOUT = 60
+
+# 单个反编译任务的超时时间(秒)，与单独启动java进程时一致
+WORKER_JOB_TIMEOUT = 300
+
+
+def build_worker_command(classpath: List[str], heap_mb: int = WORKER_HEAP_MB) -> List[str]:
+    """
+    构建启动常驻反编译进程的命令
+
+    Args:
+        classpath: 反编译工具JAR路径列表，不存在的路径会被忽略
+        heap_mb: 最大堆内存(MB)
+
+    Returns:
+        List[str]: 命令参数列表
+    """
+    jars = [path for path in classpath if os.path.exists(path)]
+    return ["java", f"-Xmx{heap_mb}m", "-cp", os.pathsep.join(jars), WORKER_SOURCE]
+
+
+def _get_available_memory_mb() -> Optional[int]:
+    """
+    获取可用物理内存(MB)，无法获取时返回None
+    """
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def get_worker_pool_size(max_workers: Optional[int] = None, heap_mb: int = WORKER_HEAP_MB) -> int:
+    """
+    按可用内存计算常驻进程池大小
+
+    Args:
+        max_workers: 最大进程数，默认为CPU核心数
+        heap_mb: 每个进程的最大堆内存(MB)
+
+    Returns:
+        int: 进程池大小，至少为1
+    """
+    size = max_workers or os.cpu_count() or 1
+    available_mb = _get_available_memory_mb()
+    if available_mb is not None:
+        size = min(size, available_mb // (heap_mb + WORKER_OVERHEAD_MB))
+    return max(1, size)
+
+
+class DecompilerWorker:
+    """
+    单个常驻反编译进程
+    """
+
+    def __init__(self, command: List[str]):
+        """
+        初始化常驻反编译进程，调用start后启动
+
+        Args:
+            command: 启动命令
+        """
+        self.command = command
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: Optional[queue.Queue] = None
+
+    @staticmethod
+    def _read_lines(stream, lines: queue.Queue) -> None:
+        """
+        在后台线程中读取进程输出，进程退出时放入None
+        """
+        for line in stream:
+            lines.put(line.rstrip("\r\n"))
+        lines.put(None)
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> bool:
+        """
+        启动进程并等待就绪
+
+        Returns:
+            bool: 是否启动成功
+        """
+        try:
+            self._process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                bufsize=1
+            )
+        except OSError as e:
+            print(f"[WARN] 启动常驻反编译进程失败: {e}")
+            return False
+
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_lines, args=(self._process.stdout, self._lines), daemon=True).start()
+        try:
+            if self._lines.get(timeout=WORKER_START_TIMEOUT) == "READY":
+                return True
+        except queue.Empty:
+            pass
+        print(f"[WARN] 常驻反编译进程未能就绪: {' '.join(self.command)}")
+        self.close()
+        return False
+
+    def decompile(self, decompiler: str, jar_path: str, output_dir: str, extra_classpath: Optional[str] = None,
+                  timeout: float = WORKER_JOB_TIMEOUT) -> Optional[bool]:
+        """
+        提交一个反编译任务并等待完成
+
+        Args:
+            decompiler: 反编译工具，可选值：cfr或procyon
+            jar_path: JAR文件路径
+            output_dir: 输出目录
+            extra_classpath: 额外的类路径
+            timeout: 超时时间(秒)
+
+        Returns:
+            Optional[bool]: 是否反编译成功；进程不可用或在任务中退出时返回None
+        """
+        fields = [decompiler, os.path.abspath(jar_path), os.path.abspath(output_dir),
+                  os.path.abspath(extra_classpath) if extra_classpath else ""]
+        if any(char in field for field in fields for char in "\t\r\n") or not self.alive:
+            return None
+
+        try:
+            self._process.stdin.write("\t".join(fields) + "\n")
+            self._process.stdin.flush()
+            response = self._lines.get(timeout=timeout)
+        except OSError:
+            response = None
+        except queue.Empty:
+            print(f"[ERROR] 常驻反编译进程超时: {os.path.basename(jar_path)}")
+            print(f"  超时时间: {timeout} 秒")
+            self.close()
+            return False
+
+        if response is None:
+            self.close()
+            return None
+        if response == "OK":
+            return True
+        print(f"[ERROR] 常驻反编译进程反编译失败: {os.path.basename(jar_path)}")
+        print(f"  错误信息: {response.partition(chr(9))[2] or response}")
+        return False
+
+    def close(self) -> None:
+        """
+        关闭进程
+        """
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+class DecompilerWorkerPool:
+    """
+    常驻反编译进程池
+    进程按需启动，同时执行的任务数不超过进程池大小，空闲进程被后续任务复用
+    """
+
+    def __init__(self, command: List[str], size: int = 1):
+        """
+        初始化进程池
+
+        Args:
+            command: 启动常驻进程的命令
+            size: 进程池大小
+        """
+        self.command = command
+        self.size = max(1, size)
+        self.available = True
+        self._slots = threading.Semaphore(self.size)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._workers: List[DecompilerWorker] = []
+        self._unsupported: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "DecompilerWorkerPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _acquire(self) -> Optional[DecompilerWorker]:
+        """
+        获取空闲进程，没有空闲进程时启动新进程；启动失败时停用进程池
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        worker = DecompilerWorker(self.command)
+        if not worker.start():
+            self.available = False
+            print("[WARN] 常驻反编译进程不可用，回退到每个JAR启动一个java进程")
+            return None
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def decompile(self, decompiler: str, jar_path: str, output_dir: str,
+                  extra_classpath: Optional[str] = None) -> Optional[bool]:
+        """
+        使用常驻进程反编译JAR文件
+
+        Args:
+            decompiler: 反编译工具，可选值：cfr或procyon
+            jar_path: JAR文件路径
+            output_dir: 输出目录
+            extra_classpath: 额外的类路径
+
+        Returns:
+            Optional[bool]: 是否反编译成功；进程池不可用时返回None，调用方应回退到单独启动java进程
+        """
+        if not self.available or decompiler in self._unsupported:
+            return None
+        with self._slots:
+            worker = self._acquire()
+            if worker is None:
+                return None
+            result = worker.decompile(decompiler, jar_path, output_dir, extra_classpath)
+            if worker.alive:
+                self._idle.put(worker)
+            elif result is None:
+                # 进程在任务中退出，该反编译工具之后不再使用常驻进程
+                with self._lock:
+                    self._unsupported.add(decompiler)
+                print(f"[WARN] 常驻反编译进程在使用{decompiler}时退出，回退到单独启动java进程")
+            return result
+
+    def close(self) -> None:
+        """
+        关闭所有进程
+        """
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
@@ -1641,9 +1641,9 @@ def load_mapping_rules(rules_path: Any) -> List[Dict[str, Any]]:
                 for file_info in yaml_files:
                     file_path = file_info['file_path']
                     try:
-                        import yaml
+                        from .rule_io import load_yaml
                         with open(file_path, 'r', encoding='utf-8') as f:
-                            rules_data = yaml.safe_load(f)
+                            rules_data = load_yaml(f)
                         
                         # 处理规则文件中的id字段
                         mod_id = None
@@ -1744,9 +1744,9 @@ def load_mapping_rules(rules_path: Any) -> List[Dict[str, Any]]:
             
             if is_yaml:
                 # 是yaml文件，直接加载
-                import yaml
+                from .rule_io import load_yaml
                 with open(rules_path, 'r', encoding='utf-8') as f:
-                    rules_data = yaml.safe_load(f)
+                    rules_data = load_yaml(f)
                 
                 print(f"[OK] 加载规则文件(yaml): {rules_path}")
                 from src.common.logger_utils import get_logger
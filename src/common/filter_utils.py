@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+字符串过滤工具
+
+该模块包含提取字符串时使用的过滤规则引擎。规则从config/string_filter.json加载，
+加载时预编译：字面量列表转换为集合查找，所有正则合并为一个预编译正则，
+廉价的检查先执行，并记录每条规则过滤掉的字符串数量。
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Mapping, Optional
+
+# 默认过滤规则，配置文件不存在或无法读取时使用
+DEFAULT_FILTER_RULES: Dict[str, Any] = {
+    "version": "1.0",
+    # 短于该长度的字符串被过滤
+    "min_length": 2,
+    # 除完全匹配规则外不会被过滤的字符串
+    "keep": ["%", "+"],
+    # 完全匹配规则：规则名 -> 字面量列表
+    "exact": {
+        "format_string": ["%", "%s", " sec", "Level: ", "DIR: ", "placeholder_1", "placeholder_2",
+                          "sec", "secs", "second", "seconds"],
+        "config_item": ["noDeployCRPercent", "cr_effect", "deployCR", "maxCR", "minCR", "cr", "CR",
+                        "dp", "DP", "deployPoints", "deploy_points"],
+        "debug_string": ["wefwefwefwefe", "efwefwefwefe", "wefwefe", "test", "debug", "DEBUG", "Test", "TEST"],
+    },
+    # 前缀规则：规则名 -> 前缀列表
+    "prefix": {
+        "example_name": ["example_"],
+    },
+    # 子串规则：规则名 -> 子串列表，ignore_case中的子串不区分大小写
+    "substring": {
+        "ui_identifier": ["icon_"],
+    },
+    "substring_ignore_case": {
+        "ui_identifier": ["ui"],
+    },
+    # 正则规则：规则名 -> 正则表达式(re.match语义)，按顺序合并为一个正则
+    "pattern": {
+        "identifier": r"^\$?[a-zA-Z0-9_]+$",
+        "path": r"^([a-zA-Z]:?[/\\]|[^/\\\s]+[/\\])[^/\\\s]+([/\\][^/\\\s]+)*$",
+        "config_file": r"^[^/\\]+\.(ini|xml|cfg|json|txt|yaml|yml)$",
+        "likely_path": r"^[a-z0-9_./\\-]*/[a-z0-9_./\\-]*\Z",
+        "number": r"^\d+(\.\d+)?$",
+        "special_chars": r"^[!@#$%^&*()_+\-=\[\]{};':\"\\|,.<>/?~`]+$",
+    },
+}
+
+# 默认规则文件路径
+DEFAULT_FILTER_CONFIG = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "config", "string_filter.json"
+)
+
+
+class StringFilter:
+    """
+    字符串过滤器
+    预编译过滤规则，按从廉价到昂贵的顺序检查字符串，并统计每条规则的过滤数量
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Any]] = None):
+        """
+        初始化字符串过滤器
+
+        Args:
+            rules: 过滤规则，格式与DEFAULT_FILTER_RULES相同，默认为内置规则
+        """
+        rules = rules if rules is not None else DEFAULT_FILTER_RULES
+        # 规则内容的摘要，规则变更时使按旧规则过滤的提取结果缓存失效
+        self.digest = hashlib.sha256(
+            json.dumps(rules, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+        self.min_length = int(rules.get("min_length", 0))
+        self.keep = frozenset(rules.get("keep", []))
+
+        # 字面量 -> 规则名，一次字典查找完成所有完全匹配规则
+        self.exact: Dict[str, str] = {}
+        for rule_name, literals in rules.get("exact", {}).items():
+            for literal in literals:
+                self.exact.setdefault(literal, rule_name)
+
+        self.prefixes = [(rule_name, tuple(prefixes)) for rule_name, prefixes in rules.get("prefix", {}).items()]
+        self.substrings = [(rule_name, tuple(subs)) for rule_name, subs in rules.get("substring", {}).items()]
+        self.substrings_ignore_case = [
+            (rule_name, tuple(sub.lower() for sub in subs))
+            for rule_name, subs in rules.get("substring_ignore_case", {}).items()
+        ]
+
+        # 所有正则合并为一个带命名分组的正则，通过lastgroup得到命中的规则
+        patterns = rules.get("pattern", {})
+        self.pattern = None
+        if patterns:
+            self.pattern = re.compile("|".join(
+                f"(?P<{rule_name}>{pattern})" for rule_name, pattern in patterns.items()
+            ))
+
+        self.counters: Counter = Counter()
+
+    @classmethod
+    def from_file(cls, config_file: str = None) -> "StringFilter":
+        """
+        从JSON配置文件加载过滤规则，文件不存在或无法解析时使用内置规则
+
+        Args:
+            config_file: 规则文件路径，默认为config/string_filter.json
+
+        Returns:
+            StringFilter: 字符串过滤器
+        """
+        config_file = config_file or DEFAULT_FILTER_CONFIG
+        if os.path.exists(config_file):
+            try:
+                with open(config_file, 'r', encoding='utf-8') as f:
+                    return cls(json.load(f))
+            except (OSError, ValueError, re.error) as e:
+                print(f"[WARN] 加载字符串过滤规则失败: {config_file} - {e}，使用内置规则")
+        return cls()
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        判断字符串命中的过滤规则
+
+        Args:
+            text: 要判断的字符串
+
+        Returns:
+            Optional[str]: 命中的规则名，未命中返回None
+        """
+        if not text:
+            return "empty"
+
+        rule_name = self.exact.get(text)
+        if rule_name:
+            return rule_name
+
+        if text in self.keep:
+            return None
+
+        if len(text) < self.min_length:
+            return "too_short"
+
+        for rule_name, prefixes in self.prefixes:
+            if text.startswith(prefixes):
+                return rule_name
+
+        for rule_name, subs in self.substrings:
+            if any(sub in text for sub in subs):
+                return rule_name
+
+        if self.substrings_ignore_case:
+            lowered = text.lower()
+            for rule_name, subs in self.substrings_ignore_case:
+                if any(sub in lowered for sub in subs):
+                    return rule_name
+
+        if self.pattern is not None:
+            match = self.pattern.match(text)
+            if match:
+                return match.lastgroup
+
+        return None
+
+    def should_filter(self, text: str, counters: Optional[Counter] = None) -> bool:
+        """
+        判断是否应该过滤字符串，并记录命中规则的计数
+
+        计数不加锁，并行提取时每个任务传入自己的counters，由调用方通过merge_stats合并
+
+        Args:
+            text: 要判断的字符串
+            counters: 记录计数的Counter，默认为过滤器自身的counters
+
+        Returns:
+            bool: True表示应该过滤，False表示应该保留
+        """
+        rule_name = self.match(text)
+        if rule_name is None:
+            return False
+        (self.counters if counters is None else counters)[rule_name] += 1
+        return True
+
+    def merge_stats(self, counts: Mapping[str, int]) -> None:
+        """
+        合并其他任务(例如工作进程)记录的过滤计数
+
+        Args:
+            counts: 规则名 -> 过滤数量
+        """
+        self.counters.update(counts)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取每条规则过滤掉的字符串数量
+        """
+        return dict(self.counters)
+
+    def reset_stats(self) -> None:
+        """
+        清空过滤计数
+        """
+        self.counters.clear()
+
+
+# 模块级过滤器实例，首次使用时从配置文件加载
+_string_filter: Optional[StringFilter] = None
+
+
+def get_string_filter() -> StringFilter:
+    """
+    获取模块级字符串过滤器，首次调用时从config/string_filter.json加载规则
+
+    Returns:
+        StringFilter: 字符串过滤器
+    """
+    global _string_filter
+    if _string_filter is None:
+        _string_filter = StringFilter.from_file()
+    return _string_filter
+
+
+def set_string_filter(string_filter: Optional[StringFilter]) -> None:
+    """
+    替换模块级字符串过滤器，传入None时下次使用重新从配置文件加载
+
+    Args:
+        string_filter: 字符串过滤器
+    """
+    global _string_filter
+    _string_filter = string_filter
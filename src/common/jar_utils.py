@@ -4,16 +4,24 @@
 JAR文件处理工具
 
 该模块包含JAR文件的反编译、内容分析和版本检测功能。
+反编译结果按(JAR内容哈希, 反编译工具及版本, 选项)缓存，未变更的JAR直接从缓存链接到输出目录；
+增量反编译时按类文件CRC32比较，只重新反编译变更的顶层类。
 """
 
+import hashlib
+import json
 import os
+import re
 import subprocess
 import tempfile
 import zipfile
 import requests
 import shutil
 import concurrent.futures
-from typing import List, Dict, Any, Optional
+import contextlib
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
+
+from .decompiler_worker import DecompilerWorkerPool, build_worker_command, get_worker_pool_size
 
 
 def is_jar_file(file_path: str) -> bool:
@@ -50,6 +58,206 @@ decompiler_config = {
 }
 
 
+# 只提取文本资源时写入磁盘的文件类型，其余条目(类文件、贴图、音频等)不解压
+TEXT_RESOURCE_EXTENSIONS = (".properties", ".json", ".csv", ".lang", ".txt", ".toml", ".cfg", ".yml", ".yaml",
+                            ".mcmeta")
+
+
+# 反编译结果缓存目录
+DECOMPILE_CACHE_DIR = os.path.join(".cache", "decompile")
+
+# 反编译缓存的大小上限(字节)，超出时按最近使用时间淘汰最久未使用的缓存条目
+DECOMPILE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# 缓存内容格式版本，反编译后处理(如Unicode转义转换)变更时递增
+DECOMPILE_CACHE_VERSION = "1"
+
+# 缓存条目中的文件清单
+_CACHE_MANIFEST = "manifest.json"
+# 缓存条目中保存反编译结果的子目录
+_CACHE_TREE = "tree"
+# 增量反编译清单所在的子目录，每个输出目录一个清单
+_INCREMENTAL_DIR = "incremental"
+
+
+def _hash_jar(jar_path: str) -> Optional[str]:
+    """
+    计算JAR文件内容的SHA-256哈希
+    
+    Args:
+        jar_path: JAR文件路径
+    
+    Returns:
+        Optional[str]: 十六进制哈希值，读取失败时返回None
+    """
+    hasher = hashlib.sha256()
+    try:
+        with open(jar_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+    except OSError:
+        return None
+    return hasher.hexdigest()
+
+
+def get_decompile_cache_key(jar_hash: str, decompiler: str, options: List[str] = None) -> str:
+    """
+    生成反编译缓存键
+    
+    Args:
+        jar_hash: JAR文件内容的SHA-256哈希
+        decompiler: 反编译工具名称
+        options: 反编译选项
+    
+    Returns:
+        str: 缓存键
+    """
+    version = decompiler_config.get(decompiler, {}).get("version", "")
+    key_data = json.dumps([DECOMPILE_CACHE_VERSION, jar_hash, decompiler, version, options or []])
+    return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+
+def _read_decompile_cache(entry_dir: str) -> Optional[List[List[Any]]]:
+    """
+    读取缓存条目的文件清单，并用文件大小和修改时间校验缓存文件未被修改
+    
+    输出目录中的文件与缓存硬链接，原地修改输出文件会同时修改缓存文件，此时缓存条目失效。
+    
+    Args:
+        entry_dir: 缓存条目目录
+    
+    Returns:
+        Optional[List[List[Any]]]: 文件清单[相对路径, 大小, 修改时间(ns)]，缓存不存在或失效时返回None
+    """
+    manifest_path = os.path.join(entry_dir, _CACHE_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+    
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            files = json.load(f)["files"]
+        tree_dir = os.path.join(entry_dir, _CACHE_TREE)
+        for rel_path, size, mtime_ns in files:
+            stat = os.stat(os.path.join(tree_dir, rel_path))
+            if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+                raise ValueError(f"缓存文件已被修改: {rel_path}")
+        return files
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"[WARN] 反编译缓存失效，将重新反编译: {e}")
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        return None
+
+
+def _store_decompile_cache(staging_dir: str, entry_dir: str, jar_path: str, decompiler: str) -> bool:
+    """
+    将暂存目录中的反编译结果提交为缓存条目
+    
+    Args:
+        staging_dir: 暂存目录，其中的tree子目录为反编译结果
+        entry_dir: 缓存条目目录
+        jar_path: JAR文件路径
+        decompiler: 反编译工具名称
+    
+    Returns:
+        bool: 缓存条目是否可用，并发运行已提交相同条目时同样返回True；返回False时暂存目录保留
+    """
+    tree_dir = os.path.join(staging_dir, _CACHE_TREE)
+    files = []
+    for root, _, file_names in os.walk(tree_dir):
+        for file_name in file_names:
+            file_path = os.path.join(root, file_name)
+            stat = os.stat(file_path)
+            files.append([os.path.relpath(file_path, tree_dir), stat.st_size, stat.st_mtime_ns])
+    
+    with open(os.path.join(staging_dir, _CACHE_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"jar": os.path.basename(jar_path), "decompiler": decompiler,
+                   "version": decompiler_config.get(decompiler, {}).get("version", ""), "files": files}, f)
+    
+    try:
+        os.rename(staging_dir, entry_dir)
+    except OSError:
+        # 其他运行已经提交了相同的缓存条目
+        if _read_decompile_cache(entry_dir) is None:
+            return False
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    return True
+
+
+def prune_decompile_cache(max_bytes: Optional[int] = None, cache_dir: Optional[str] = None) -> int:
+    """
+    按最近使用时间淘汰反编译缓存条目，直到缓存总大小不超过上限
+    
+    缓存命中时会更新条目清单的修改时间，清单修改时间最早的条目最先被淘汰。
+    输出目录中的文件是硬链接或副本，淘汰缓存条目不影响已生成的输出。
+    max_bytes为0时清空所有缓存条目，可用于手动清理缓存。
+    
+    Args:
+        max_bytes: 缓存大小上限(字节)，默认为DECOMPILE_CACHE_MAX_BYTES
+        cache_dir: 缓存目录，默认为DECOMPILE_CACHE_DIR
+    
+    Returns:
+        int: 淘汰的缓存条目数量
+    """
+    max_bytes = DECOMPILE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    cache_dir = cache_dir or DECOMPILE_CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return 0
+    
+    entries = []
+    total_size = 0
+    for name in os.listdir(cache_dir):
+        # 跳过暂存目录和增量反编译清单
+        if name.startswith(".") or name == _INCREMENTAL_DIR:
+            continue
+        manifest_path = os.path.join(cache_dir, name, _CACHE_MANIFEST)
+        try:
+            last_used = os.stat(manifest_path).st_mtime_ns
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                size = sum(file_size for _, file_size, _ in json.load(f)["files"])
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+        entries.append((last_used, size, name))
+        total_size += size
+    
+    removed = 0
+    for _, size, name in sorted(entries):
+        if total_size <= max_bytes:
+            break
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        total_size -= size
+        removed += 1
+    if removed:
+        print(f"[INFO] 反编译缓存超出上限，已淘汰 {removed} 个最久未使用的缓存条目")
+    return removed
+
+
+def _materialize_decompile_cache(entry_dir: str, files: List[List[Any]], output_dir: str) -> None:
+    """
+    把缓存的反编译结果链接到输出目录，文件系统不支持硬链接时复制
+    
+    Args:
+        entry_dir: 缓存条目目录
+        files: 文件清单
+        output_dir: 输出目录
+    """
+    tree_dir = os.path.join(entry_dir, _CACHE_TREE)
+    use_link = True
+    for rel_path, _, _ in files:
+        source = os.path.join(tree_dir, rel_path)
+        target = os.path.join(output_dir, rel_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.lexists(target):
+            # 先删除再链接，避免写入旧文件时修改到其他硬链接
+            os.remove(target)
+        if use_link:
+            try:
+                os.link(source, target)
+                continue
+            except OSError:
+                use_link = False
+        shutil.copy2(source, target)
+
+
 def check_java_environment() -> bool:
     """
     检查Java环境是否可用
@@ -228,9 +436,61 @@ def check_decompiler_tools(download_missing: bool = True) -> bool:
     return False
 
 
+# Java源码中的Unicode转义序列：前面有奇数个连续反斜杠时有效，反斜杠和十六进制数字之间允许多个u
+_UNICODE_ESCAPE_PATTERN = re.compile(rb"(\\+)u+([0-9a-fA-F]{4})")
+
+
+def _decode_unicode_escapes(data: bytes) -> Optional[bytes]:
+    """
+    将Unicode转义序列替换为UTF-8编码的字符
+    
+    代理对(\\uD83D\\uDE00)合并为一个字符；单独的代理项无法用UTF-8编码，保留原样；
+    前面有偶数个反斜杠的\\u(例如字符串中的"\\\\u0041")不是转义序列，保留原样。
+    
+    Args:
+        data: 文件内容
+    
+    Returns:
+        Optional[bytes]: 转换后的内容，没有可转换的转义序列时返回None
+    """
+    matches = list(_UNICODE_ESCAPE_PATTERN.finditer(data))
+    pieces = []
+    position = 0
+    index = 0
+    while index < len(matches):
+        match = matches[index]
+        index += 1
+        backslashes = len(match.group(1))
+        if backslashes % 2 == 0:
+            continue
+        
+        code = int(match.group(2), 16)
+        end = match.end()
+        if 0xD800 <= code < 0xDC00 and index < len(matches):
+            low_match = matches[index]
+            low = int(low_match.group(2), 16)
+            if low_match.start() == end and len(low_match.group(1)) == 1 and 0xDC00 <= low < 0xE000:
+                code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                end = low_match.end()
+                index += 1
+        if 0xD800 <= code < 0xE000:
+            continue
+        
+        pieces.append(data[position:match.start() + backslashes - 1])
+        pieces.append(chr(code).encode("utf-8"))
+        position = end
+    
+    if not pieces:
+        return None
+    pieces.append(data[position:])
+    return b"".join(pieces)
+
+
 def convert_unicode_escapes(file_path: str) -> bool:
     """
-    将文件中的Unicode转义序列转换为实际字符
+    将文件中的Unicode转义序列转换为实际字符，只改写包含转义序列的文件
+    
+    文件按字节处理，不包含\\u的文件不会被解码或改写；不是UTF-8编码的文件按latin-1转换为UTF-8。
     
     Args:
         file_path: 文件路径
@@ -238,34 +498,28 @@ def convert_unicode_escapes(file_path: str) -> bool:
     Returns:
         bool: 是否转换成功
     """
-    import re
-    
     try:
-        # 使用latin-1编码读取文件，避免自动转换Unicode转义序列
-        with open(file_path, 'r', encoding='latin-1') as f:
-            content = f.read()
+        with open(file_path, 'rb') as f:
+            data = f.read()
         
         # 检查是否存在Unicode转义序列
-        if not re.search(r'\\u[0-9a-fA-F]{4}', content):
-            # 没有需要转换的Unicode转义序列
+        if data.find(b"\\u") < 0:
             return False
         
-        # 使用正则表达式查找所有\uXXXX格式的Unicode转义序列
-        def replace_unicode_escape(match):
-            """替换单个Unicode转义序列"""
+        if not data.isascii():
             try:
-                # 获取\uXXXX部分，转换为实际字符
-                return bytes(match.group(0), 'latin-1').decode('unicode_escape')
-            except Exception:
-                # 如果转换失败，返回原字符串
-                return match.group(0)
+                data.decode("utf-8")
+            except UnicodeDecodeError:
+                data = data.decode("latin-1").encode("utf-8")
         
-        # 转换所有Unicode转义序列
-        converted_content = re.sub(r'\\u[0-9a-fA-F]{4}', replace_unicode_escape, content)
+        converted = _decode_unicode_escapes(data)
+        if converted is None:
+            # 没有需要转换的Unicode转义序列
+            return False
         
         # 写入转换后的内容
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(converted_content)
+        with open(file_path, 'wb') as f:
+            f.write(converted)
         return True
     except Exception as e:
         print(f"[ERROR] 转换Unicode转义序列时发生异常: {file_path}")
@@ -274,41 +528,40 @@ def convert_unicode_escapes(file_path: str) -> bool:
         return False
 
 
-def convert_unicode_escapes_in_dir(directory: str) -> int:
+def convert_unicode_escapes_in_dir(directory: str, max_workers: int = None) -> int:
     """
-    转换目录中所有Java和Kotlin文件的Unicode转义序列
+    并行转换目录中所有Java和Kotlin文件的Unicode转义序列
     
     Args:
         directory: 目录路径
+        max_workers: 最大工作线程数，默认由ThreadPoolExecutor决定
     
     Returns:
         int: 转换成功的文件数量
     """
-    converted_count = 0
-    
-    # 遍历目录
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            # 只处理Java和Kotlin文件
-            if file.endswith(('.java', '.kt', '.kts')):
-                file_path = os.path.join(root, file)
-                if convert_unicode_escapes(file_path):
-                    converted_count += 1
+    # 只处理Java和Kotlin文件
+    file_paths = [
+        os.path.join(root, file)
+        for root, _, files in os.walk(directory)
+        for file in files
+        if file.endswith(('.java', '.kt', '.kts'))
+    ]
+    if len(file_paths) <= 1:
+        return sum(1 for file_path in file_paths if convert_unicode_escapes(file_path))
     
-    return converted_count
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(1 for converted in executor.map(convert_unicode_escapes, file_paths) if converted)
 
 
-def decompile_jar(jar_path: str, output_dir: str, decompiler: str = "cfr") -> bool:
+def _prepare_decompiler(decompiler: str) -> bool:
     """
-    反编译JAR文件
+    检查Java环境和指定的反编译工具，自动下载缺失的工具
     
     Args:
-        jar_path: JAR文件路径
-        output_dir: 输出目录
         decompiler: 反编译工具，可选值：cfr或procyon
     
     Returns:
-        bool: 是否反编译成功
+        bool: 反编译工具是否可用
     """
     # 1. 检查Java环境
     if not check_java_environment():
@@ -329,6 +582,42 @@ def decompile_jar(jar_path: str, output_dir: str, decompiler: str = "cfr") -> bo
         print(f"[INFO] 尝试自动下载Procyon...")
         if not download_decompiler("procyon"):
             return False
+    return True
+
+
+def decompile_jar(jar_path: str, output_dir: str, decompiler: str = "cfr", use_cache: bool = True) -> bool:
+    """
+    反编译JAR文件
+    
+    Args:
+        jar_path: JAR文件路径
+        output_dir: 输出目录
+        decompiler: 反编译工具，可选值：cfr或procyon
+        use_cache: 是否使用反编译缓存，JAR内容、反编译工具版本和选项都相同时直接使用缓存结果
+    
+    Returns:
+        bool: 是否反编译成功
+    """
+    # 0. 查找反编译缓存
+    entry_dir = None
+    if use_cache and decompiler in decompiler_config:
+        jar_hash = _hash_jar(jar_path)
+        if jar_hash:
+            entry_dir = os.path.join(DECOMPILE_CACHE_DIR, get_decompile_cache_key(jar_hash, decompiler))
+            files = _read_decompile_cache(entry_dir)
+            if files is not None:
+                try:
+                    _materialize_decompile_cache(entry_dir, files, output_dir)
+                    # 记录最近使用时间，供按大小上限淘汰缓存时使用
+                    os.utime(os.path.join(entry_dir, _CACHE_MANIFEST))
+                    print(f"OK 使用反编译缓存: {os.path.basename(jar_path)} ({len(files)} 个文件)")
+                    return True
+                except OSError as e:
+                    print(f"[WARN] 使用反编译缓存失败，将重新反编译: {e}")
+    
+    # 1-2. 检查Java环境和反编译工具
+    if not _prepare_decompiler(decompiler):
+        return False
     
     # 3. 检查JAR文件完整性
     if not check_jar_file_integrity(jar_path):
@@ -342,36 +631,121 @@ def decompile_jar(jar_path: str, output_dir: str, decompiler: str = "cfr") -> bo
         print(f"  异常信息: {str(e)}")
         return False
     
-    # 5. 选择反编译工具
+    # 5. 使用缓存时先反编译到暂存目录，完成后提交为缓存条目
+    staging_dir = None
+    decompile_dir = output_dir
+    if entry_dir is not None:
+        try:
+            os.makedirs(DECOMPILE_CACHE_DIR, exist_ok=True)
+            staging_dir = tempfile.mkdtemp(prefix=".staging-", dir=DECOMPILE_CACHE_DIR)
+            decompile_dir = os.path.join(staging_dir, _CACHE_TREE)
+            os.makedirs(decompile_dir)
+        except OSError as e:
+            print(f"[WARN] 创建反编译缓存目录失败，不使用缓存: {e}")
+            staging_dir = None
+            decompile_dir = output_dir
+    
+    # 6. 选择反编译工具
     decompile_result = False
     if decompiler == "cfr":
-        decompile_result = _decompile_with_cfr(jar_path, output_dir)
+        decompile_result = _decompile_with_cfr(jar_path, decompile_dir)
     elif decompiler == "procyon":
-        decompile_result = _decompile_with_procyon(jar_path, output_dir)
+        decompile_result = _decompile_with_procyon(jar_path, decompile_dir)
     else:
         print(f"[ERROR] 不支持的反编译工具: {decompiler}")
         print(f"[NOTE] 支持的反编译工具: cfr, procyon")
         return False
     
-    # 6. 转换Unicode转义序列为实际字符
+    # 7. 转换Unicode转义序列为实际字符
     if decompile_result:
         print(f"[NOTE] 开始转换反编译文件中的Unicode转义序列...")
-        converted_count = convert_unicode_escapes_in_dir(output_dir)
+        converted_count = convert_unicode_escapes_in_dir(decompile_dir)
         if converted_count > 0:
             print(f"OK 成功转换 {converted_count} 个文件中的Unicode转义序列")
         else:
             print(f"[NOTE] 没有需要转换的Unicode转义序列")
     
+    # 8. 提交缓存并链接到输出目录
+    if staging_dir is not None:
+        if not decompile_result:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return False
+        try:
+            if _store_decompile_cache(staging_dir, entry_dir, jar_path, decompiler):
+                files = _read_decompile_cache(entry_dir)
+                if files is not None:
+                    _materialize_decompile_cache(entry_dir, files, output_dir)
+                    prune_decompile_cache()
+                    return True
+        except OSError as e:
+            print(f"[WARN] 保存反编译缓存失败: {e}")
+        # 缓存不可用时直接复制暂存结果
+        if not os.path.isdir(decompile_dir):
+            print(f"[ERROR] 反编译结果丢失: {decompile_dir}")
+            return False
+        shutil.copytree(decompile_dir, output_dir, dirs_exist_ok=True)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    
     return decompile_result
 
 
-def _decompile_with_cfr(jar_path: str, output_dir: str) -> bool:
+# 当前启用的常驻反编译进程池
+_active_worker_pool: Optional[DecompilerWorkerPool] = None
+
+
+@contextlib.contextmanager
+def use_decompiler_workers(max_workers: int = None, command: List[str] = None) -> Iterator[Optional[DecompilerWorkerPool]]:
+    """
+    在上下文中使用常驻反编译进程池，_decompile_with_cfr和_decompile_with_procyon优先把任务提交给常驻进程
+    
+    Args:
+        max_workers: 最大进程数，实际大小还受可用内存限制
+        command: 启动常驻进程的命令，默认由build_worker_command构建
+    
+    Yields:
+        Optional[DecompilerWorkerPool]: 进程池，外层已启用进程池时复用外层的进程池
+    """
+    global _active_worker_pool
+    if _active_worker_pool is not None:
+        yield _active_worker_pool
+        return
+    
+    pool = DecompilerWorkerPool(command or build_worker_command([cfr_path, procyon_path]),
+                                get_worker_pool_size(max_workers))
+    _active_worker_pool = pool
+    try:
+        yield pool
+    finally:
+        _active_worker_pool = None
+        pool.close()
+
+
+def _decompile_with_worker(decompiler: str, jar_path: str, output_dir: str,
+                           extra_classpath: Optional[str] = None) -> Optional[bool]:
+    """
+    使用常驻反编译进程反编译JAR文件
+    
+    Returns:
+        Optional[bool]: 是否反编译成功；没有启用进程池或常驻进程不可用时返回None
+    """
+    pool = _active_worker_pool
+    if pool is None or not pool.available:
+        return None
+    print(f"[NOTE] 使用常驻反编译进程({decompiler})反编译JAR文件: {os.path.basename(jar_path)}")
+    result = pool.decompile(decompiler, jar_path, output_dir, extra_classpath)
+    if result:
+        print(f"OK 使用常驻反编译进程反编译成功: {os.path.basename(jar_path)}")
+    return result
+
+
+def _decompile_with_cfr(jar_path: str, output_dir: str, extra_classpath: Optional[str] = None) -> bool:
     """
     使用CFR反编译JAR文件
     
     Args:
         jar_path: JAR文件路径
         output_dir: 输出目录
+        extra_classpath: 额外的类路径，只反编译部分类时用于解析其他类的类型信息
     
     Returns:
         bool: 是否反编译成功
@@ -399,6 +773,13 @@ def _decompile_with_cfr(jar_path: str, output_dir: str) -> bool:
         "--outputdir",
         output_dir
     ]
+    if extra_classpath:
+        cmd.extend(["--extraclasspath", extra_classpath])
+    
+    # 优先使用常驻反编译进程
+    worker_result = _decompile_with_worker("cfr", jar_path, output_dir, extra_classpath)
+    if worker_result is not None:
+        return worker_result
     
     print(f"[NOTE] 开始使用CFR反编译JAR文件: {os.path.basename(jar_path)}")
     print(f"[DIR] 输出目录: {output_dir}")
@@ -487,6 +868,11 @@ def _decompile_with_procyon(jar_path: str, output_dir: str) -> bool:
         jar_path
     ]
     
+    # 优先使用常驻反编译进程
+    worker_result = _decompile_with_worker("procyon", jar_path, output_dir)
+    if worker_result is not None:
+        return worker_result
+    
     print(f"[NOTE] 开始使用Procyon反编译JAR文件: {os.path.basename(jar_path)}")
     print(f"[DIR] 输出目录: {output_dir}")
     print(f"[CMD] 执行命令: {' '.join(cmd)}")
@@ -537,6 +923,237 @@ def _decompile_with_procyon(jar_path: str, output_dir: str) -> bool:
         return False
 
 
+def _get_class_path(entry_name: str) -> Optional[str]:
+    """
+    获取类文件条目对应的类路径(不含扩展名)，不是类文件时返回None
+    """
+    if not entry_name.endswith(".class") or entry_name.startswith("META-INF/"):
+        return None
+    return entry_name[:-len(".class")]
+
+
+def _get_top_level_class(class_path: str, class_paths: Set[str]) -> str:
+    """
+    获取类所属的顶层类，内部类和匿名类与顶层类反编译到同一个源文件
+    类名中的$只有在JAR中存在对应外部类时才视为内部类分隔符，例如com/example/A$B只有存在com/example/A时才属于A，
+    否则(如生成代码中的Foo$Proxy)作为独立的顶层类
+    
+    Args:
+        class_path: 类路径(不含扩展名)
+        class_paths: JAR中所有类路径
+    
+    Returns:
+        str: 顶层类路径(不含扩展名)
+    """
+    directory, _, class_name = class_path.rpartition("/")
+    prefix = f"{directory}/" if directory else ""
+    # 从最外层开始查找存在的外部类
+    start = 1 if class_name.startswith("$") else 0
+    position = class_name.find("$", start)
+    while position > 0:
+        outer = prefix + class_name[:position]
+        if outer in class_paths:
+            return outer
+        position = class_name.find("$", position + 1)
+    return class_path
+
+
+def get_class_crcs(jar_path: str) -> Optional[Dict[str, Dict[str, int]]]:
+    """
+    读取JAR中各类文件的CRC32并按顶层类分组，只读取zip中央目录，不解压类文件
+    
+    Args:
+        jar_path: JAR文件路径
+    
+    Returns:
+        Optional[Dict[str, Dict[str, int]]]: {顶层类: {类文件条目: CRC32}}，无法读取JAR时返回None
+    """
+    classes: Dict[str, Tuple[str, int]] = {}
+    try:
+        with zipfile.ZipFile(jar_path, "r") as zip_ref:
+            for info in zip_ref.infolist():
+                class_path = _get_class_path(info.filename)
+                if class_path is not None:
+                    classes[class_path] = (info.filename, info.CRC)
+    except (OSError, zipfile.BadZipFile):
+        return None
+    
+    class_paths = set(classes)
+    groups: Dict[str, Dict[str, int]] = {}
+    for class_path, (entry_name, crc) in classes.items():
+        groups.setdefault(_get_top_level_class(class_path, class_paths), {})[entry_name] = crc
+    return groups
+
+
+def _get_source_path(output_dir: str, top_level: str) -> str:
+    """
+    获取顶层类反编译后的源文件路径
+    """
+    return os.path.join(output_dir, *top_level.split("/")) + ".java"
+
+
+def _get_incremental_manifest_path(output_dir: str) -> str:
+    """
+    获取输出目录对应的增量反编译清单路径
+    """
+    key = hashlib.sha256(os.path.abspath(output_dir).encode("utf-8")).hexdigest()
+    return os.path.join(DECOMPILE_CACHE_DIR, _INCREMENTAL_DIR, f"{key}.json")
+
+
+def _read_incremental_manifest(manifest_path: str, decompiler: str) -> Optional[Dict[str, Any]]:
+    """
+    读取增量反编译清单，清单不存在或反编译工具、版本不一致时返回None
+    """
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(manifest, dict)
+            or manifest.get("version") != DECOMPILE_CACHE_VERSION
+            or manifest.get("decompiler") != decompiler
+            or manifest.get("decompiler_version") != decompiler_config.get(decompiler, {}).get("version", "")
+            or not isinstance(manifest.get("classes"), dict)
+            or not isinstance(manifest.get("sources"), list)):
+        return None
+    return manifest
+
+
+def _write_incremental_manifest(manifest_path: str, decompiler: str, groups: Dict[str, Dict[str, int]],
+                                output_dir: str) -> None:
+    """
+    记录本次反编译时各类文件的CRC32和已生成的源文件
+    """
+    sources = [top_level for top_level in groups if os.path.exists(_get_source_path(output_dir, top_level))]
+    manifest = {
+        "version": DECOMPILE_CACHE_VERSION,
+        "decompiler": decompiler,
+        "decompiler_version": decompiler_config.get(decompiler, {}).get("version", ""),
+        "output_dir": os.path.abspath(output_dir),
+        "classes": groups,
+        "sources": sources
+    }
+    try:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+    except OSError as e:
+        print(f"[WARN] 保存增量反编译清单失败: {e}")
+
+
+def _decompile_changed_classes(jar_path: str, groups: Dict[str, Dict[str, int]], changed: List[str],
+                               output_dir: str, decompiler: str) -> bool:
+    """
+    只反编译变更的顶层类及其内部类，并替换输出目录中对应的源文件
+    
+    变更的类文件被复制到临时JAR中反编译，CFR通过--extraclasspath从原JAR解析其他类的类型信息。
+    Procyon命令行不支持额外的类路径，由decompile_jar_incremental改为完整反编译。
+    
+    Args:
+        jar_path: JAR文件路径
+        groups: 按顶层类分组的类文件CRC32
+        changed: 需要重新反编译的顶层类
+        output_dir: 输出目录
+        decompiler: 反编译工具，只支持cfr
+    
+    Returns:
+        bool: 是否反编译成功
+    """
+    if not _prepare_decompiler(decompiler):
+        return False
+    
+    work_dir = tempfile.mkdtemp(prefix="decompile-")
+    try:
+        filtered_jar = os.path.join(work_dir, "changed.jar")
+        with zipfile.ZipFile(jar_path, "r") as source, zipfile.ZipFile(filtered_jar, "w", zipfile.ZIP_DEFLATED) as target:
+            for top_level in changed:
+                for class_file in groups[top_level]:
+                    target.writestr(source.getinfo(class_file), source.read(class_file))
+        
+        decompile_dir = os.path.join(work_dir, "out")
+        os.makedirs(decompile_dir)
+        if not _decompile_with_cfr(filtered_jar, decompile_dir, extra_classpath=os.path.abspath(jar_path)):
+            return False
+        convert_unicode_escapes_in_dir(decompile_dir)
+        
+        for top_level in changed:
+            source_file = _get_source_path(decompile_dir, top_level)
+            target_file = _get_source_path(output_dir, top_level)
+            if os.path.lexists(target_file):
+                # 输出文件可能与反编译缓存硬链接，先删除再写入
+                os.remove(target_file)
+            if os.path.exists(source_file):
+                os.makedirs(os.path.dirname(target_file), exist_ok=True)
+                shutil.move(source_file, target_file)
+        return True
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        print(f"[ERROR] 增量反编译失败: {os.path.basename(jar_path)} - {e}")
+        return False
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def decompile_jar_incremental(jar_path: str, output_dir: str, decompiler: str = "cfr", use_cache: bool = True) -> bool:
+    """
+    增量反编译JAR文件
+    
+    每次反编译后按输出目录记录各类文件的CRC32。再次反编译到同一输出目录时只比较zip中央目录中的CRC32，
+    只重新反编译变更的顶层类及其内部类，其余类沿用输出目录中已有的源文件，删除已不存在的类对应的源文件。
+    没有上次的清单时完整反编译。
+    只有CFR支持只反编译部分类(通过额外类路径解析其他类)，使用Procyon时有类变更就完整反编译。
+    
+    Args:
+        jar_path: JAR文件路径
+        output_dir: 输出目录
+        decompiler: 反编译工具，可选值：cfr或procyon
+        use_cache: 完整反编译时是否使用反编译缓存
+    
+    Returns:
+        bool: 是否反编译成功
+    """
+    groups = get_class_crcs(jar_path)
+    if groups is None or decompiler not in decompiler_config:
+        return decompile_jar(jar_path, output_dir, decompiler, use_cache)
+    
+    manifest_path = _get_incremental_manifest_path(output_dir)
+    manifest = _read_incremental_manifest(manifest_path, decompiler)
+    if manifest is None:
+        if not decompile_jar(jar_path, output_dir, decompiler, use_cache):
+            return False
+    else:
+        previous = manifest["classes"]
+        sources = set(manifest["sources"])
+        changed = [
+            top_level for top_level, classes in groups.items()
+            if previous.get(top_level) != classes
+            or (top_level in sources and not os.path.exists(_get_source_path(output_dir, top_level)))
+        ]
+        removed = [top_level for top_level in previous if top_level not in groups]
+        
+        for top_level in removed:
+            source_file = _get_source_path(output_dir, top_level)
+            if os.path.lexists(source_file):
+                os.remove(source_file)
+        
+        if changed and decompiler != "cfr":
+            print(f"[NOTE] {decompiler}不支持只反编译部分类，完整反编译: {os.path.basename(jar_path)}")
+            if not decompile_jar(jar_path, output_dir, decompiler, use_cache):
+                return False
+        elif changed:
+            print(f"[NOTE] 增量反编译: {os.path.basename(jar_path)} ({len(changed)}/{len(groups)} 个顶层类已变更)")
+            if not _decompile_changed_classes(jar_path, groups, changed, output_dir, decompiler):
+                return False
+        else:
+            print(f"OK 类文件未变更，沿用已有的反编译结果: {os.path.basename(jar_path)}")
+        if removed:
+            print(f"[INFO] 删除了 {len(removed)} 个已移除类的源文件")
+    
+    _write_incremental_manifest(manifest_path, decompiler, groups, output_dir)
+    return True
+
+
 def analyze_jar_content(jar_path: str) -> Dict[str, Any]:
     """
     分析JAR文件内容
@@ -718,7 +1335,8 @@ def find_jar_files(directory: str) -> List[str]:
     return jar_files
 
 
-def _decompile_jar_task(jar_file: str, output_dir: str, decompiler: str, jar_name: str) -> Dict[str, Any]:
+def _decompile_jar_task(jar_file: str, output_dir: str, decompiler: str, jar_name: str,
+                        incremental: bool = False) -> Dict[str, Any]:
     """
     单个JAR文件反编译任务，用于并行处理
     
@@ -727,6 +1345,7 @@ def _decompile_jar_task(jar_file: str, output_dir: str, decompiler: str, jar_nam
         output_dir: 输出目录
         decompiler: 反编译工具
         jar_name: JAR文件名
+        incremental: 是否只重新反编译变更的类
     
     Returns:
         Dict[str, Any]: 反编译结果
@@ -735,7 +1354,10 @@ def _decompile_jar_task(jar_file: str, output_dir: str, decompiler: str, jar_nam
     jar_output_dir = os.path.join(output_dir, jar_name)
     
     # 反编译JAR文件
-    success = decompile_jar(jar_file, jar_output_dir, decompiler)
+    if incremental:
+        success = decompile_jar_incremental(jar_file, jar_output_dir, decompiler)
+    else:
+        success = decompile_jar(jar_file, jar_output_dir, decompiler)
     
     # 记录结果
     return {
@@ -746,7 +1368,8 @@ def _decompile_jar_task(jar_file: str, output_dir: str, decompiler: str, jar_nam
     }
 
 
-def decompile_all_jars_in_dir(input_dir: str, output_dir: str, decompiler: str = "cfr", max_workers: int = None) -> List[Dict[str, Any]]:
+def decompile_all_jars_in_dir(input_dir: str, output_dir: str, decompiler: str = "cfr", max_workers: int = None,
+                              incremental: bool = False, use_workers: bool = False) -> List[Dict[str, Any]]:
     """
     反编译目录中的所有JAR文件，支持并行处理
     
@@ -755,6 +1378,8 @@ def decompile_all_jars_in_dir(input_dir: str, output_dir: str, decompiler: str =
         output_dir: 输出目录
         decompiler: 反编译工具，可选值：cfr或procyon
         max_workers: 最大工作线程数，默认为CPU核心数
+        incremental: 是否增量反编译，输出目录已有上次的反编译结果时只重新反编译变更的类
+        use_workers: 是否使用常驻反编译进程池，同时运行的JVM数量按可用内存限制；不可用时回退到每个JAR启动一个java进程
     
     Returns:
         List[Dict[str, Any]]: 反编译结果列表
@@ -780,7 +1405,8 @@ def decompile_all_jars_in_dir(input_dir: str, output_dir: str, decompiler: str =
     results = []
     
     # 使用并行处理反编译所有JAR文件
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    worker_context = use_decompiler_workers(max_workers) if use_workers else contextlib.nullcontext()
+    with worker_context, concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
         # 提交任务
         future_to_jar = {
             executor.submit(
@@ -788,7 +1414,8 @@ def decompile_all_jars_in_dir(input_dir: str, output_dir: str, decompiler: str =
                 jar_file,
                 output_dir,
                 decompiler,
-                os.path.basename(jar_file).replace(".jar", "")
+                os.path.basename(jar_file).replace(".jar", ""),
+                incremental
             ): jar_file for jar_file in jar_files
         }
         
@@ -814,13 +1441,14 @@ def decompile_all_jars_in_dir(input_dir: str, output_dir: str, decompiler: str =
     return results
 
 
-def extract_jar(jar_path: str, output_dir: str) -> bool:
+def extract_jar(jar_path: str, output_dir: str, extensions: Optional[Tuple[str, ...]] = None) -> bool:
     """
     提取JAR文件内容，不进行反编译
     
     Args:
         jar_path: JAR文件路径
         output_dir: 输出目录
+        extensions: 只提取这些扩展名的条目(不区分大小写)，例如TEXT_RESOURCE_EXTENSIONS；默认提取全部内容
     
     Returns:
         bool: 是否提取成功
@@ -838,7 +1466,16 @@ def extract_jar(jar_path: str, output_dir: str) -> bool:
     
     try:
         with zipfile.ZipFile(jar_path, "r") as zip_ref:
-            zip_ref.extractall(output_dir)
+            if extensions is None:
+                zip_ref.extractall(output_dir)
+            else:
+                # 扫描中央目录，只把需要的条目流式写入磁盘
+                extracted = 0
+                for info in zip_ref.infolist():
+                    if not info.is_dir() and info.filename.lower().endswith(extensions):
+                        zip_ref.extract(info, output_dir)
+                        extracted += 1
+                print(f"[INFO] 提取了 {extracted} 个文件，跳过 {len(zip_ref.infolist()) - extracted} 个条目")
         
         print(f"OK 成功提取JAR文件内容: {jar_path}")
         return True
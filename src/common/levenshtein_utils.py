@@ -4,10 +4,18 @@
 Levenshtein模糊匹配工具
 
 该模块包含字符串相似度计算和模糊匹配功能。
+对同一个本地化数据库反复查询时，可以使用FuzzyMatchIndex一次性建立n-gram倒排索引，
+按阈值推导的长度范围和n-gram重叠下界筛选候选，再用带状Levenshtein距离校验；
+使用ContextSignatureIndex预先计算上下文签名，上下文匹配只需查找对应的分桶。
 """
 
+import heapq
+import math
 import re
-from typing import List, Dict, Any, Tuple
+from bisect import bisect_left
+from collections import Counter
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple
 
 # 尝试导入Levenshtein库，如果不存在则使用自定义实现
 HAS_LEVENSHTEIN = False
@@ -21,6 +29,21 @@ except ImportError:
     HAS_LEVENSHTEIN = False
     print("[WARN] python-Levenshtein库未安装，将使用自定义实现")
 
+# 比较前移除的占位符
+PLACEHOLDER_PATTERN = re.compile(r'[%]\w+|\$\{.*?\}|\{.*?\}')
+
+# 由阈值推导距离上界时的浮点误差容限
+_EPSILON = 1e-9
+
+# 上下文签名中保留的最近祖先节点数量
+CONTEXT_ANCESTOR_DEPTH = 3
+
+# 综合排序时从上下文分桶中取出的最大候选数量
+CONTEXT_BUCKET_CANDIDATES = 50
+
+# 上下文中没有node_type字段时的分组键
+_NO_NODE_TYPE = object()
+
 
 class LevenshteinDistance:
     """
@@ -42,25 +65,56 @@ class LevenshteinDistance:
         if HAS_LEVENSHTEIN:
             return Levenshtein.distance(a, b)
         else:
-            # 自定义Levenshtein距离实现
-            m, n = len(a), len(b)
-            dp = [[0] * (n + 1) for _ in range(m + 1)]
-            
-            for i in range(m + 1):
-                dp[i][0] = i
-            for j in range(n + 1):
-                dp[0][j] = j
-            
-            for i in range(1, m + 1):
-                for j in range(1, n + 1):
-                    cost = 0 if a[i-1] == b[j-1] else 1
-                    dp[i][j] = min(
-                        dp[i-1][j] + 1,      # 删除
-                        dp[i][j-1] + 1,      # 插入
-                        dp[i-1][j-1] + cost  # 替换
-                    )
-            
-            return dp[m][n]
+            # 自定义Levenshtein距离实现，只保留两行
+            return LevenshteinDistance.bounded(a, b, max(len(a), len(b)))
+    
+    @staticmethod
+    def bounded(a: str, b: str, max_distance: int) -> int:
+        """
+        计算不超过上界的Levenshtein距离
+        
+        只计算对角线两侧max_distance宽度内的单元格，一行中的最小值超过上界时提前结束。
+        
+        Args:
+            a: 第一个字符串
+            b: 第二个字符串
+            max_distance: 距离上界
+        
+        Returns:
+            int: Levenshtein距离，超过上界时返回max_distance + 1
+        """
+        if len(a) < len(b):
+            a, b = b, a
+        m, n = len(a), len(b)
+        if m - n > max_distance:
+            return max_distance + 1
+        if n == 0:
+            return m
+        
+        over = max_distance + 1
+        previous = [j if j <= max_distance else over for j in range(n + 1)]
+        for i in range(1, m + 1):
+            char = a[i - 1]
+            low = max(1, i - max_distance)
+            high = min(n, i + max_distance)
+            current = [over] * (n + 1)
+            current[0] = i if i <= max_distance else over
+            row_min = current[0]
+            for j in range(low, high + 1):
+                value = previous[j - 1] if b[j - 1] == char else previous[j - 1] + 1
+                if previous[j] + 1 < value:
+                    value = previous[j] + 1
+                if current[j - 1] + 1 < value:
+                    value = current[j - 1] + 1
+                if value > over:
+                    value = over
+                current[j] = value
+                if value < row_min:
+                    row_min = value
+            if row_min > max_distance:
+                return over
+            previous = current
+        return previous[n]
     
     @staticmethod
     def ratio(a: str, b: str) -> float:
@@ -102,14 +156,360 @@ def calculate_similarity(a: str, b: str, clean_placeholders: bool = True) -> flo
     """
     if clean_placeholders:
         # 预处理：移除占位符后比较
-        a_clean = re.sub(r'[%]\w+|\$\{.*?\}|\{.*?\}', '', a)
-        b_clean = re.sub(r'[%]\w+|\$\{.*?\}|\{.*?\}', '', b)
+        a_clean = PLACEHOLDER_PATTERN.sub('', a)
+        b_clean = PLACEHOLDER_PATTERN.sub('', b)
         return LevenshteinDistance.ratio(a_clean, b_clean)
     else:
         return LevenshteinDistance.ratio(a, b)
 
 
-def get_fuzzy_suggestions(query: str, localization_db: List[Dict[str, Any]], threshold: float = 0.8, clean_placeholders: bool = True) -> List[Dict[str, Any]]:
+def get_max_distance(query_length: int, length: int, threshold: float) -> int:
+    """
+    获取满足相似度阈值时允许的最大距离
+    
+    python-Levenshtein的ratio按插入删除距离和总长度归一化，自定义实现按编辑距离和较长字符串的长度归一化。
+    
+    Args:
+        query_length: 查询字符串长度
+        length: 候选字符串长度
+        threshold: 相似度阈值
+    
+    Returns:
+        int: 最大距离
+    """
+    if HAS_LEVENSHTEIN:
+        return int(math.floor((1.0 - threshold) * (query_length + length) + _EPSILON))
+    return int(math.floor((1.0 - threshold) * max(query_length, length) + _EPSILON))
+
+
+def get_length_range(query_length: int, threshold: float) -> Tuple[int, int]:
+    """
+    获取可能满足相似度阈值的候选字符串长度范围
+    
+    Args:
+        query_length: 查询字符串长度
+        threshold: 相似度阈值，必须大于0
+    
+    Returns:
+        Tuple[int, int]: (最小长度, 最大长度)
+    """
+    if HAS_LEVENSHTEIN:
+        low = query_length * threshold / (2.0 - threshold)
+        high = query_length * (2.0 - threshold) / threshold
+    else:
+        low = query_length * threshold
+        high = query_length / threshold
+    return int(math.ceil(low - _EPSILON)), int(math.floor(high + _EPSILON))
+
+
+def verify_similarity(query: str, text: str, threshold: float) -> Optional[float]:
+    """
+    校验两个已去除占位符的字符串的相似度，不使用python-Levenshtein时用带状Levenshtein距离提前排除
+    
+    Args:
+        query: 查询字符串
+        text: 候选字符串
+        threshold: 相似度阈值
+    
+    Returns:
+        Optional[float]: 相似度，低于阈值时返回None；结果与calculate_similarity一致
+    """
+    if HAS_LEVENSHTEIN:
+        similarity = Levenshtein.ratio(query, text)
+    elif not query and not text:
+        similarity = 1.0
+    elif not query or not text:
+        similarity = 0.0
+    else:
+        max_length = max(len(query), len(text))
+        max_distance = get_max_distance(len(query), len(text), threshold)
+        distance = LevenshteinDistance.bounded(query, text, max_distance)
+        if distance > max_distance:
+            return None
+        similarity = 1.0 - (distance / max_length)
+    return similarity if similarity >= threshold else None
+
+
+class FuzzyMatchIndex:
+    """
+    本地化数据库的模糊匹配索引
+    
+    建立时对每条记录的原始字符串去除占位符并拆分为n-gram，记录按清理后的长度排序编号，
+    倒排列表中的编号因此同时按长度有序。查询时：
+    1. 由相似度阈值推导候选长度范围和每个长度允许的最大编辑距离
+    2. 由q-gram引理得到候选需要共享的n-gram数量下界，只统计长度范围内的倒排记录
+    3. 对满足下界的候选用带状、可提前结束的Levenshtein距离校验
+    结果与对整个数据库逐条调用calculate_similarity一致。
+    """
+    
+    def __init__(self, localization_db: List[Dict[str, Any]], clean_placeholders: bool = True, gram_size: int = 3):
+        """
+        为本地化数据库建立索引
+        
+        Args:
+            localization_db: 本地化数据库，建立索引后不应再修改
+            clean_placeholders: 是否去除占位符后比较
+            gram_size: n-gram长度
+        """
+        self.source = localization_db
+        self.clean_placeholders = clean_placeholders
+        self.gram_size = gram_size
+        self._prefix = "\x02" * (gram_size - 1)
+        self._suffix = "\x03" * (gram_size - 1)
+        
+        cleaned = [self._clean(item["original"]) for item in localization_db]
+        # 按清理后的长度排序，长度相同时保持数据库中的顺序
+        order = sorted(range(len(localization_db)), key=lambda i: len(cleaned[i]))
+        self._positions = order
+        self._texts = [cleaned[i] for i in order]
+        self._lengths = [len(text) for text in self._texts]
+        
+        # n-gram -> (记录编号列表, 出现次数列表)
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for entry_id, text in enumerate(self._texts):
+            for gram, count in self._grams(text).items():
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = ([], [])
+                posting[0].append(entry_id)
+                posting[1].append(count)
+    
+    def __len__(self) -> int:
+        return len(self._texts)
+    
+    def _clean(self, text: str) -> str:
+        return PLACEHOLDER_PATTERN.sub('', text) if self.clean_placeholders else text
+    
+    def _grams(self, text: str) -> Counter:
+        padded = self._prefix + text + self._suffix
+        size = self.gram_size
+        return Counter(padded[i:i + size] for i in range(len(padded) - size + 1))
+    
+    def _similarity(self, query: str, text: str, threshold: float) -> Optional[float]:
+        """
+        校验候选，相似度低于阈值时返回None
+        """
+        return verify_similarity(query, text, threshold)
+    
+    def search(self, query: str, threshold: float = 0.8, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        查找相似度不低于阈值的记录
+        
+        Args:
+            query: 查询字符串
+            threshold: 相似度阈值
+            limit: 最多返回的记录数量，默认返回全部
+        
+        Returns:
+            List[Dict[str, Any]]: 模糊匹配建议列表，按相似度降序排序，相似度相同时按数据库中的顺序
+        """
+        return [{"item": self.source[position], "similarity": similarity}
+                for position, similarity in self.search_positions(query, threshold, limit)]
+    
+    def search_positions(self, query: str, threshold: float = 0.8, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        查找相似度不低于阈值的记录，只返回记录在数据库中的位置，便于在进程间传递
+        
+        Args:
+            query: 查询字符串
+            threshold: 相似度阈值
+            limit: 最多返回的记录数量，默认返回全部
+        
+        Returns:
+            List[Tuple[int, float]]: (记录位置, 相似度)列表，排序方式与search相同
+        """
+        query_clean = self._clean(query)
+        query_length = len(query_clean)
+        
+        if threshold <= 0:
+            # 任何记录都满足阈值
+            candidates = range(len(self._texts))
+        else:
+            low_length, high_length = get_length_range(query_length, threshold)
+            start = bisect_left(self._lengths, low_length)
+            end = bisect_left(self._lengths, high_length + 1)
+            candidates = self._candidates(query_clean, threshold, start, end)
+        
+        matches = []
+        for entry_id in candidates:
+            similarity = self._similarity(query_clean, self._texts[entry_id], threshold)
+            if similarity is not None:
+                matches.append((-similarity, self._positions[entry_id]))
+        
+        matches.sort()
+        if limit is not None:
+            matches = matches[:limit]
+        return [(position, -negative) for negative, position in matches]
+    
+    def _candidates(self, query: str, threshold: float, start: int, end: int) -> List[int]:
+        """
+        在编号范围[start, end)内筛选共享n-gram数量满足下界的候选
+        """
+        if start >= end:
+            return []
+        
+        query_length = len(query)
+        size = self.gram_size
+        # 每个长度需要共享的n-gram数量：max(|Ga|, |Gb|) - q * 最大距离
+        required: Dict[int, int] = {}
+        scan_ranges = []
+        position = start
+        while position < end:
+            length = self._lengths[position]
+            length_end = bisect_left(self._lengths, length + 1, position, end)
+            need = max(query_length, length) + size - 1 - size * get_max_distance(query_length, length, threshold)
+            if need <= 0:
+                # 下界无法筛选，该长度的记录全部校验
+                scan_ranges.append((position, length_end))
+            else:
+                required[length] = need
+            position = length_end
+        
+        overlaps: Dict[int, int] = {}
+        if required:
+            for gram, query_count in self._grams(query).items():
+                posting = self._postings.get(gram)
+                if posting is None:
+                    continue
+                ids, counts = posting
+                for k in range(bisect_left(ids, start), bisect_left(ids, end)):
+                    entry_id = ids[k]
+                    overlaps[entry_id] = overlaps.get(entry_id, 0) + min(query_count, counts[k])
+        
+        lengths = self._lengths
+        candidates = [entry_id for entry_id, overlap in overlaps.items()
+                      if overlap >= required.get(lengths[entry_id], 0) and lengths[entry_id] in required]
+        for range_start, range_end in scan_ranges:
+            candidates.extend(range(range_start, range_end))
+        return candidates
+
+
+class ContextSignatureIndex:
+    """
+    本地化数据库的上下文签名索引
+    
+    建立时为每条带有parent_types的记录计算冻结的上下文签名：
+    1. 按node_type分组，相同祖先节点集合的记录合并为一组，
+       上下文匹配只需对每种不同的集合做一次子集判断，结果与get_contextual_suggestions一致；
+       子集判断无法按签名分桶，仍是对同一node_type下所有不同集合的线性扫描
+    2. 按(node_type, 最近N个祖先节点)分桶，用于综合排序时快速找出上下文最接近的记录
+    """
+    
+    def __init__(self, localization_db: List[Dict[str, Any]], ancestor_depth: int = CONTEXT_ANCESTOR_DEPTH):
+        """
+        为本地化数据库建立索引
+        
+        Args:
+            localization_db: 本地化数据库，建立索引后不应再修改
+            ancestor_depth: 签名中保留的最近祖先节点数量
+        """
+        self.source = localization_db
+        self.ancestor_depth = ancestor_depth
+        
+        # node_type -> {祖先节点集合: 记录位置列表}
+        self._groups: Dict[Any, Dict[frozenset, List[int]]] = {}
+        # (node_type, 最近祖先节点) -> 记录位置列表
+        self._buckets: Dict[Tuple[Any, Tuple[str, ...]], List[int]] = {}
+        
+        for position, entry in enumerate(localization_db):
+            context = entry.get("context")
+            if not isinstance(context, dict) or "parent_types" not in context:
+                continue
+            parent_types = context["parent_types"]
+            node_type = context.get("node_type", _NO_NODE_TYPE)
+            self._groups.setdefault(node_type, {}).setdefault(frozenset(parent_types), []).append(position)
+            self._buckets.setdefault(self.signature(context), []).append(position)
+    
+    def __len__(self) -> int:
+        return len(self.source)
+    
+    def signature(self, context: Dict[str, Any]) -> Tuple[Any, Tuple[str, ...]]:
+        """
+        计算上下文签名
+        
+        Args:
+            context: 上下文元数据
+        
+        Returns:
+            Tuple[Any, Tuple[str, ...]]: (node_type, 最近的ancestor_depth个祖先节点类型)
+        """
+        return (context.get("node_type", _NO_NODE_TYPE),
+                tuple(context.get("parent_types", ())[:self.ancestor_depth]))
+    
+    def contextual(self, yaml_item: Dict[str, Any], max_suggestions: int = 5) -> List[Dict[str, Any]]:
+        """
+        根据上下文获取建议，结果与get_contextual_suggestions一致
+        
+        查询的祖先节点只需是记录祖先节点的子集，不要求签名相同，因此不能使用bucket分桶，
+        而是线性扫描同一node_type下每种不同的祖先节点集合(未提供node_type时扫描所有分组)，
+        复杂度与不同集合的数量成正比；只需要上下文最接近的记录时应使用get_ranked_suggestions
+        
+        Args:
+            yaml_item: YAML映射项
+            max_suggestions: 最大建议数量
+        
+        Returns:
+            List[Dict[str, Any]]: 上下文匹配建议列表，按数据库中的顺序
+        """
+        context = yaml_item.get("context")
+        if not context or "parent_types" not in context:
+            return []
+        
+        if "node_type" in context:
+            groups = [self._groups.get(context["node_type"], {})]
+        else:
+            groups = self._groups.values()
+        
+        required = frozenset(context["parent_types"])
+        matched = [positions for group in groups for parent_set, positions in group.items() if required <= parent_set]
+        positions = heapq.merge(*matched) if len(matched) > 1 else iter(matched[0] if matched else ())
+        return [self.source[position] for position in islice(positions, max(max_suggestions, 0))]
+    
+    def bucket(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        获取与上下文签名完全相同的记录
+        
+        Args:
+            context: 上下文元数据
+        
+        Returns:
+            List[Dict[str, Any]]: 同一分桶中的记录，按数据库中的顺序
+        """
+        if "parent_types" not in context:
+            return []
+        return [self.source[position] for position in self._buckets.get(self.signature(context), ())]
+    
+    def context_match(self, context: Dict[str, Any], entry: Dict[str, Any]) -> float:
+        """
+        计算记录与上下文的匹配度
+        
+        node_type相同时，按最近祖先节点从近到远连续相同的层数计分，签名完全相同时为1.0。
+        
+        Args:
+            context: 查询的上下文元数据
+            entry: 本地化数据库中的记录
+        
+        Returns:
+            float: 上下文匹配度(0到1之间)
+        """
+        entry_context = entry.get("context")
+        if not context or not isinstance(entry_context, dict) or "parent_types" not in entry_context:
+            return 0.0
+        node_type, ancestors = self.signature(context)
+        entry_node_type, entry_ancestors = self.signature(entry_context)
+        if node_type != entry_node_type:
+            return 0.0
+        
+        common = 0
+        for ancestor, entry_ancestor in zip(ancestors, entry_ancestors):
+            if ancestor != entry_ancestor:
+                break
+            common += 1
+        return (1 + common) / (1 + max(len(ancestors), len(entry_ancestors)))
+
+
+def get_fuzzy_suggestions(query: str, localization_db: List[Dict[str, Any]], threshold: float = 0.8, clean_placeholders: bool = True,
+                          fuzzy_index: Optional[FuzzyMatchIndex] = None) -> List[Dict[str, Any]]:
     """
     根据模糊匹配获取建议
     
@@ -118,10 +518,14 @@ def get_fuzzy_suggestions(query: str, localization_db: List[Dict[str, Any]], thr
         localization_db: 本地化数据库
         threshold: 相似度阈值
         clean_placeholders: 是否去除占位符后比较
+        fuzzy_index: 为localization_db建立的索引，提供时不再逐条比较
     
     Returns:
         List[Dict[str, Any]]: 模糊匹配建议列表，按相似度降序排序
     """
+    if fuzzy_index is not None and fuzzy_index.clean_placeholders == clean_placeholders:
+        return fuzzy_index.search(query, threshold)
+    
     suggestions = []
     
     for item in localization_db:
@@ -138,7 +542,8 @@ def get_fuzzy_suggestions(query: str, localization_db: List[Dict[str, Any]], thr
     return suggestions
 
 
-def get_contextual_suggestions(yaml_item: Dict[str, Any], localization_db: List[Dict[str, Any]], max_suggestions: int = 5) -> List[Dict[str, Any]]:
+def get_contextual_suggestions(yaml_item: Dict[str, Any], localization_db: List[Dict[str, Any]], max_suggestions: int = 5,
+                               context_index: Optional[ContextSignatureIndex] = None) -> List[Dict[str, Any]]:
     """
     根据上下文获取建议
     
@@ -146,10 +551,14 @@ def get_contextual_suggestions(yaml_item: Dict[str, Any], localization_db: List[
         yaml_item: YAML映射项
         localization_db: 本地化数据库
         max_suggestions: 最大建议数量
+        context_index: 为localization_db建立的上下文签名索引，提供时不再逐条比较
     
     Returns:
         List[Dict[str, Any]]: 上下文匹配建议列表
     """
+    if context_index is not None:
+        return context_index.contextual(yaml_item, max_suggestions)
+    
     suggestions = []
     
     # 检查yaml_item是否包含上下文信息
@@ -176,7 +585,9 @@ def get_contextual_suggestions(yaml_item: Dict[str, Any], localization_db: List[
     return suggestions[:max_suggestions]
 
 
-def get_combined_suggestions(yaml_item: Dict[str, Any], localization_db: List[Dict[str, Any]], threshold: float = 0.8, max_suggestions: int = 5) -> List[Dict[str, Any]]:
+def get_combined_suggestions(yaml_item: Dict[str, Any], localization_db: List[Dict[str, Any]], threshold: float = 0.8, max_suggestions: int = 5,
+                             fuzzy_index: Optional[FuzzyMatchIndex] = None,
+                             context_index: Optional[ContextSignatureIndex] = None) -> List[Dict[str, Any]]:
     """
     获取综合建议(上下文匹配 + 模糊匹配)
     
@@ -185,16 +596,42 @@ def get_combined_suggestions(yaml_item: Dict[str, Any], localization_db: List[Di
         localization_db: 本地化数据库
         threshold: 模糊匹配阈值
         max_suggestions: 最大建议数量
+        fuzzy_index: 为localization_db建立的模糊匹配索引
+        context_index: 为localization_db建立的上下文签名索引
     
     Returns:
         List[Dict[str, Any]]: 综合建议列表
     """
     # 获取上下文建议
-    contextual_suggestions = get_contextual_suggestions(yaml_item, localization_db, max_suggestions)
+    contextual_suggestions = get_contextual_suggestions(yaml_item, localization_db, max_suggestions, context_index)
     
     # 获取模糊匹配建议
-    fuzzy_suggestions = get_fuzzy_suggestions(yaml_item["original"], localization_db, threshold)
+    fuzzy_suggestions = get_fuzzy_suggestions(yaml_item["original"], localization_db, threshold,
+                                              fuzzy_index=fuzzy_index)
+    
+    return merge_combined_suggestions(contextual_suggestions, fuzzy_suggestions, max_suggestions)
+
+
+def get_suggestion_key(item: Dict[str, Any]) -> Tuple[Any, Any]:
+    """
+    获取建议的去重键，本地化数据库和翻译记忆库中的记录ID可能重复，按(原始字符串, 译文)去重
+    """
+    return item.get("original"), item.get("translated")
+
+
+def merge_combined_suggestions(contextual_suggestions: List[Dict[str, Any]], fuzzy_suggestions: List[Dict[str, Any]],
+                               max_suggestions: int = 5) -> List[Dict[str, Any]]:
+    """
+    合并上下文建议和模糊匹配建议
     
+    Args:
+        contextual_suggestions: get_contextual_suggestions的结果
+        fuzzy_suggestions: get_fuzzy_suggestions的结果
+        max_suggestions: 最大建议数量
+    
+    Returns:
+        List[Dict[str, Any]]: 综合建议列表
+    """
     # 合并结果(优先显示上下文匹配)
     all_suggestions = []
     
@@ -207,9 +644,9 @@ def get_combined_suggestions(yaml_item: Dict[str, Any], localization_db: List[Di
         })
     
     # 添加模糊匹配建议，去除重复项
-    seen_ids = {s["item"]["id"] for s in all_suggestions}
+    seen_keys = {get_suggestion_key(s["item"]) for s in all_suggestions}
     for suggestion in fuzzy_suggestions:
-        if suggestion["item"]["id"] not in seen_ids:
+        if get_suggestion_key(suggestion["item"]) not in seen_keys:
             all_suggestions.append({
                 "item": suggestion["item"],
                 "type": "fuzzy",
@@ -221,11 +658,12 @@ def get_combined_suggestions(yaml_item: Dict[str, Any], localization_db: List[Di
     
     # 去重并返回前N个建议
     unique_suggestions = []
-    seen_ids = set()
+    seen_keys = set()
     for suggestion in all_suggestions:
-        if suggestion["item"]["id"] not in seen_ids:
+        key = get_suggestion_key(suggestion["item"])
+        if key not in seen_keys:
             unique_suggestions.append(suggestion)
-            seen_ids.add(suggestion["item"]["id"])
+            seen_keys.add(key)
             if len(unique_suggestions) >= max_suggestions:
                 break
     
@@ -248,6 +686,54 @@ def get_combined_score(context_match: float, similarity: float, context_weight:
     return (context_match * context_weight) + (similarity * similarity_weight)
 
 
+def get_ranked_suggestions(yaml_item: Dict[str, Any], localization_db: List[Dict[str, Any]], threshold: float = 0.8,
+                           max_suggestions: int = 5, fuzzy_index: Optional[FuzzyMatchIndex] = None,
+                           context_index: Optional[ContextSignatureIndex] = None,
+                           context_weight: float = 0.7, similarity_weight: float = 0.3) -> List[Dict[str, Any]]:
+    """
+    按综合评分获取建议
+    
+    候选来自模糊匹配索引和上下文签名索引的同一分桶，用get_combined_score对上下文匹配度和相似度加权排序。
+    
+    Args:
+        yaml_item: YAML映射项
+        localization_db: 本地化数据库
+        threshold: 模糊匹配阈值
+        max_suggestions: 最大建议数量
+        fuzzy_index: 为localization_db建立的模糊匹配索引
+        context_index: 为localization_db建立的上下文签名索引，默认临时建立
+        context_weight: 上下文权重
+        similarity_weight: 相似度权重
+    
+    Returns:
+        List[Dict[str, Any]]: 建议列表，按综合评分降序排序，每条建议包含item、type、similarity和score
+    """
+    if context_index is None:
+        context_index = ContextSignatureIndex(localization_db)
+    context = yaml_item.get("context") or {}
+    
+    candidates: Dict[Any, Dict[str, Any]] = {}
+    for suggestion in get_fuzzy_suggestions(yaml_item["original"], localization_db, threshold, fuzzy_index=fuzzy_index):
+        candidates.setdefault(suggestion["item"]["id"], {"item": suggestion["item"], "similarity": suggestion["similarity"]})
+    for entry in context_index.bucket(context)[:CONTEXT_BUCKET_CANDIDATES]:
+        if entry["id"] not in candidates:
+            candidates[entry["id"]] = {"item": entry,
+                                       "similarity": calculate_similarity(yaml_item["original"], entry["original"])}
+    
+    ranked = []
+    for candidate in candidates.values():
+        context_match = context_index.context_match(context, candidate["item"])
+        ranked.append({
+            "item": candidate["item"],
+            "type": "contextual" if context_match >= 1.0 else "fuzzy",
+            "similarity": candidate["similarity"],
+            "score": get_combined_score(context_match, candidate["similarity"], context_weight, similarity_weight)
+        })
+    
+    ranked.sort(key=lambda x: x["score"], reverse=True)
+    return ranked[:max_suggestions]
+
+
 def find_best_match(query: str, candidates: List[str], clean_placeholders: bool = True) -> Tuple[str, float]:
     """
     找到与查询字符串最匹配的候选字符串
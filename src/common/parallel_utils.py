@@ -3,37 +3,168 @@
 并行处理工具模块
 
 该模块提供了并行文件处理的功能，用于加速字符串提取和翻译回写等操作。
+任务按分块提交，执行中的分块数量有上限，结果在完成时以流的方式返回。
 """
 
 import os
 import time
-from typing import List, Callable, Any, Dict
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from itertools import islice
+from typing import List, Callable, Any, Dict, Iterable, Iterator, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+
+def _run_chunk(worker_func: Callable[..., Any], chunk: List[Any], args: Tuple[Any, ...],
+               kwargs: Dict[str, Any]) -> List[Tuple[Any, Any, Optional[str], float]]:
+    """
+    在工作线程/进程中处理一个分块，逐项记录结果、错误和耗时
+
+    Args:
+        worker_func: 处理单个任务的函数
+        chunk: 任务列表
+        args: 传给worker_func的额外位置参数
+        kwargs: 传给worker_func的额外关键字参数
+
+    Returns:
+        List[Tuple[Any, Any, Optional[str], float]]: 每个任务的(任务, 结果, 错误信息, 耗时)
+    """
+    outcomes = []
+    for item in chunk:
+        start_time = time.perf_counter()
+        try:
+            result = worker_func(item, *args, **kwargs)
+            outcomes.append((item, result, None, time.perf_counter() - start_time))
+        except Exception as e:
+            outcomes.append((item, None, f"{type(e).__name__}: {e}", time.perf_counter() - start_time))
+    return outcomes
+
+
+def chunk_items(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """
+    将任务按固定大小分块，输入可以是任意可迭代对象
+
+    Args:
+        items: 任务
+        chunk_size: 每个分块的任务数
+
+    Yields:
+        List[Any]: 任务分块
+    """
+    iterator = iter(items)
+    chunk_size = max(1, chunk_size)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
 
 
 class ParallelProcessor:
     """
-    并行处理器类，用于并行处理文件列表
+    并行处理器类，按分块调度任务并在任务完成时逐个返回结果
+
+    同时提交的分块数量受max_in_flight限制，任务输入和结果都不需要一次性保存在内存中。
     """
     
-    def __init__(self, max_workers: int = None, use_multiprocessing: bool = False):
+    def __init__(self, max_workers: int = None, use_multiprocessing: bool = False, chunk_size: int = 1,
+                 max_in_flight: int = None, initializer: Callable[..., Any] = None, initargs: Tuple[Any, ...] = ()):
         """
         初始化并行处理器
         
         Args:
             max_workers: 最大工作线程/进程数，默认为CPU核心数
             use_multiprocessing: 是否使用多进程模式，默认为多线程模式
+            chunk_size: 每次提交给工作线程/进程的任务数
+            max_in_flight: 同时提交的最大分块数，默认为工作数的2倍
+            initializer: 工作线程/进程启动时调用的初始化函数
+            initargs: 初始化函数的参数
         """
-        self.max_workers = max_workers
+        self.max_workers = max_workers or os.cpu_count() or 1
         self.use_multiprocessing = use_multiprocessing
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight or self.max_workers * 2
+        self.initializer = initializer
+        self.initargs = initargs
+    
+    def _create_executor(self) -> Any:
+        """
+        创建执行器，进程池不可用时回退到线程池
+        """
+        if self.use_multiprocessing:
+            try:
+                return ProcessPoolExecutor(max_workers=self.max_workers, initializer=self.initializer,
+                                           initargs=self.initargs)
+            except (OSError, NotImplementedError) as e:
+                print(f"[WARN] 无法创建进程池: {e}，改用多线程模式")
+        return ThreadPoolExecutor(max_workers=self.max_workers, initializer=self.initializer,
+                                  initargs=self.initargs)
+    
+    def iter_chunk_results(self, chunks: Iterable[List[Any]], worker_func: Callable[..., Any],
+                           *args: Any, **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        """
+        并行处理预先分好的任务分块，按完成顺序逐个返回每个任务的结果
+        
+        Args:
+            chunks: 任务分块
+            worker_func: 处理单个任务的函数，调用方式为worker_func(item, *args, **kwargs)，
+                多进程模式下必须是模块级函数
+            *args: 额外位置参数
+            **kwargs: 额外关键字参数
+        
+        Yields:
+            Dict[str, Any]: 任务结果，包含file、result、error和time(秒)
+        """
+        chunk_iter = iter(chunks)
+        with self._create_executor() as executor:
+            pending = {}
+            
+            def submit_next() -> bool:
+                chunk = next(chunk_iter, None)
+                if chunk is None:
+                    return False
+                pending[executor.submit(_run_chunk, worker_func, chunk, args, kwargs)] = chunk
+                return True
+            
+            # 只保持有限数量的分块在执行中
+            while len(pending) < self.max_in_flight and submit_next():
+                pass
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    try:
+                        outcomes = future.result()
+                    except Exception as e:
+                        # 工作进程异常退出等情况，整个分块的任务标记为失败
+                        outcomes = [(item, None, f"{type(e).__name__}: {e}", 0.0) for item in chunk]
+                    # 先补充新的分块，使工作线程/进程在结果被消费时保持忙碌
+                    submit_next()
+                    for item, result, error, elapsed in outcomes:
+                        yield {"file": item, "result": result, "error": error, "time": elapsed}
     
-    def process_files(self, file_paths: List[str], worker_func: Callable[[str], Any]) -> Dict[str, Any]:
+    def iter_results(self, items: Iterable[Any], worker_func: Callable[..., Any],
+                     *args: Any, **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        """
+        并行处理任务，按chunk_size分块，按完成顺序逐个返回每个任务的结果
+        
+        Args:
+            items: 任务(通常为文件路径)，可以是生成器
+            worker_func: 处理单个任务的函数，调用方式为worker_func(item, *args, **kwargs)
+            *args: 额外位置参数
+            **kwargs: 额外关键字参数
+        
+        Yields:
+            Dict[str, Any]: 任务结果，包含file、result、error和time(秒)
+        """
+        yield from self.iter_chunk_results(chunk_items(items, self.chunk_size), worker_func, *args, **kwargs)
+    
+    def process_files(self, file_paths: List[str], worker_func: Callable[..., Any],
+                      *args: Any, **kwargs: Any) -> Dict[str, Any]:
         """
         并行处理文件列表
         
         Args:
             file_paths: 要处理的文件路径列表
-            worker_func: 处理单个文件的函数
+            worker_func: 处理单个文件的函数，调用方式为worker_func(file_path, *args, **kwargs)
+            *args: 额外位置参数
+            **kwargs: 额外关键字参数
         
         Returns:
             Dict[str, Any]: 处理结果，包含成功、失败和耗时信息
@@ -45,27 +176,19 @@ class ParallelProcessor:
             "time": 0.0
         }
         
-        # 根据选择使用不同的执行器
-        ExecutorClass = ProcessPoolExecutor if self.use_multiprocessing else ThreadPoolExecutor
-        
-        with ExecutorClass(max_workers=self.max_workers) as executor:
-            # 提交所有任务
-            future_to_file = {executor.submit(worker_func, file_path): file_path for file_path in file_paths}
-            
-            # 处理结果
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
-                try:
-                    result = future.result()
-                    results["success"].append({
-                        "file": file_path,
-                        "result": result
-                    })
-                except Exception as e:
-                    results["failed"].append({
-                        "file": file_path,
-                        "error": str(e)
-                    })
+        for outcome in self.iter_results(file_paths, worker_func, *args, **kwargs):
+            if outcome["error"] is None:
+                results["success"].append({
+                    "file": outcome["file"],
+                    "result": outcome["result"],
+                    "time": outcome["time"]
+                })
+            else:
+                results["failed"].append({
+                    "file": outcome["file"],
+                    "error": outcome["error"],
+                    "time": outcome["time"]
+                })
         
         # 计算耗时
         results["time"] = time.time() - start_time
@@ -95,9 +218,13 @@ def get_all_source_files(root_dir: str, extensions: List[str]) -> List[str]:
 def batch_process_files(
     root_dir: str,
     extensions: List[str],
-    worker_func: Callable[[str], Any],
+    worker_func: Callable[..., Any],
     max_workers: int = None,
-    use_multiprocessing: bool = False
+    use_multiprocessing: bool = False,
+    *,
+    chunk_size: int = 1,
+    args: Tuple[Any, ...] = (),
+    kwargs: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     批量处理文件的便捷函数
@@ -108,6 +235,9 @@ def batch_process_files(
         worker_func: 处理单个文件的函数
         max_workers: 最大工作线程/进程数
         use_multiprocessing: 是否使用多进程模式
+        chunk_size: 每次提交给工作线程/进程的文件数
+        args: 传给worker_func的额外位置参数
+        kwargs: 传给worker_func的额外关键字参数
     
     Returns:
         Dict[str, Any]: 处理结果
@@ -124,7 +254,8 @@ def batch_process_files(
         }
     
     # 创建并行处理器并处理文件
-    processor = ParallelProcessor(max_workers=max_workers, use_multiprocessing=use_multiprocessing)
-    results = processor.process_files(source_files, worker_func)
+    processor = ParallelProcessor(max_workers=max_workers, use_multiprocessing=use_multiprocessing,
+                                  chunk_size=chunk_size)
+    results = processor.process_files(source_files, worker_func, *args, **(kwargs or {}))
     
     return results
@@ -8,7 +8,7 @@
 
 import json
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from .timestamp_utils import get_formatted_timestamp
 
@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+"""
+规则文件读写工具
+
+该模块包含规则文件的YAML读写层：
+1. 安装了libyaml时使用CSafeLoader加载，否则回退到纯Python实现
+2. 按映射项流式读取规则文件，统计或过滤规则时不需要把整个mappings列表保存在内存中
+3. 分批流式写入规则文件，输出与一次性yaml.dump(..., sort_keys=False)的布局一致；共享的子对象按值展开，不输出锚点
+4. 按固定字段计算规则的规范指纹；导入时是否跳过规则按要写入字段的完整值判断
+"""
+
+import hashlib
+from itertools import islice
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional
+
+import yaml
+from yaml.events import (AliasEvent, MappingEndEvent, MappingStartEvent, ScalarEvent, SequenceEndEvent,
+                         SequenceStartEvent, StreamEndEvent)
+from yaml.nodes import MappingNode, ScalarNode, SequenceNode
+
+# 优先使用libyaml实现的加载器
+try:
+    from yaml import CSafeLoader as SafeLoader
+    LIBYAML_AVAILABLE = True
+except ImportError:
+    from yaml import SafeLoader
+    LIBYAML_AVAILABLE = False
+
+# 输出固定使用纯Python实现：libyaml的输出器会转义BMP以外的字符，
+# 且按字节计算折行宽度，中文内容的输出与现有规则文件不一致
+from yaml import SafeDumper
+
+
+class RuleDumper(SafeDumper):
+    """
+    规则文件输出器，共享的子对象(例如同一个context字典)按值展开输出，不生成锚点和别名
+
+    分批输出时每次调用yaml.dump都会从&id001重新编号锚点，不同批次共享子对象时会产生重复锚点，
+    导致整个规则文件无法加载。
+    """
+
+    def ignore_aliases(self, data: Any) -> bool:
+        return True
+
+
+# 流式写入时每批输出的映射项数量
+DUMP_BATCH_SIZE = 1000
+
+# 规则文件的YAML输出参数
+_DUMP_OPTIONS = {"default_flow_style": False, "allow_unicode": True, "sort_keys": False}
+
+# 规则指纹包含的字段，按(所在字段, 键)排列，所在字段为None表示规则顶层
+FINGERPRINT_FIELDS = (
+    (None, "original"),
+    (None, "translated"),
+    (None, "status"),
+    (None, "placeholders"),
+    ("context", "node_type"),
+    ("context", "parent_types"),
+    ("context", "file"),
+    ("meta", "rel_path"),
+    ("meta", "file"),
+    ("meta", "line"),
+    ("meta", "column"),
+)
+
+# 指纹格式前缀，与旧版本用sha256(str(dict))[:16]生成的同样长度的指纹区分
+FINGERPRINT_PREFIX = "b2:"
+
+# 比较规则是否变更时忽略的时间戳字段
+RULE_TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+# 字段之间和列表元素之间的分隔符
+_FIELD_SEPARATOR = "\x1f"
+_ITEM_SEPARATOR = "\x1e"
+
+
+def load_yaml(stream: Any) -> Any:
+    """
+    加载YAML内容
+
+    Args:
+        stream: 文件对象或字符串
+
+    Returns:
+        Any: 解析后的数据
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def dump_yaml(data: Any, stream: Optional[IO[str]] = None) -> Optional[str]:
+    """
+    按规则文件的格式输出YAML
+
+    Args:
+        data: 要输出的数据
+        stream: 文件对象，为None时返回字符串
+
+    Returns:
+        Optional[str]: stream为None时返回YAML字符串
+    """
+    return yaml.dump(data, stream, Dumper=RuleDumper, **_DUMP_OPTIONS)
+
+
+class _NodeReader:
+    """
+    基于解析事件逐个组装节点，只在需要时构造单个映射项
+    """
+
+    def __init__(self, loader: Any):
+        self.loader = loader
+        self.anchors: Dict[str, Any] = {}
+
+    def next_event(self) -> Any:
+        return self.loader.get_event()
+
+    def peek_event(self) -> Any:
+        return self.loader.peek_event()
+
+    def compose(self, event: Any) -> Any:
+        """
+        从已读取的起始事件组装完整节点
+        """
+        if isinstance(event, AliasEvent):
+            if event.anchor not in self.anchors:
+                raise yaml.composer.ComposerError(None, None, f"found undefined alias {event.anchor}",
+                                                  event.start_mark)
+            return self.anchors[event.anchor]
+
+        if isinstance(event, ScalarEvent):
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = self.loader.resolve(ScalarNode, event.value, event.implicit)
+            node = ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+        elif isinstance(event, SequenceStartEvent):
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = self.loader.resolve(SequenceNode, None, event.implicit)
+            node = SequenceNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+            if event.anchor is not None:
+                self.anchors[event.anchor] = node
+            while not isinstance(self.peek_event(), SequenceEndEvent):
+                node.value.append(self.compose(self.next_event()))
+            node.end_mark = self.next_event().end_mark
+            return node
+        elif isinstance(event, MappingStartEvent):
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = self.loader.resolve(MappingNode, None, event.implicit)
+            node = MappingNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+            if event.anchor is not None:
+                self.anchors[event.anchor] = node
+            while not isinstance(self.peek_event(), MappingEndEvent):
+                key_node = self.compose(self.next_event())
+                value_node = self.compose(self.next_event())
+                node.value.append((key_node, value_node))
+            node.end_mark = self.next_event().end_mark
+            return node
+        else:
+            raise yaml.composer.ComposerError(None, None, f"unexpected event {event}", event.start_mark)
+
+        if event.anchor is not None:
+            self.anchors[event.anchor] = node
+        return node
+
+    def skip(self, event: Any) -> None:
+        """
+        跳过已读取起始事件的节点，不组装也不构造
+        """
+        if isinstance(event, (ScalarEvent, AliasEvent)) and event.anchor is None:
+            return
+        if isinstance(event, (SequenceStartEvent, MappingStartEvent)) and event.anchor is None:
+            depth = 1
+            while depth:
+                inner = self.next_event()
+                if isinstance(inner, (SequenceStartEvent, MappingStartEvent)):
+                    if inner.anchor is not None:
+                        # 被跳过的部分定义了锚点，后续可能通过别名引用，改为完整组装
+                        self.anchors[inner.anchor] = self.compose(inner)
+                        continue
+                    depth += 1
+                elif isinstance(inner, (SequenceEndEvent, MappingEndEvent)):
+                    depth -= 1
+                elif isinstance(inner, ScalarEvent) and inner.anchor is not None:
+                    self.compose(inner)
+            return
+        self.compose(event)
+
+    def construct(self, node: Any) -> Any:
+        return self.loader.construct_document(node)
+
+
+def _iter_rule_document(file_path: str, on_metadata: Callable[[str, Any], None] = None,
+                        load_items: bool = True) -> Iterator[Any]:
+    """
+    流式读取规则文件，逐个返回映射项
+
+    支持与load_yaml_mappings相同的格式：带有mappings字段的字典、映射列表或单个映射。
+
+    Args:
+        file_path: 规则文件路径
+        on_metadata: mappings以外的顶层字段回调，参数为(键, 值)
+        load_items: 为False时跳过所有映射项，只读取元数据
+
+    Yields:
+        Any: 映射项
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        loader = SafeLoader(f)
+        try:
+            reader = _NodeReader(loader)
+            reader.next_event()  # StreamStartEvent
+            if isinstance(reader.peek_event(), StreamEndEvent):
+                return
+            reader.next_event()  # DocumentStartEvent
+            event = reader.next_event()
+
+            if isinstance(event, SequenceStartEvent):
+                # 传统列表格式
+                while not isinstance(reader.peek_event(), SequenceEndEvent):
+                    item_event = reader.next_event()
+                    if load_items:
+                        yield reader.construct(reader.compose(item_event))
+                    else:
+                        reader.skip(item_event)
+                return
+
+            if not isinstance(event, MappingStartEvent):
+                data = reader.construct(reader.compose(event))
+                if data and load_items:
+                    yield data
+                return
+
+            # 字典格式，逐个读取顶层字段，只展开mappings列表
+            top_level = MappingNode("tag:yaml.org,2002:map", [], event.start_mark, None)
+            has_mappings = False
+            while not isinstance(reader.peek_event(), MappingEndEvent):
+                key_node = reader.compose(reader.next_event())
+                key = reader.construct(key_node)
+                value_event = reader.next_event()
+                if key == "mappings":
+                    has_mappings = True
+                    if isinstance(value_event, SequenceStartEvent):
+                        while not isinstance(reader.peek_event(), SequenceEndEvent):
+                            item_event = reader.next_event()
+                            if load_items:
+                                yield reader.construct(reader.compose(item_event))
+                            else:
+                                reader.skip(item_event)
+                        reader.next_event()  # SequenceEndEvent
+                    elif load_items:
+                        value = reader.construct(reader.compose(value_event))
+                        if value:
+                            yield value
+                    else:
+                        reader.skip(value_event)
+                    continue
+                value_node = reader.compose(value_event)
+                if on_metadata is not None:
+                    on_metadata(key, reader.construct(value_node))
+                if not has_mappings:
+                    top_level.value.append((key_node, value_node))
+
+            # 没有mappings字段的字典作为单个映射
+            if not has_mappings and load_items and top_level.value:
+                yield reader.construct(top_level)
+        finally:
+            loader.dispose()
+
+
+def iter_rule_file(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    流式读取规则文件中的映射项
+
+    Args:
+        file_path: 规则文件路径
+
+    Yields:
+        Dict[str, Any]: 映射项
+    """
+    yield from _iter_rule_document(file_path)
+
+
+def read_rule_file_metadata(file_path: str) -> Dict[str, Any]:
+    """
+    读取规则文件mappings以外的顶层字段，跳过映射项而不构造它们
+
+    Args:
+        file_path: 规则文件路径
+
+    Returns:
+        Dict[str, Any]: 顶层字段，不是字典格式的规则文件返回空字典
+    """
+    metadata = {}
+    for _ in _iter_rule_document(file_path, on_metadata=metadata.__setitem__, load_items=False):
+        pass
+    return metadata
+
+
+def count_rule_file(file_path: str, predicate: Callable[[Dict[str, Any]], bool] = None) -> int:
+    """
+    流式统计规则文件中的映射项数量
+
+    Args:
+        file_path: 规则文件路径
+        predicate: 过滤条件，为None时统计全部映射项
+
+    Returns:
+        int: 映射项数量
+    """
+    return sum(1 for item in iter_rule_file(file_path) if predicate is None or predicate(item))
+
+
+def write_rule_items(stream: IO[str], items: Iterable[Any], batch_size: int = DUMP_BATCH_SIZE) -> int:
+    """
+    分批将映射项写为YAML序列，输出与一次性输出整个列表一致
+
+    Args:
+        stream: 文件对象
+        items: 映射项，可以是生成器
+        batch_size: 每批输出的映射项数量
+
+    Returns:
+        int: 写入的映射项数量
+    """
+    iterator = iter(items)
+    count = 0
+    while True:
+        batch: List[Any] = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        dump_yaml(batch, stream)
+        count += len(batch)
+    if count == 0:
+        # 与输出空列表一致
+        dump_yaml([], stream)
+    return count
+
+
+def write_rule_file(stream: IO[str], metadata: Dict[str, Any], items: Iterable[Any],
+                    batch_size: int = DUMP_BATCH_SIZE) -> int:
+    """
+    流式写入带有元数据的规则文件，mappings字段位于所有元数据之后
+
+    Args:
+        stream: 文件对象，注释头由调用方写入
+        metadata: mappings以外的顶层字段，按顺序输出
+        items: 映射项，可以是生成器
+        batch_size: 每批输出的映射项数量
+
+    Returns:
+        int: 写入的映射项数量
+    """
+    if metadata:
+        dump_yaml(metadata, stream)
+
+    iterator = iter(items)
+    first_batch = list(islice(iterator, batch_size))
+    if not first_batch:
+        dump_yaml({"mappings": []}, stream)
+        return 0
+
+    stream.write("mappings:\n")
+    dump_yaml(first_batch, stream)
+    count = len(first_batch)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return count
+        dump_yaml(batch, stream)
+        count += len(batch)
+
+
+def _fingerprint_value(value: Any) -> str:
+    """
+    将字段值转换为规范字符串，列表按元素顺序拼接，占位符只取示例
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return _ITEM_SEPARATOR.join(
+            _fingerprint_value(item.get("example") if isinstance(item, dict) else item) for item in value)
+    return str(value)
+
+
+def rule_fingerprint(rule: Dict[str, Any]) -> str:
+    """
+    计算规则的规范指纹
+
+    只读取FINGERPRINT_FIELDS中的固定字段并按固定顺序拼接后计算blake2b哈希，
+    结果与字典的键顺序无关，不同进程和运行之间保持一致。
+
+    Args:
+        rule: 规则字典
+
+    Returns:
+        str: 带FINGERPRINT_PREFIX前缀的16位十六进制指纹
+    """
+    parts = []
+    for section, key in FINGERPRINT_FIELDS:
+        container = rule if section is None else rule.get(section)
+        parts.append(_fingerprint_value(container.get(key)) if isinstance(container, dict) else "")
+    digest = hashlib.blake2b(_FIELD_SEPARATOR.join(parts).encode("utf-8"), digest_size=8).hexdigest()
+    return FINGERPRINT_PREFIX + digest
+
+
+def compute_fingerprints(rules: Iterable[Dict[str, Any]], store: bool = False) -> List[str]:
+    """
+    批量计算规则指纹
+
+    Args:
+        rules: 规则列表
+        store: 是否把指纹缓存到规则的fingerprint字段
+
+    Returns:
+        List[str]: 与规则顺序一致的指纹列表
+    """
+    fingerprints = []
+    for rule in rules:
+        fingerprint = rule_fingerprint(rule)
+        if store:
+            rule["fingerprint"] = fingerprint
+        fingerprints.append(fingerprint)
+    return fingerprints
+
+
+def upgrade_fingerprints(rules: Iterable[Dict[str, Any]]) -> int:
+    """
+    重新计算旧格式(不带FINGERPRINT_PREFIX前缀)的缓存指纹，没有指纹的规则保持不变
+
+    Args:
+        rules: 规则列表
+
+    Returns:
+        int: 升级的指纹数量
+    """
+    legacy = [rule for rule in rules
+              if "fingerprint" in rule and not str(rule["fingerprint"]).startswith(FINGERPRINT_PREFIX)]
+    compute_fingerprints(legacy, store=True)
+    return len(legacy)
+
+
+def is_rule_unchanged(rule: Dict[str, Any], updates: Dict[str, Any], ignore_fields: Iterable[str] = ()) -> bool:
+    """
+    判断把updates写入规则后规则是否保持不变
+
+    比较要写入的每个字段的完整值，而不是指纹：指纹只覆盖固定的字段子集，
+    不能用于判断导入时是否可以跳过规则。
+
+    Args:
+        rule: 现有规则
+        updates: 要写入的字段
+        ignore_fields: 不参与比较的字段，例如RULE_TIMESTAMP_FIELDS
+
+    Returns:
+        bool: 所有要写入的字段都已存在且值相等时返回True
+    """
+    missing = object()
+    ignored = set(ignore_fields)
+    return all(rule.get(field, missing) == value for field, value in updates.items() if field not in ignored)
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+规则文件索引工具
+
+该模块为rich规则文件生成紧凑的二进制旁路索引(.rules.idx)，
+按ID、状态或原始字符串查找规则时只需读取并解析对应的单条记录，不需要解析整个规则文件。
+
+索引文件布局(小端序)：
+1. 文件头：魔数、版本、记录数、元数据长度、ID区长度、规则文件大小和修改时间
+2. 元数据(JSON)：规则文件哈希、状态表和规则文件顶层字段
+3. 记录表：按规则ID排序的定长记录(记录偏移、ID偏移、记录长度、ID长度、原始字符串哈希、状态编号)
+4. ID区：所有规则ID的UTF-8字节
+
+规则文件的大小和修改时间未变化时直接使用索引，否则比较内容哈希，不一致时索引失效。
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache_utils import HASH_ALGORITHM, hash_file
+from .rule_io import iter_rule_file, load_yaml
+
+# 索引文件格式
+INDEX_MAGIC = b"RIDX"
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".rules.idx"
+
+# 文件头：魔数、版本、记录数、元数据长度、ID区长度、规则文件大小、规则文件修改时间(ns)
+_HEADER = struct.Struct("<4sIIIQQq")
+# 记录：记录偏移、ID偏移、记录长度、ID长度、原始字符串哈希、状态编号
+_ENTRY = struct.Struct("<QQIIQB7x")
+
+
+def get_index_path(rules_file: str) -> str:
+    """
+    获取规则文件对应的索引文件路径
+
+    Args:
+        rules_file: 规则文件路径
+
+    Returns:
+        str: 索引文件路径，例如rich_rules.yaml对应rich_rules.rules.idx
+    """
+    return os.path.splitext(rules_file)[0] + INDEX_SUFFIX
+
+
+def _hash_original(original: Any) -> int:
+    """
+    计算原始字符串的64位哈希
+    """
+    digest = hashlib.blake2b(str(original).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _scan_records(rules_file: str) -> Tuple[List[Tuple[int, int]], Dict[str, Any]]:
+    """
+    扫描规则文件，找出每条映射记录的字节范围
+
+    规则文件由yaml.dump以块格式输出，mappings列表位于第0列，每条记录以"-"开头，
+    记录内部的内容都有缩进，因此不需要解析YAML即可定位记录边界。
+
+    Args:
+        rules_file: 规则文件路径
+
+    Returns:
+        Tuple[List[Tuple[int, int]], Dict[str, Any]]: (每条记录的(偏移, 长度), mappings之前的顶层字段)
+    """
+    records: List[Tuple[int, int]] = []
+    header = bytearray()
+    in_mappings = False
+    seen_content = False
+    record_start = None
+    offset = 0
+
+    with open(rules_file, "rb") as f:
+        for line in f:
+            if in_mappings:
+                if line.startswith(b"-"):
+                    if record_start is not None:
+                        records.append((record_start, offset - record_start))
+                    record_start = offset
+                elif line[:1] not in (b" ", b"\t", b"\r", b"\n", b"#"):
+                    # mappings之后的其他顶层字段，记录结束
+                    if record_start is not None:
+                        records.append((record_start, offset - record_start))
+                        record_start = None
+                    in_mappings = False
+            elif not records and record_start is None:
+                stripped = line.strip()
+                if line.startswith(b"-") and not seen_content:
+                    # 传统列表格式
+                    in_mappings = True
+                    record_start = offset
+                elif stripped == b"mappings:":
+                    in_mappings = True
+                elif stripped and not stripped.startswith(b"#"):
+                    seen_content = True
+                    if not stripped.startswith(b"mappings:"):
+                        header += line
+            offset += len(line)
+
+    if record_start is not None:
+        records.append((record_start, offset - record_start))
+
+    metadata = load_yaml(header.decode("utf-8")) if header else None
+    return records, metadata if isinstance(metadata, dict) else {}
+
+
+def build_rules_index(rules_file: str, rules: Optional[Iterable[Dict[str, Any]]] = None) -> bool:
+    """
+    为规则文件生成旁路索引
+
+    Args:
+        rules_file: 规则文件路径
+        rules: 规则文件中的规则，顺序与文件一致；为None时从规则文件流式读取
+
+    Returns:
+        bool: 是否生成成功
+    """
+    index_path = get_index_path(rules_file)
+    try:
+        stat = os.stat(rules_file)
+        file_hash = hash_file(rules_file)
+        records, metadata = _scan_records(rules_file)
+        rules = iter_rule_file(rules_file) if rules is None else rules
+
+        statuses: Dict[str, int] = {}
+        entries = []
+        for position, rule in enumerate(rules):
+            if position >= len(records):
+                raise ValueError(f"规则数量多于文件中的记录数量({len(records)})")
+            record_offset, record_length = records[position]
+            status_code = statuses.setdefault(str(rule.get("status", "")), len(statuses))
+            entries.append((str(rule.get("id", "")).encode("utf-8"), record_offset, record_length,
+                            _hash_original(rule.get("original", "")), status_code))
+        if len(entries) != len(records):
+            raise ValueError(f"规则数量({len(entries)})与文件中的记录数量({len(records)})不一致")
+        if len(statuses) > 255:
+            raise ValueError("规则状态种类过多")
+
+        entries.sort(key=lambda entry: entry[0])
+        id_blob = bytearray()
+        packed = bytearray()
+        for rule_id, record_offset, record_length, original_hash, status_code in entries:
+            packed += _ENTRY.pack(record_offset, len(id_blob), record_length, len(rule_id), original_hash,
+                                  status_code)
+            id_blob += rule_id
+
+        meta = json.dumps({
+            "hash_algorithm": HASH_ALGORITHM,
+            "file_hash": file_hash,
+            "statuses": list(statuses),
+            "metadata": metadata,
+        }, ensure_ascii=False, default=str).encode("utf-8")
+
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(entries), len(meta), len(id_blob),
+                                 stat.st_size, stat.st_mtime_ns))
+            f.write(meta)
+            f.write(packed)
+            f.write(id_blob)
+        os.replace(tmp_path, index_path)
+        return True
+    except Exception as e:
+        print(f"[WARN] 生成规则索引失败: {index_path} - {e}")
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        return False
+
+
+class RulesIndex:
+    """
+    规则文件索引
+    通过mmap读取索引，按需定位并解析单条规则记录
+    """
+
+    def __init__(self, rules_file: str, index_file, index_map: mmap.mmap, header: Tuple[Any, ...],
+                 meta: Dict[str, Any]):
+        """
+        初始化规则索引，请使用RulesIndex.open打开
+
+        Args:
+            rules_file: 规则文件路径
+            index_file: 索引文件对象
+            index_map: 索引文件的内存映射
+            header: 解析后的文件头
+            meta: 索引元数据
+        """
+        self.rules_file = rules_file
+        self._index_file = index_file
+        self._map = index_map
+        self.count = header[2]
+        self._entries_offset = _HEADER.size + header[3]
+        self._ids_offset = self._entries_offset + self.count * _ENTRY.size
+        self.statuses: List[str] = meta.get("statuses", [])
+        self.metadata: Dict[str, Any] = meta.get("metadata") or {}
+        self._rules_handle = None
+
+    @classmethod
+    def open(cls, rules_file: str) -> Optional["RulesIndex"]:
+        """
+        打开规则文件的索引，索引不存在、格式不符或已失效时返回None
+
+        Args:
+            rules_file: 规则文件路径
+
+        Returns:
+            Optional[RulesIndex]: 规则索引
+        """
+        index_path = get_index_path(rules_file)
+        if not os.path.exists(index_path) or not os.path.exists(rules_file):
+            return None
+
+        index_file = open(index_path, "rb")
+        try:
+            index_map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            index_file.close()
+            return None
+
+        try:
+            header = _HEADER.unpack_from(index_map, 0)
+            if header[0] != INDEX_MAGIC or header[1] != INDEX_VERSION:
+                raise ValueError("索引格式不符")
+            meta = json.loads(index_map[_HEADER.size:_HEADER.size + header[3]].decode("utf-8"))
+
+            # 文件状态未变化时直接使用索引，否则校验内容哈希
+            stat = os.stat(rules_file)
+            if (stat.st_size, stat.st_mtime_ns) != (header[5], header[6]):
+                if meta.get("hash_algorithm") != HASH_ALGORITHM or meta.get("file_hash") != hash_file(rules_file):
+                    raise ValueError("规则文件已变更")
+            return cls(rules_file, index_file, index_map, header, meta)
+        except (ValueError, struct.error, OSError):
+            index_map.close()
+            index_file.close()
+            return None
+
+    def close(self) -> None:
+        """
+        关闭索引文件和规则文件
+        """
+        if self._rules_handle is not None:
+            self._rules_handle.close()
+            self._rules_handle = None
+        self._map.close()
+        self._index_file.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _entry(self, position: int) -> Tuple[int, int, int, int, int, int]:
+        return _ENTRY.unpack_from(self._map, self._entries_offset + position * _ENTRY.size)
+
+    def _entry_id(self, entry: Tuple[int, ...]) -> bytes:
+        start = self._ids_offset + entry[1]
+        return self._map[start:start + entry[3]]
+
+    def _read_record(self, record_offset: int, record_length: int) -> Dict[str, Any]:
+        """
+        读取并解析单条规则记录
+        """
+        if self._rules_handle is None:
+            self._rules_handle = open(self.rules_file, "rb")
+        self._rules_handle.seek(record_offset)
+        data = load_yaml(self._rules_handle.read(record_length).decode("utf-8"))
+        if not isinstance(data, list) or len(data) != 1 or not isinstance(data[0], dict):
+            raise ValueError(f"无法解析规则记录: {self.rules_file}@{record_offset}")
+        return data[0]
+
+    def _iter_entries(self) -> Iterator[Tuple[int, int, int, int, int, int]]:
+        """
+        顺序遍历所有记录
+        """
+        return _ENTRY.iter_unpack(self._map[self._entries_offset:self._ids_offset])
+
+    def _read_entries(self, entries: List[Tuple[int, ...]]) -> List[Dict[str, Any]]:
+        """
+        按文件中的顺序读取多条记录，减少随机读取
+        """
+        return [self._read_record(entry[0], entry[2]) for entry in sorted(entries, key=lambda e: e[0])]
+
+    def get(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        """
+        根据规则ID获取规则，二分查找后只解析对应的记录
+
+        Args:
+            rule_id: 规则ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 规则字典，若不存在则返回None
+        """
+        target = str(rule_id).encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry_id(self._entry(middle)) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count:
+            entry = self._entry(low)
+            if self._entry_id(entry) == target:
+                return self._read_record(entry[0], entry[2])
+        return None
+
+    def find_by_status(self, status: str) -> List[Dict[str, Any]]:
+        """
+        根据状态获取规则
+
+        Args:
+            status: 规则状态
+
+        Returns:
+            List[Dict[str, Any]]: 符合条件的规则列表，按文件中的顺序
+        """
+        if status not in self.statuses:
+            return []
+        status_code = self.statuses.index(status)
+        return self._read_entries([entry for entry in self._iter_entries() if entry[5] == status_code])
+
+    def find_by_original(self, original: str) -> List[Dict[str, Any]]:
+        """
+        根据原始字符串获取规则，先比较哈希再校验原始字符串
+
+        Args:
+            original: 原始字符串
+
+        Returns:
+            List[Dict[str, Any]]: 符合条件的规则列表，按文件中的顺序
+        """
+        original_hash = _hash_original(original)
+        candidates = [entry for entry in self._iter_entries() if entry[4] == original_hash]
+        return [rule for rule in self._read_entries(candidates) if rule.get("original") == original]
@@ -8,14 +8,245 @@
 """
 
 import os
-import yaml
-import hashlib
 import shutil
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Iterator, Optional, Set
 
+from .rule_io import (compute_fingerprints, is_rule_unchanged, iter_rule_file, read_rule_file_metadata, rule_fingerprint,
+                      upgrade_fingerprints, write_rule_items)
+from .rules_index import RulesIndex, build_rules_index
 from .yaml_utils import load_yaml_mappings, save_yaml_mappings
 
+class RuleFieldIndex:
+    """
+    规则二级索引
+    按id、original、status和文件路径(context.file或meta.file)把字段值映射到规则，
+    并记录每条规则在规则列表中的位置，查询结果按规则列表中的顺序返回。
+    索引按规则对象记录，修改规则的被索引字段前需要先取快照，修改后调用reindex。
+    绕过索引直接修改规则或规则列表时，查询会校验候选规则的当前取值，
+    发现取值不一致、规则已不在列表中或规则数量变化时调用sync重新同步；
+    只把规则改成新取值的修改无法在查询时发现，修改后需要调用sync(RulesStore.refresh_indexes)。
+    """
+
+    FIELDS = ("id", "original", "status", "file")
+    # 与规则顶层字段一一对应的索引，可以直接用于等值查询
+    DIRECT_FIELDS = ("id", "original", "status")
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        """
+        为规则列表建立索引
+
+        Args:
+            rules: 规则列表，由调用方持有，列表被替换后需要重新建立索引
+        """
+        self.rules = rules
+        self._buckets: Dict[str, Dict[Any, Dict[int, Dict[str, Any]]]] = {field: {} for field in self.FIELDS}
+        # 字段值无法哈希的规则，查询时逐条比较
+        self._unhashable: Dict[str, Dict[int, Dict[str, Any]]] = {field: {} for field in self.FIELDS}
+        self._positions: Optional[Dict[int, int]] = None
+        # 每条规则建立索引时的取值，用于发现绕过索引的修改
+        self._values: Dict[int, tuple] = {}
+        for rule in rules:
+            self._add(rule, self.snapshot(rule))
+
+    @staticmethod
+    def field_values(rule: Dict[str, Any], field: str) -> tuple:
+        """
+        获取规则在某个索引上的取值
+
+        Args:
+            rule: 规则字典
+            field: 索引字段
+
+        Returns:
+            tuple: 取值列表，文件路径索引可能同时包含context.file和meta.file
+        """
+        if field != "file":
+            return (rule.get(field),)
+        values = []
+        for section in ("context", "meta"):
+            container = rule.get(section)
+            if isinstance(container, dict) and "file" in container and container["file"] not in values:
+                values.append(container["file"])
+        return tuple(values)
+
+    def snapshot(self, rule: Dict[str, Any]) -> Dict[str, tuple]:
+        """
+        记录规则当前的索引取值，用于修改规则后更新索引
+        """
+        return {field: self.field_values(rule, field) for field in self.FIELDS}
+
+    def _add(self, rule: Dict[str, Any], values: Dict[str, tuple]):
+        key = id(rule)
+        self._values[key] = (rule, values)
+        for field, field_values in values.items():
+            for value in field_values:
+                try:
+                    self._buckets[field].setdefault(value, {})[key] = rule
+                except TypeError:
+                    self._unhashable[field][key] = rule
+
+    def _remove(self, rule: Dict[str, Any], values: Dict[str, tuple]):
+        key = id(rule)
+        self._values.pop(key, None)
+        for field, field_values in values.items():
+            self._unhashable[field].pop(key, None)
+            for value in field_values:
+                try:
+                    bucket = self._buckets[field].get(value)
+                except TypeError:
+                    continue
+                if bucket is not None:
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del self._buckets[field][value]
+
+    def add(self, rule: Dict[str, Any]):
+        """
+        索引追加到规则列表末尾的规则
+        """
+        self._add(rule, self.snapshot(rule))
+        if self._positions is not None:
+            self._positions[id(rule)] = len(self.rules) - 1
+
+    def remove(self, rule: Dict[str, Any]):
+        """
+        移除已从规则列表删除的规则，规则列表中的位置随之失效
+        """
+        self._remove(rule, self._indexed_values(rule))
+        self._positions = None
+
+    def _indexed_values(self, rule: Dict[str, Any], default: Optional[Dict[str, tuple]] = None) -> Dict[str, tuple]:
+        entry = self._values.get(id(rule))
+        if entry is not None and entry[0] is rule:
+            return entry[1]
+        return default if default is not None else self.snapshot(rule)
+
+    def reindex(self, rule: Dict[str, Any], before: Dict[str, tuple]):
+        """
+        规则字段修改后更新索引
+
+        Args:
+            rule: 已修改的规则
+            before: 修改前通过snapshot记录的取值
+        """
+        before = self._indexed_values(rule, before)
+        after = self.snapshot(rule)
+        if after != before:
+            self._remove(rule, before)
+            self._add(rule, after)
+
+    def sync(self):
+        """
+        按规则当前的取值重新同步索引，只更新取值发生变化、新增或已删除的规则
+        """
+        present = set()
+        for rule in self.rules:
+            key = id(rule)
+            present.add(key)
+            entry = self._values.get(key)
+            values = self.snapshot(rule)
+            if entry is None or entry[0] is not rule:
+                if entry is not None:
+                    self._remove(entry[0], entry[1])
+                self._add(rule, values)
+            elif entry[1] != values:
+                self._remove(rule, entry[1])
+                self._add(rule, values)
+        for key, (rule, values) in list(self._values.items()):
+            if key not in present:
+                self._remove(rule, values)
+        self._positions = None
+
+    def invalidate_positions(self):
+        """
+        规则列表重新排序后调用，位置在下次需要时重新计算
+        """
+        self._positions = None
+
+    def position(self, rule: Dict[str, Any]) -> int:
+        """
+        获取规则在规则列表中的位置
+        """
+        if self._positions is None:
+            self._positions = {id(item): i for i, item in reversed(list(enumerate(self.rules)))}
+        return self._positions.get(id(rule), -1)
+
+    def _candidates(self, field: str, value: Any) -> List[Dict[str, Any]]:
+        if len(self._values) != len(self.rules):
+            self.sync()
+        candidates = self._bucket_candidates(field, value)
+        if not all(self._is_current(rule, field, value) for rule in candidates):
+            # 规则或规则列表在索引外被修改过
+            self.sync()
+            candidates = self._bucket_candidates(field, value)
+        return candidates
+
+    def _is_current(self, rule: Dict[str, Any], field: str, value: Any) -> bool:
+        position = self.position(rule)
+        if position < 0 or position >= len(self.rules) or self.rules[position] is not rule:
+            return False
+        return value in self.field_values(rule, field)
+
+    def _bucket_candidates(self, field: str, value: Any) -> List[Dict[str, Any]]:
+        try:
+            candidates = list(self._buckets[field].get(value, {}).values())
+        except TypeError:
+            candidates = []
+        unhashable = self._unhashable[field]
+        if unhashable:
+            candidates.extend(rule for rule in unhashable.values() if value in self.field_values(rule, field))
+        return candidates
+
+    def lookup(self, field: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        等值查询
+
+        Args:
+            field: 索引字段
+            value: 字段值
+
+        Returns:
+            List[Dict[str, Any]]: 符合条件的规则，按规则列表中的顺序
+        """
+        candidates = self._candidates(field, value)
+        if len(candidates) > 1:
+            candidates.sort(key=self.position)
+        return candidates
+
+    def first(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """
+        获取规则列表中第一条符合条件的规则
+        """
+        candidates = self._candidates(field, value)
+        if len(candidates) > 1:
+            return min(candidates, key=self.position)
+        return candidates[0] if candidates else None
+
+    def query(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        按顶层字段等值条件查询规则
+        条件中有被索引的字段时从最小的索引桶开始逐条校验其余条件，否则顺序扫描
+
+        Args:
+            filters: 查询条件，例如{"status": "translated"}
+
+        Returns:
+            List[Dict[str, Any]]: 符合条件的规则，按规则列表中的顺序
+        """
+        best = None
+        for field in self.DIRECT_FIELDS:
+            if field in filters:
+                candidates = self._candidates(field, filters[field])
+                if best is None or len(candidates) < len(best):
+                    best = candidates
+        if best is None:
+            best = self.rules
+        result = [rule for rule in best if all(rule.get(key) == value for key, value in filters.items())]
+        if best is not self.rules and len(result) > 1:
+            result.sort(key=self.position)
+        return result
+
 
 class RulesStore:
     """
@@ -31,7 +262,11 @@ class RulesStore:
             rules_file: 规则文件路径
         """
         self.rules_file = rules_file
-        self.rules: List[Dict[str, Any]] = []
+        self._rules: Optional[List[Dict[str, Any]]] = []
+        # 延迟加载时使用的规则索引，规则列表被完整加载后释放
+        self._index: Optional[RulesIndex] = None
+        # 内存中规则列表的二级索引，首次查询时建立
+        self._indexes: Optional[RuleFieldIndex] = None
         self.metadata: Dict[str, Any] = {
             "version": "1.0",
             "created_at": datetime.now().isoformat(),
@@ -43,6 +278,79 @@ class RulesStore:
         if rules_file:
             self.set_rules_file(rules_file)
     
+    @property
+    def rules(self) -> List[Dict[str, Any]]:
+        """
+        规则列表，延迟加载时首次访问会完整加载规则文件
+        """
+        if self._rules is None:
+            self._materialize()
+        return self._rules
+
+    @rules.setter
+    def rules(self, rules: List[Dict[str, Any]]):
+        self._close_index()
+        self._rules = rules
+        self._indexes = None
+
+    def _get_indexes(self) -> RuleFieldIndex:
+        """
+        获取规则列表的二级索引，不存在时建立
+        """
+        rules = self.rules
+        if self._indexes is None:
+            self._indexes = RuleFieldIndex(rules)
+        return self._indexes
+
+    def refresh_indexes(self):
+        """
+        直接修改rules中的规则后调用，按规则当前的取值同步二级索引
+        通过add_rule、update_rule等方法修改时不需要调用
+        """
+        if self._indexes is not None:
+            self._indexes.sync()
+
+    def _close_index(self):
+        """
+        释放规则索引
+        """
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    def _materialize(self):
+        """
+        完整加载规则文件，替换延迟加载使用的索引
+        """
+        rules: List[Dict[str, Any]] = []
+        try:
+            rules = load_yaml_mappings(self.rules_file)
+            upgrade_fingerprints(rules)
+        except Exception as e:
+            print(f"[ERROR] 加载规则文件失败: {self.rules_file} - {e}")
+        self.rules = rules
+        self._sort_rules()
+
+    def _query_index(self, query, *args):
+        """
+        通过规则索引查询，索引记录无法解析时回退到完整加载
+
+        Args:
+            query: RulesIndex的查询方法名
+            args: 查询参数
+
+        Returns:
+            Any: 查询结果，未使用索引时返回None
+        """
+        if self._rules is not None or self._index is None:
+            return None
+        try:
+            return getattr(self._index, query)(*args)
+        except Exception as e:
+            print(f"[WARN] 规则索引读取失败，改为完整加载: {self.rules_file} - {e}")
+            self._materialize()
+            return None
+
     def set_rules_file(self, rules_file: str):
         """
         设置规则文件路径
@@ -55,12 +363,14 @@ class RulesStore:
         self.backup_dir = os.path.join(os.path.dirname(rules_file), "backups")
         os.makedirs(self.backup_dir, exist_ok=True)
     
-    def load_rules(self, rules_file: str = "") -> bool:
+    def load_rules(self, rules_file: str = "", lazy: bool = False) -> bool:
         """
         加载规则文件
         
         Args:
             rules_file: 规则文件路径，若为空则使用当前设置的文件
+            lazy: 是否延迟加载，规则文件有有效的.rules.idx索引时只读取元数据，
+                  按ID、状态或原始字符串查询时按需解析单条记录
         
         Returns:
             bool: 是否加载成功
@@ -68,22 +378,26 @@ class RulesStore:
         if rules_file:
             self.set_rules_file(rules_file)
         
+        if lazy:
+            index = RulesIndex.open(self.rules_file)
+            if index is not None:
+                self.rules = None
+                self._index = index
+                if index.metadata:
+                    self._set_metadata(index.metadata)
+                return True
+        
         try:
             # 加载规则
             all_rules = load_yaml_mappings(self.rules_file)
+            # 旧格式的缓存指纹与当前格式长度相同但永远不相等，加载时升级
+            upgrade_fingerprints(all_rules)
             
-            # 加载元数据（如果存在）
-            with open(self.rules_file, 'r', encoding='utf-8') as f:
-                yaml_data = yaml.safe_load(f)
+            # 加载元数据（如果存在），跳过映射项不再重复构造
+            yaml_data = read_rule_file_metadata(self.rules_file)
             
-            if isinstance(yaml_data, dict):
-                # 提取元数据
-                self.metadata = {
-                    "version": yaml_data.get("version", "1.0"),
-                    "created_at": yaml_data.get("created_at", datetime.now().isoformat()),
-                    "updated_at": yaml_data.get("updated_at", datetime.now().isoformat()),
-                    "mod_id": yaml_data.get("id", "")
-                }
+            if yaml_data:
+                self._set_metadata(yaml_data)
             
             self.rules = all_rules
             # 对规则进行确定性排序
@@ -93,17 +407,34 @@ class RulesStore:
             print(f"[ERROR] 加载规则文件失败: {self.rules_file} - {e}")
             return False
     
-    def save_rules(self, rules_file: str = "", version_control: bool = True) -> bool:
+    def _set_metadata(self, yaml_data: Dict[str, Any]):
+        """
+        从规则文件的顶层字段提取元数据
+        
+        Args:
+            yaml_data: 规则文件mappings以外的顶层字段
+        """
+        self.metadata = {
+            "version": yaml_data.get("version", "1.0"),
+            "created_at": yaml_data.get("created_at", datetime.now().isoformat()),
+            "updated_at": yaml_data.get("updated_at", datetime.now().isoformat()),
+            "mod_id": yaml_data.get("id", "")
+        }
+    
+    def save_rules(self, rules_file: str = "", version_control: bool = True, write_index: bool = True) -> bool:
         """
         保存规则到文件
         
         Args:
             rules_file: 规则文件路径，若为空则使用当前设置的文件
             version_control: 是否启用版本控制
+            write_index: 是否同时生成.rules.idx索引
         
         Returns:
             bool: 是否保存成功
         """
+        # 先完整加载，避免保存时索引对应的文件被覆盖
+        rules = self.rules
         if rules_file:
             self.set_rules_file(rules_file)
         
@@ -122,6 +453,9 @@ class RulesStore:
                 mod_id=self.metadata["mod_id"]
             )
             
+            if success and write_index:
+                build_rules_index(self.rules_file, rules)
+            
             return success
         except Exception as e:
             print(f"[ERROR] 保存规则文件失败: {self.rules_file} - {e}")
@@ -133,6 +467,8 @@ class RulesStore:
         使用 occurrence_key 作为排序键
         """
         self.rules.sort(key=lambda x: x.get("id", ""))
+        if self._indexes is not None:
+            self._indexes.invalidate_positions()
     
     def create_backup(self) -> str:
         """
@@ -232,10 +568,11 @@ class RulesStore:
         Returns:
             Optional[Dict[str, Any]]: 规则字典，若不存在则返回None
         """
-        for rule in self.rules:
-            if rule.get("id") == rule_id:
+        if self._rules is None and self._index is not None:
+            rule = self._query_index("get", rule_id)
+            if self._rules is None:
                 return rule
-        return None
+        return self._get_indexes().first("id", rule_id)
     
     def add_rule(self, rule: Dict[str, Any]) -> bool:
         """
@@ -252,6 +589,20 @@ class RulesStore:
             print(f"[WARN] 规则ID已存在: {rule.get('id')}")
             return False
         
+        self._insert_rule(rule)
+        
+        # 重新排序
+        self._sort_rules()
+        
+        return True
+    
+    def _insert_rule(self, rule: Dict[str, Any]):
+        """
+        追加规则并更新索引，不重新排序
+        
+        Args:
+            rule: 规则字典
+        """
         # 添加创建时间
         if "created_at" not in rule:
             rule["created_at"] = datetime.now().isoformat()
@@ -260,12 +611,26 @@ class RulesStore:
         rule["updated_at"] = datetime.now().isoformat()
         
         # 添加到规则列表
+        indexes = self._get_indexes()
         self.rules.append(rule)
+        indexes.add(rule)
+    
+    def _apply_update(self, rule: Dict[str, Any], updates: Dict[str, Any]):
+        """
+        更新规则字段并同步索引，不重新排序
         
-        # 重新排序
-        self._sort_rules()
-        
-        return True
+        Args:
+            rule: 要更新的规则
+            updates: 更新的字段和值
+        """
+        indexes = self._get_indexes()
+        before = indexes.snapshot(rule)
+        updates["updated_at"] = datetime.now().isoformat()
+        rule.update(updates)
+        if "fingerprint" in rule:
+            # 刷新缓存的指纹
+            rule["fingerprint"] = rule_fingerprint(rule)
+        indexes.reindex(rule, before)
     
     def update_rule(self, rule_id: str, updates: Dict[str, Any]) -> bool:
         """
@@ -278,16 +643,15 @@ class RulesStore:
         Returns:
             bool: 是否更新成功
         """
-        for i, rule in enumerate(self.rules):
-            if rule.get("id") == rule_id:
-                # 更新规则
-                updates["updated_at"] = datetime.now().isoformat()
-                self.rules[i].update(updates)
-                
-                # 重新排序
-                self._sort_rules()
-                
-                return True
+        rule = self._get_indexes().first("id", rule_id)
+        if rule is not None:
+            # 更新规则
+            self._apply_update(rule, updates)
+            
+            # 重新排序
+            self._sort_rules()
+            
+            return True
         
         print(f"[WARN] 未找到规则: {rule_id}")
         return False
@@ -302,11 +666,17 @@ class RulesStore:
         Returns:
             bool: 是否删除成功
         """
-        initial_len = len(self.rules)
-        self.rules = [rule for rule in self.rules if rule.get("id") != rule_id]
+        indexes = self._get_indexes()
+        matched = indexes.lookup("id", rule_id)
+        if not matched:
+            return False
         
-        # 检查是否删除成功
-        return len(self.rules) < initial_len
+        # 原地删除，索引继续对应同一个规则列表
+        matched_keys = {id(rule) for rule in matched}
+        self.rules[:] = [rule for rule in self.rules if id(rule) not in matched_keys]
+        for rule in matched:
+            indexes.remove(rule)
+        return True
     
     def get_rules_by_status(self, status: str) -> List[Dict[str, Any]]:
         """
@@ -318,7 +688,10 @@ class RulesStore:
         Returns:
             List[Dict[str, Any]]: 符合条件的规则列表
         """
-        return [rule for rule in self.rules if rule.get("status") == status]
+        rules = self._query_index("find_by_status", status)
+        if rules is not None:
+            return sorted(rules, key=lambda x: x.get("id", ""))
+        return self._get_indexes().lookup("status", status)
     
     def get_rules_by_original(self, original: str) -> List[Dict[str, Any]]:
         """
@@ -330,7 +703,10 @@ class RulesStore:
         Returns:
             List[Dict[str, Any]]: 符合条件的规则列表
         """
-        return [rule for rule in self.rules if rule.get("original") == original]
+        rules = self._query_index("find_by_original", original)
+        if rules is not None:
+            return sorted(rules, key=lambda x: x.get("id", ""))
+        return self._get_indexes().lookup("original", original)
     
     def get_rules_by_file(self, file_path: str) -> List[Dict[str, Any]]:
         """
@@ -342,9 +718,44 @@ class RulesStore:
         Returns:
             List[Dict[str, Any]]: 符合条件的规则列表
         """
-        return [rule for rule in self.rules if 
-                rule.get("context", {}).get("file") == file_path or 
-                rule.get("meta", {}).get("file") == file_path]
+        return self._get_indexes().lookup("file", file_path)
+    
+    def iter_rules(self, status: str = None, file_path: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        流式读取规则文件中的规则，不加载整个规则列表
+        
+        规则按文件中的顺序返回，RulesStore保存的文件已按occurrence_key排序
+        
+        Args:
+            status: 按规则状态过滤
+            file_path: 按文件路径过滤
+        
+        Yields:
+            Dict[str, Any]: 符合条件的规则
+        """
+        for rule in iter_rule_file(self.rules_file):
+            if isinstance(rule, dict) and self.rule_matches(rule, status, file_path):
+                yield rule
+    
+    @staticmethod
+    def rule_matches(rule: Dict[str, Any], status: str = None, file_path: str = None) -> bool:
+        """
+        判断规则是否符合状态和文件路径过滤条件
+        
+        Args:
+            rule: 规则
+            status: 规则状态，为空时不过滤
+            file_path: 文件路径，为空时不过滤
+        
+        Returns:
+            bool: 是否符合条件
+        """
+        if status and rule.get("status") != status:
+            return False
+        if file_path and (rule.get("context") or {}).get("file") != file_path and \
+                (rule.get("meta") or {}).get("file") != file_path:
+            return False
+        return True
     
     def validate_rules(self) -> List[str]:
         """
@@ -474,35 +885,30 @@ class RulesStore:
         merged_count = 0
         skipped_count = 0
         
-        # 创建现有规则ID集合
-        existing_ids = {rule.get("id") for rule in self.rules}
+        # 通过ID索引查找现有规则，合并和添加都不重新排序，全部导入后只排序一次
+        indexes = self._get_indexes()
+        fields_to_merge = ["translated", "context", "placeholders"]
         
         for source_rule in source_rules:
             rule_id = source_rule.get("id")
+            existing_rule = indexes.first("id", rule_id)
             
-            if rule_id in existing_ids:
-                # 规则已存在，尝试合并
-                existing_rule = self.get_rule(rule_id)
-                if existing_rule:
-                    # 合并规则，保留现有规则的状态和元数据
-                    merged_rule = existing_rule.copy()
-                    
-                    # 只合并特定字段
-                    fields_to_merge = ["translated", "context", "placeholders"]
-                    for field in fields_to_merge:
-                        if field in source_rule:
-                            merged_rule[field] = source_rule[field]
-                    
-                    # 更新现有规则
-                    self.update_rule(rule_id, merged_rule)
-                    merged_count += 1
-                else:
+            if existing_rule is not None:
+                # 规则已存在，合并特定字段，保留现有规则的状态和元数据
+                updates = {field: source_rule[field] for field in fields_to_merge if field in source_rule}
+                if is_rule_unchanged(existing_rule, updates):
+                    # 要合并的字段都未变更，跳过该规则
                     skipped_count += 1
+                    continue
+                self._apply_update(existing_rule, updates)
+                merged_count += 1
             else:
                 # 新规则，直接添加
-                self.add_rule(source_rule)
+                self._insert_rule(source_rule)
                 imported_count += 1
-                existing_ids.add(rule_id)
+        
+        if imported_count or merged_count:
+            self._sort_rules()
         
         return {
             "status": "success",
@@ -536,7 +942,7 @@ class RulesStore:
                 
                 # 保存为简单格式
                 with open(output_file, 'w', encoding='utf-8') as f:
-                    yaml.dump(simple_rules, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+                    write_rule_items(f, simple_rules)
             else:
                 # 导出为rich格式
                 self.save_rules(output_file)
@@ -556,34 +962,19 @@ class RulesStore:
         Returns:
             str: 指纹字符串
         """
-        # 使用规则的关键字段生成指纹
-        fingerprint_data = {
-            "original": rule.get("original", ""),
-            "context": rule.get("context", {}),
-            "meta": rule.get("meta", {})
-        }
-        
-        # 转换为字符串
-        data_str = str(fingerprint_data)
-        
-        # 生成SHA256哈希
-        return hashlib.sha256(data_str.encode()).hexdigest()[:16]
+        return rule_fingerprint(rule)
     
     def add_fingerprints(self) -> int:
         """
-        为所有规则添加指纹
+        为所有规则添加或重新计算指纹，已有指纹(包括旧格式的指纹)都会被覆盖
         
         Returns:
-            int: 添加的指纹数量
+            int: 新增或发生变化的指纹数量
         """
-        added_count = 0
-        
-        for rule in self.rules:
-            if "fingerprint" not in rule:
-                rule["fingerprint"] = self.generate_fingerprint(rule)
-                added_count += 1
-        
-        return added_count
+        rules = self.rules
+        previous = [rule.get("fingerprint") for rule in rules]
+        fingerprints = compute_fingerprints(rules, store=True)
+        return sum(1 for old, new in zip(previous, fingerprints) if old != new)
     
     def __len__(self) -> int:
         """
@@ -592,6 +983,8 @@ class RulesStore:
         Returns:
             int: 规则数量
         """
+        if self._rules is None and self._index is not None:
+            return len(self._index)
         return len(self.rules)
     
     def __iter__(self):
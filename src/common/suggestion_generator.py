@@ -8,43 +8,124 @@
 
 import os
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from src.common.parallel_utils import ParallelProcessor
+from src.common.translation_memory import TranslationMemory
 from src.common.tree_sitter_utils import extract_ast_mappings, extract_strings_from_file
 from src.common.yaml_utils import load_yaml_mappings, save_yaml_mappings, generate_initial_yaml_mappings
 from src.common.levenshtein_utils import (
+    FuzzyMatchIndex,
+    ContextSignatureIndex,
     get_contextual_suggestions,
     get_fuzzy_suggestions,
     get_combined_suggestions,
+    get_ranked_suggestions,
+    merge_combined_suggestions,
+    get_suggestion_key,
     calculate_similarity
 )
 
+# 不同原始字符串少于该数量时不启动进程池
+MIN_PARALLEL_QUERIES = 256
+# 每次提交给工作进程的查询数量
+SUGGESTION_CHUNK_SIZE = 64
+
+# 工作进程中的只读模糊匹配索引，由_init_suggestion_worker设置
+_worker_fuzzy_index: Optional[FuzzyMatchIndex] = None
+
+
+def _init_suggestion_worker(fuzzy_index: FuzzyMatchIndex) -> None:
+    """
+    工作进程初始化函数，每个进程只接收一次索引
+    
+    Args:
+        fuzzy_index: 模糊匹配索引
+    """
+    global _worker_fuzzy_index
+    _worker_fuzzy_index = fuzzy_index
+
+
+def _fuzzy_search_worker(query: str, threshold: float, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+    """
+    在工作进程中执行模糊匹配，只返回记录位置和相似度
+    
+    Args:
+        query: 查询字符串
+        threshold: 相似度阈值
+        limit: 最多返回的记录数量，默认返回全部
+    
+    Returns:
+        List[Tuple[int, float]]: (记录位置, 相似度)列表
+    """
+    return _worker_fuzzy_index.search_positions(query, threshold, limit)
+
 
 class SuggestionGenerator:
     """
     智能建议生成器类
     """
     
-    def __init__(self, localization_db: Optional[List[Dict[str, Any]]] = None):
+    def __init__(self, localization_db: Optional[List[Dict[str, Any]]] = None,
+                 translation_memory: Optional[TranslationMemory] = None):
         """
         初始化建议生成器
         
         Args:
             localization_db: 本地化数据库，包含已有的翻译映射
+            translation_memory: 磁盘上的翻译记忆库，模糊匹配时与本地化数据库一起查询
         """
         self.localization_db = localization_db or []
+        self.translation_memory = translation_memory
+        # 本地化数据库中已有的映射ID，数据库被替换或增加记录后重新建立
+        self._known_ids: Optional[set] = None
+        self._known_ids_source: Optional[List[Dict[str, Any]]] = None
+        # 模糊匹配索引，首次生成建议时建立
+        self._fuzzy_index: Optional[FuzzyMatchIndex] = None
+        # 上下文签名索引，首次生成建议时建立
+        self._context_index: Optional[ContextSignatureIndex] = None
+    
+    def get_fuzzy_index(self) -> FuzzyMatchIndex:
+        """
+        获取本地化数据库的模糊匹配索引，数据库被替换或增加记录后重新建立
+        
+        Returns:
+            FuzzyMatchIndex: 模糊匹配索引
+        """
+        index = self._fuzzy_index
+        if index is None or index.source is not self.localization_db or len(index) != len(self.localization_db):
+            index = self._fuzzy_index = FuzzyMatchIndex(self.localization_db)
+        return index
+    
+    def get_context_index(self) -> ContextSignatureIndex:
+        """
+        获取本地化数据库的上下文签名索引，数据库被替换或增加记录后重新建立
+        
+        Returns:
+            ContextSignatureIndex: 上下文签名索引
+        """
+        index = self._context_index
+        if index is None or index.source is not self.localization_db or len(index) != len(self.localization_db):
+            index = self._context_index = ContextSignatureIndex(self.localization_db)
+        return index
     
     def load_localization_db(self, file_path: str) -> bool:
         """
         从文件加载本地化数据库
         
         Args:
-            file_path: 本地化数据库文件路径，支持JSON和YAML格式
+            file_path: 本地化数据库文件路径，支持JSON和YAML格式，.db文件作为翻译记忆库打开
         
         Returns:
             bool: 是否加载成功
         """
         try:
-            if file_path.endswith('.json'):
+            if file_path.endswith('.db'):
+                if self.translation_memory is not None:
+                    self.translation_memory.close()
+                self.translation_memory = TranslationMemory(file_path)
+                print(f"OK 成功打开翻译记忆库，共 {len(self.translation_memory)} 条记录")
+                return True
+            elif file_path.endswith('.json'):
                 with open(file_path, 'r', encoding='utf-8') as f:
                     self.localization_db = json.load(f)
             elif file_path.endswith('.yaml') or file_path.endswith('.yml'):
@@ -65,13 +146,18 @@ class SuggestionGenerator:
         保存本地化数据库到文件
         
         Args:
-            file_path: 文件路径，支持JSON和YAML格式
+            file_path: 文件路径，支持JSON和YAML格式，.db文件作为翻译记忆库增量写入
         
         Returns:
             bool: 是否保存成功
         """
         try:
-            if file_path.endswith('.json'):
+            if file_path.endswith('.db'):
+                with TranslationMemory(file_path) as memory:
+                    added = memory.add(self.localization_db)
+                print(f"OK 成功向翻译记忆库写入 {added} 条新记录: {file_path}")
+                return True
+            elif file_path.endswith('.json'):
                 with open(file_path, 'w', encoding='utf-8') as f:
                     json.dump(self.localization_db, f, ensure_ascii=False, indent=2)
             elif file_path.endswith('.yaml') or file_path.endswith('.yml'):
@@ -94,8 +180,12 @@ class SuggestionGenerator:
         Args:
             mappings: 映射列表
         """
-        # 创建现有映射ID集合
-        existing_ids = {item["id"] for item in self.localization_db}
+        # 复用现有映射ID集合
+        existing_ids = self._known_ids
+        if (existing_ids is None or self._known_ids_source is not self.localization_db
+                or len(existing_ids) != len(self.localization_db)):
+            existing_ids = self._known_ids = {item["id"] for item in self.localization_db}
+            self._known_ids_source = self.localization_db
         
         # 添加新映射
         for mapping in mappings:
@@ -103,6 +193,9 @@ class SuggestionGenerator:
                 self.localization_db.append(mapping)
                 existing_ids.add(mapping["id"])
         
+        if self.translation_memory is not None:
+            self.translation_memory.add(mappings)
+        
         print(f"OK 成功向本地化数据库添加 {len(mappings)} 条记录")
     
     def generate_suggestions(self, yaml_item: Dict[str, Any], threshold: float = 0.8, max_suggestions: int = 5) -> List[Dict[str, Any]]:
@@ -117,7 +210,109 @@ class SuggestionGenerator:
         Returns:
             List[Dict[str, Any]]: 智能建议列表
         """
-        return get_combined_suggestions(yaml_item, self.localization_db, threshold, max_suggestions)
+        return self._suggest_batch([yaml_item], threshold, max_suggestions, 1)[0]
+    
+    def generate_ranked_suggestions(self, yaml_item: Dict[str, Any], threshold: float = 0.8,
+                                    max_suggestions: int = 5) -> List[Dict[str, Any]]:
+        """
+        为指定YAML映射项生成按综合评分排序的建议
+        
+        Args:
+            yaml_item: YAML映射项
+            threshold: 相似度阈值
+            max_suggestions: 最大建议数量
+        
+        Returns:
+            List[Dict[str, Any]]: 建议列表，按上下文匹配度和相似度的综合评分降序排序
+        """
+        return get_ranked_suggestions(yaml_item, self.localization_db, threshold, max_suggestions,
+                                      fuzzy_index=self.get_fuzzy_index(), context_index=self.get_context_index())
+    
+    def _fuzzy_search_many(self, queries: List[str], threshold: float, max_workers: Optional[int],
+                           limit: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        批量模糊匹配，查询数量较多时分片到进程池，设置了翻译记忆库时合并记忆库中的匹配
+        
+        Args:
+            queries: 去重后的查询字符串
+            threshold: 相似度阈值
+            max_workers: 最大工作进程数，为1时在当前进程中执行
+            limit: 每个查询最多返回的匹配数量，默认返回全部
+        
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: 查询字符串 -> 模糊匹配建议列表
+        """
+        fuzzy_index = self.get_fuzzy_index()
+        if max_workers == 1 or len(queries) < MIN_PARALLEL_QUERIES:
+            results = {query: fuzzy_index.search(query, threshold, limit) for query in queries}
+        else:
+            processor = ParallelProcessor(max_workers=max_workers, use_multiprocessing=True,
+                                          chunk_size=SUGGESTION_CHUNK_SIZE, initializer=_init_suggestion_worker,
+                                          initargs=(fuzzy_index,))
+            results = {}
+            for outcome in processor.iter_results(queries, _fuzzy_search_worker, threshold, limit):
+                query = outcome["file"]
+                if outcome["error"]:
+                    print(f"[WARN] 并行模糊匹配失败，改为在当前进程中执行: {outcome['error']}")
+                    results[query] = fuzzy_index.search(query, threshold, limit)
+                else:
+                    results[query] = [{"item": fuzzy_index.source[position], "similarity": similarity}
+                                      for position, similarity in outcome["result"]]
+        
+        if self.translation_memory is not None:
+            # 记忆库连接不能跨进程共享，在当前进程中查询
+            for query in queries:
+                merged = sorted(results[query] + self.translation_memory.search(query, threshold, limit),
+                                key=lambda match: match["similarity"], reverse=True)
+                # 按(原始字符串, 译文)去重，记忆库中的记录ID可能与本地化数据库重复
+                unique = {}
+                for match in merged:
+                    unique.setdefault(get_suggestion_key(match["item"]), match)
+                results[query] = list(unique.values())[:limit]
+        return results
+    
+    def _suggest_batch(self, yaml_items: List[Dict[str, Any]], threshold: float, max_suggestions: int,
+                       max_workers: Optional[int]) -> List[List[Dict[str, Any]]]:
+        """
+        为多个映射项生成建议，相同的原始字符串只做一次模糊匹配
+        
+        Returns:
+            List[List[Dict[str, Any]]]: 与yaml_items一一对应的建议列表
+        """
+        queries = list(dict.fromkeys(yaml_item["original"] for yaml_item in yaml_items))
+        # 上下文建议的相似度为1.0排在最前，与其重复的模糊匹配最多为上下文建议的数量，
+        # 因此每个查询取前max_suggestions条模糊匹配即可
+        fuzzy_results = self._fuzzy_search_many(queries, threshold, max_workers, max_suggestions)
+        context_index = self.get_context_index()
+        
+        return [
+            merge_combined_suggestions(
+                get_contextual_suggestions(yaml_item, self.localization_db, max_suggestions, context_index),
+                fuzzy_results[yaml_item["original"]],
+                max_suggestions
+            )
+            for yaml_item in yaml_items
+        ]
+    
+    def suggest_many(self, yaml_items: List[Dict[str, Any]], threshold: float = 0.8, k: int = 5,
+                     max_workers: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        批量生成智能建议
+        
+        相同的原始字符串只计算一次模糊匹配，不同原始字符串较多时分片到进程池，
+        每个工作进程在启动时接收一次只读的模糊匹配索引。
+        
+        Args:
+            yaml_items: YAML映射项列表
+            threshold: 相似度阈值
+            k: 每个映射项返回的最大建议数量
+            max_workers: 最大工作进程数，默认为CPU核心数，为1时不使用进程池
+        
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: 建议字典，键为映射项ID，值为按相似度降序排列的前k条建议
+        """
+        suggestions = self._suggest_batch(yaml_items, threshold, k, max_workers)
+        return {yaml_item["id"]: item_suggestions for yaml_item, item_suggestions in zip(yaml_items, suggestions)}
     
     def generate_suggestions_for_file(self, file_path: str, threshold: float = 0.8, max_suggestions: int = 5) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -137,13 +332,8 @@ class SuggestionGenerator:
         # 生成初始YAML映射
         yaml_mappings = generate_initial_yaml_mappings(ast_mappings)
         
-        # 为每个YAML映射项生成建议
-        suggestions_dict = {}
-        for yaml_item in yaml_mappings:
-            suggestions = self.generate_suggestions(yaml_item, threshold, max_suggestions)
-            suggestions_dict[yaml_item["id"]] = suggestions
-        
-        return suggestions_dict
+        # 批量生成建议
+        return self.suggest_many(yaml_mappings, threshold, max_suggestions)
     
     def generate_suggestions_for_directory(self, root_dir: str, threshold: float = 0.8, max_suggestions: int = 5) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -163,13 +353,8 @@ class SuggestionGenerator:
         # 生成初始YAML映射
         yaml_mappings = generate_initial_yaml_mappings(ast_mappings)
         
-        # 为每个YAML映射项生成建议
-        suggestions_dict = {}
-        for yaml_item in yaml_mappings:
-            suggestions = self.generate_suggestions(yaml_item, threshold, max_suggestions)
-            suggestions_dict[yaml_item["id"]] = suggestions
-        
-        return suggestions_dict
+        # 批量生成建议
+        return self.suggest_many(yaml_mappings, threshold, max_suggestions)
     
     def update_mapping_with_suggestion(self, yaml_item: Dict[str, Any], suggestion: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -206,12 +391,16 @@ class SuggestionGenerator:
         updated_mappings = []
         auto_completed_count = 0
         
+        # 批量为未翻译的映射项生成建议
+        untranslated = [yaml_item for yaml_item in yaml_mappings if yaml_item.get("status") == "untranslated"]
+        batch_suggestions = iter(self._suggest_batch(untranslated, threshold, 1, None))
+        
         for yaml_item in yaml_mappings:
             if yaml_item.get("status") != "untranslated":
                 updated_mappings.append(yaml_item)
                 continue
             
-            suggestions = self.generate_suggestions(yaml_item, threshold, max_suggestions=1)
+            suggestions = next(batch_suggestions)
             if suggestions and suggestions[0]["similarity"] >= threshold:
                 updated_item = self.update_mapping_with_suggestion(yaml_item, suggestions[0]["item"])
                 updated_item["status"] = "needs_review"
@@ -246,8 +435,7 @@ class SuggestionGenerator:
         }
         
         total_similarity = 0.0
-        for yaml_item in yaml_mappings:
-            suggestions = self.generate_suggestions(yaml_item, threshold=0.5, max_suggestions=1)
+        for suggestions in self._suggest_batch(yaml_mappings, 0.5, 1, None):
             if suggestions:
                 stats["with_suggestions"] += 1
                 similarity = suggestions[0]["similarity"]
@@ -293,11 +481,8 @@ def generate_suggestions_for_yaml_file(yaml_file: str, localization_db: List[Dic
     # 创建建议生成器
     generator = SuggestionGenerator(localization_db)
     
-    # 为每个YAML映射项生成建议
-    suggestions_dict = {}
-    for yaml_item in yaml_mappings:
-        suggestions = generator.generate_suggestions(yaml_item, threshold, max_suggestions)
-        suggestions_dict[yaml_item["id"]] = suggestions
+    # 批量生成建议
+    suggestions_dict = generator.suggest_many(yaml_mappings, threshold, max_suggestions)
     
     # 保存建议到文件
     try:
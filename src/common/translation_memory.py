@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+翻译记忆库模块
+
+该模块将已有翻译保存在磁盘上的SQLite数据库中，供智能建议生成器查询：
+1. 每次extend运行生成翻译规则时增量写入，按(原始字符串, 译文)去重
+2. 去除占位符后的原始字符串建立FTS5 trigram全文索引，模糊匹配时按长度范围和n-gram下界
+   只读取可能满足阈值的候选记录，不需要把整个记忆库加载到内存中
+3. 使用WAL日志模式和忙等待超时，多个并发运行可以同时读写同一个记忆库
+"""
+
+import heapq
+import json
+import os
+import sqlite3
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .levenshtein_utils import PLACEHOLDER_PATTERN, get_length_range, get_max_distance, verify_similarity
+
+# 默认的翻译记忆库文件
+DEFAULT_TRANSLATION_MEMORY_FILE = os.path.join(".cache", "translation_memory.db")
+
+# 每个写入事务包含的记录数量
+TM_BATCH_SIZE = 1000
+
+# 全文索引的n-gram长度，与FTS5 trigram分词器一致
+_GRAM_SIZE = 3
+
+
+def _is_translation(mapping: Dict[str, Any]) -> bool:
+    """
+    判断映射是否包含可用的翻译
+    """
+    original = mapping.get("original")
+    translated = mapping.get("translated")
+    return (isinstance(original, str) and isinstance(translated, str) and bool(original) and bool(translated)
+            and translated != original)
+
+
+class TranslationMemory:
+    """
+    基于SQLite的翻译记忆库
+    """
+
+    def __init__(self, db_file: str = DEFAULT_TRANSLATION_MEMORY_FILE, timeout: float = 30.0):
+        """
+        打开翻译记忆库，不存在时创建
+
+        Args:
+            db_file: 数据库文件路径
+            timeout: 其他进程持有写锁时的最长等待时间(秒)
+        """
+        self.db_file = db_file
+        directory = os.path.dirname(db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_file, timeout=timeout)
+        self._pending: List[Tuple[str, str, str, int, str]] = []
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "id INTEGER PRIMARY KEY, original TEXT NOT NULL, translated TEXT NOT NULL, "
+                    "cleaned TEXT NOT NULL, length INTEGER NOT NULL, entry TEXT NOT NULL, "
+                    "UNIQUE (original, translated))"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS entries_length ON entries (length)")
+            self.fts_enabled = self._create_fts()
+        except sqlite3.Error:
+            self._conn.close()
+            raise
+
+    def _create_fts(self) -> bool:
+        """
+        创建trigram全文索引，SQLite不支持FTS5或trigram分词器时返回False
+        """
+        try:
+            with self._conn:
+                exists = self._conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entries_fts'").fetchone()
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5("
+                    "cleaned, content='entries', content_rowid='id', tokenize='trigram')"
+                )
+                self._conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN "
+                    "INSERT INTO entries_fts (rowid, cleaned) VALUES (new.id, new.cleaned); END"
+                )
+                if not exists:
+                    # 在不支持FTS5的环境中写入过的记录需要补建索引
+                    self._conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"[WARN] SQLite不支持FTS5 trigram索引，翻译记忆库将按长度范围扫描: {e}")
+            return False
+
+    def __enter__(self) -> "TranslationMemory":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        写入待保存的记录并关闭数据库连接
+        """
+        self.flush()
+        self._conn.close()
+
+    def _queue(self, mapping: Dict[str, Any]) -> None:
+        """
+        将映射加入待写入队列，达到批量大小时写入
+        """
+        if not _is_translation(mapping):
+            return
+        original = mapping["original"]
+        cleaned = PLACEHOLDER_PATTERN.sub('', original)
+        entry = json.dumps(mapping, ensure_ascii=False, separators=(",", ":"), default=str)
+        self._pending.append((original, mapping["translated"], cleaned, len(cleaned), entry))
+        if len(self._pending) >= TM_BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        在单个事务中写入待保存的记录，已存在的(原始字符串, 译文)会被跳过
+
+        Returns:
+            int: 新写入的记录数量
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, []
+        try:
+            with self._conn:
+                # rowcount不包含触发器写入全文索引的变更
+                return self._conn.executemany(
+                    "INSERT OR IGNORE INTO entries (original, translated, cleaned, length, entry) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    pending
+                ).rowcount
+        except sqlite3.Error as e:
+            print(f"[WARN] 写入翻译记忆库失败: {e}")
+            return 0
+
+    def add(self, mappings: Iterable[Dict[str, Any]]) -> int:
+        """
+        增量写入翻译，没有译文或译文与原文相同的映射会被忽略
+
+        Args:
+            mappings: 映射列表，可以是生成器
+
+        Returns:
+            int: 新写入的记录数量
+        """
+        added = self.flush()
+        iterator = iter(mappings)
+        while True:
+            batch = list(islice(iterator, TM_BATCH_SIZE))
+            if not batch:
+                return added
+            for mapping in batch:
+                self._queue(mapping)
+            added += self.flush()
+
+    def record(self, mappings: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        透传映射，同时分批写入翻译记忆库，用于在流式保存规则文件时顺带记录翻译
+
+        Args:
+            mappings: 映射列表，可以是生成器
+
+        Yields:
+            Dict[str, Any]: 原样返回的映射
+        """
+        for mapping in mappings:
+            self._queue(mapping)
+            yield mapping
+        self.flush()
+
+    def _load_rows(self, rows: Iterable[Tuple[int, str]]) -> List[Dict[str, Any]]:
+        """
+        解析记录，缺少ID的记录使用记忆库中的编号
+        """
+        entries = []
+        for row_id, entry in rows:
+            item = json.loads(entry)
+            item.setdefault("id", f"tm:{row_id}")
+            entries.append(item)
+        return entries
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """
+        按写入顺序遍历记忆库中的所有记录
+
+        Yields:
+            Dict[str, Any]: 映射记录
+        """
+        cursor = self._conn.execute("SELECT id, entry FROM entries ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(TM_BATCH_SIZE)
+            if not rows:
+                return
+            yield from self._load_rows(rows)
+
+    def get_by_original(self, original: str) -> List[Dict[str, Any]]:
+        """
+        获取原始字符串的所有已有翻译
+
+        Args:
+            original: 原始字符串
+
+        Returns:
+            List[Dict[str, Any]]: 映射记录，按写入顺序
+        """
+        return self._load_rows(self._conn.execute(
+            "SELECT id, entry FROM entries WHERE original = ? ORDER BY id", (original,)))
+
+    def _candidate_rows(self, query_clean: str, threshold: float) -> Iterable[Tuple[int, str]]:
+        """
+        读取可能满足阈值的候选记录的编号和去除占位符后的原始字符串
+
+        由q-gram引理，编辑距离为d的两个字符串至少共享max(|Ga|, |Gb|) - 3d个trigram，
+        下界大于0的长度只需读取与查询共享至少一个trigram的记录，其余长度按长度索引全部读取。
+        """
+        if threshold <= 0:
+            # 任何记录都满足阈值，逐行读取
+            return self._conn.execute("SELECT id, cleaned FROM entries")
+
+        query_length = len(query_clean)
+        low_length, high_length = get_length_range(query_length, threshold)
+        grams = {query_clean[i:i + _GRAM_SIZE] for i in range(query_length - _GRAM_SIZE + 1)}
+
+        scan_lengths = []
+        filtered = False
+        for length in range(low_length, high_length + 1):
+            need = max(query_length, length) - _GRAM_SIZE + 1 - _GRAM_SIZE * get_max_distance(query_length, length, threshold)
+            if need <= 0 or not self.fts_enabled:
+                scan_lengths.append(length)
+            else:
+                filtered = True
+
+        rows: Dict[int, str] = {}
+        if filtered and grams:
+            match = " OR ".join('"' + gram.replace('"', '""') + '"' for gram in grams)
+            rows.update(self._conn.execute(
+                "SELECT entries.id, entries.cleaned FROM entries_fts "
+                "JOIN entries ON entries.id = entries_fts.rowid "
+                "WHERE entries_fts MATCH ? AND entries.length BETWEEN ? AND ?",
+                (match, low_length, high_length)))
+        for start in range(0, len(scan_lengths), 500):
+            lengths = scan_lengths[start:start + 500]
+            placeholders = ",".join("?" * len(lengths))
+            rows.update(self._conn.execute(
+                f"SELECT id, cleaned FROM entries WHERE length IN ({placeholders})", lengths))
+        return rows.items()
+
+    def _load_entries(self, row_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        按编号读取记录
+        """
+        entries = {}
+        for start in range(0, len(row_ids), 500):
+            batch = row_ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(f"SELECT id, entry FROM entries WHERE id IN ({placeholders})", batch).fetchall()
+            entries.update(zip((row_id for row_id, _ in rows), self._load_rows(rows)))
+        return entries
+
+    def search(self, query: str, threshold: float = 0.8, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        查找相似度不低于阈值的已有翻译，结果与对所有记录逐条调用calculate_similarity一致
+
+        Args:
+            query: 查询字符串
+            threshold: 相似度阈值
+            limit: 最多返回的记录数量，默认返回全部
+
+        Returns:
+            List[Dict[str, Any]]: 模糊匹配建议列表，按相似度降序排序，相似度相同时按写入顺序
+        """
+        query_clean = PLACEHOLDER_PATTERN.sub('', query)
+        matches = []
+        for row_id, cleaned in self._candidate_rows(query_clean, threshold):
+            similarity = verify_similarity(query_clean, cleaned, threshold)
+            if similarity is not None:
+                matches.append((-similarity, row_id))
+        matches = heapq.nsmallest(limit, matches) if limit is not None else sorted(matches)
+        # 只解析命中的记录
+        entries = self._load_entries([row_id for _, row_id in matches])
+        return [{"item": entries[row_id], "similarity": -similarity} for similarity, row_id in matches]
+
+
+def open_translation_memory(db_file: Optional[str] = DEFAULT_TRANSLATION_MEMORY_FILE) -> Optional[TranslationMemory]:
+    """
+    打开翻译记忆库，失败时只输出警告
+
+    Args:
+        db_file: 数据库文件路径，为None时不使用翻译记忆库
+
+    Returns:
+        Optional[TranslationMemory]: 翻译记忆库，未启用或打开失败时返回None
+    """
+    if not db_file:
+        return None
+    try:
+        return TranslationMemory(db_file)
+    except sqlite3.Error as e:
+        print(f"[WARN] 打开翻译记忆库失败: {db_file} - {e}")
+        return None
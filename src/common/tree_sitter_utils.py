@@ -6,9 +6,14 @@ Tree-sitter AST解析和字符串提取工具
 支持Java和Kotlin语言。
 """
 
+import heapq
 import os
 import sys
-from typing import List, Dict, Any, Optional, Iterator
+import threading
+import time
+import zipfile
+from collections import Counter
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 
 # 添加虚拟环境的site-packages目录到Python搜索路径
 # 获取当前文件的绝对路径
@@ -69,6 +74,9 @@ if not tree_sitter_initialized:
 # 初始化标志位，防止重复初始化
 _LANGUAGES_INITIALIZED = False
 
+# 按线程缓存的解析器
+_parser_local = threading.local()
+
 
 def initialize_languages():
     """
@@ -276,7 +284,8 @@ class ASTNode:
         parent_types = []
         current = self.node.parent
         while current:
-            parent_types.append(current.type)
+            # 节点类型字符串重复率很高，驻留后在跨进程传输时只需序列化一次
+            parent_types.append(sys.intern(current.type))
             current = current.parent
         return parent_types
     
@@ -289,13 +298,40 @@ class ASTNode:
         """
         return {
             "parent_types": self.get_parent_types(),
-            "node_type": self.type
+            "node_type": sys.intern(self.type)
         }
 
 
 def get_parser(file_path: str) -> Optional[Parser]:
     """
     根据文件扩展名获取相应的Tree-sitter解析器
+    解析器按语言在每个线程中只创建一次，之后重复使用
+    
+    Args:
+        file_path: 文件路径
+    
+    Returns:
+        Optional[Parser]: Tree-sitter解析器，如果不支持该文件类型则返回None
+    """
+    if file_path.endswith('.java'):
+        language_key = 'java'
+    elif file_path.endswith(('.kt', '.kts')):
+        language_key = 'kotlin'
+    else:
+        return None
+    
+    # Parser对象不是线程安全的，因此按线程缓存
+    parsers = getattr(_parser_local, 'parsers', None)
+    if parsers is None:
+        parsers = _parser_local.parsers = {}
+    if language_key not in parsers:
+        parsers[language_key] = _create_parser(file_path)
+    return parsers[language_key]
+
+
+def _create_parser(file_path: str) -> Optional[Parser]:
+    """
+    根据文件扩展名创建相应的Tree-sitter解析器
     支持不同Tree-sitter版本，使用兼容的API
     
     Args:
@@ -345,13 +381,15 @@ def get_parser(file_path: str) -> Optional[Parser]:
     return None
 
 
-def _extract_strings_from_single_file(file_path: str, root_dir: str = None) -> List[Dict[str, Any]]:
+def _extract_strings_from_single_file(file_path: str, root_dir: str = None,
+                                      filter_counters: Optional[Counter] = None) -> List[Dict[str, Any]]:
     """
     从单个文件中提取字符串
     
     Args:
         file_path: 文件路径
         root_dir: 根目录路径，用于计算相对路径
+        filter_counters: 记录过滤计数的Counter，默认记录到模块级字符串过滤器
     
     Returns:
         List[Dict[str, Any]]: 提取的字符串列表
@@ -369,6 +407,42 @@ def _extract_strings_from_single_file(file_path: str, root_dir: str = None) -> L
         print(f"[WARN]  读取文件失败: {file_path} - {e}")
         return []
     
+    return _extract_strings_from_code(parser, code, file_path, root_dir, filter_counters)
+
+
+def _extract_strings_with_filter_stats(file_path: str, root_dir: str = None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    从单个文件中提取字符串，并返回该文件的过滤计数
+    
+    工作进程中的过滤计数无法回到主进程的过滤器，因此随结果一起返回，由主进程合并并保存到提取结果缓存
+    
+    Args:
+        file_path: 文件路径
+        root_dir: 根目录路径，用于计算相对路径
+    
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, int]]: (提取的字符串列表, 规则名 -> 过滤数量)
+    """
+    filter_counters = Counter()
+    strings = _extract_strings_from_single_file(file_path, root_dir, filter_counters)
+    return strings, dict(filter_counters)
+
+
+def _extract_strings_from_code(parser: Parser, code: bytes, file_path: str, root_dir: str = None,
+                               filter_counters: Optional[Counter] = None) -> List[Dict[str, Any]]:
+    """
+    解析代码并提取字符串节点
+    
+    Args:
+        parser: Tree-sitter解析器
+        code: 文件内容
+        file_path: 文件路径，用于生成元数据
+        root_dir: 根目录路径，用于计算相对路径
+        filter_counters: 记录过滤计数的Counter，默认记录到模块级字符串过滤器
+    
+    Returns:
+        List[Dict[str, Any]]: 提取的字符串列表
+    """
     # 解析代码生成AST
     try:
         tree = parser.parse(code)
@@ -377,24 +451,125 @@ def _extract_strings_from_single_file(file_path: str, root_dir: str = None) -> L
         return []
     
     # 遍历AST，提取字符串节点
-    return extract_strings_from_ast(tree, file_path, root_dir)
+    return extract_strings_from_ast(tree, file_path, root_dir, filter_counters)
+
+
+def extract_jar_mappings(jar_path: str, root_dir: str = None, extract_dir: str = None) -> Iterator[Dict[str, Any]]:
+    """
+    直接从JAR(例如源码JAR)中的Java和Kotlin源文件提取AST映射，不解压到磁盘
+    
+    结果与把JAR解压到extract_dir后调用extract_ast_mappings(root_dir, use_cache=False)得到的该目录下的映射一致。
+    源文件逐个从zip中读取和解析，同一时间只有一个源文件的内容在内存中。
+    
+    Args:
+        jar_path: JAR文件路径
+        root_dir: 根目录路径，用于计算相对路径，默认为extract_dir
+        extract_dir: 虚拟的解压目录，用于生成文件路径，默认为root_dir，两者都未提供时为去掉.jar扩展名的JAR路径
+    
+    Yields:
+        Dict[str, Any]: AST映射
+    """
+    extract_dir = extract_dir or root_dir or os.path.splitext(jar_path)[0]
+    root_dir = root_dir or extract_dir
+    
+    with zipfile.ZipFile(jar_path, 'r') as jar:
+        for info in jar.infolist():
+            if info.is_dir():
+                continue
+            file_path = os.path.join(extract_dir, *info.filename.split('/'))
+            parser = get_parser(file_path)
+            if not parser:
+                continue
+            yield from _extract_strings_from_code(parser, jar.read(info), file_path, root_dir)
+
+
+def _init_extraction_worker() -> None:
+    """
+    提取进程池的工作进程初始化函数，每个进程只加载一次语言和解析器
+    """
+    initialize_languages()
+    get_parser('.java')
+    get_parser('.kt')
 
 
-def extract_ast_mappings(root_dir: str, use_parallel: bool = False, max_workers: int = None, use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+def _split_files_by_size(file_paths: List[str], chunk_count: int) -> List[List[str]]:
+    """
+    按文件大小将文件均衡地分配到多个分块中，较大的文件优先分配给当前总大小最小的分块
+    
+    Args:
+        file_paths: 文件路径列表
+        chunk_count: 分块数量
+    
+    Returns:
+        List[List[str]]: 非空的文件分块列表
+    """
+    def file_size(file_path: str) -> int:
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return 0
+    
+    chunk_count = max(1, min(chunk_count, len(file_paths)))
+    chunks: List[List[str]] = [[] for _ in range(chunk_count)]
+    heap = [(0, index) for index in range(chunk_count)]
+    for file_path in sorted(file_paths, key=file_size, reverse=True):
+        total_size, index = heapq.heappop(heap)
+        chunks[index].append(file_path)
+        heapq.heappush(heap, (total_size + file_size(file_path), index))
+    return [chunk for chunk in chunks if chunk]
+
+
+def _iter_parallel_extraction(file_paths: List[str], root_dir: str = None, max_workers: int = None,
+                              use_multiprocessing: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    并行提取文件中的字符串，按完成顺序逐个返回每个文件的结果
+    
+    多进程模式下每个工作进程初始化一次语言和解析器，不受GIL限制；
+    进程池不可用时回退到多线程模式。
+    
+    Args:
+        file_paths: 文件路径列表
+        root_dir: 根目录路径
+        max_workers: 最大工作进程/线程数，默认为CPU核心数
+        use_multiprocessing: 是否使用多进程模式
+    
+    Yields:
+        Dict[str, Any]: 文件结果，包含file、result、error和time，result为(提取的字符串列表, 过滤计数)
+    """
+    from .parallel_utils import ParallelProcessor
+    
+    processor = ParallelProcessor(
+        max_workers=max_workers,
+        use_multiprocessing=use_multiprocessing,
+        initializer=_init_extraction_worker if use_multiprocessing else None
+    )
+    # 每个工作进程分配多个分块，避免个别大分块拖慢整体进度
+    chunks = _split_files_by_size(file_paths, processor.max_workers * 4)
+    yield from processor.iter_chunk_results(chunks, _extract_strings_with_filter_stats, root_dir)
+
+
+def extract_ast_mappings(root_dir: str, use_parallel: bool = False, max_workers: int = None, use_cache: bool = True,
+                         verify_cache: bool = False, use_multiprocessing: bool = True) -> Iterator[Dict[str, Any]]:
     """
     从指定根目录提取AST映射，使用生成器优化内存使用
     
     Args:
         root_dir: 根目录路径
         use_parallel: 是否使用并行处理
-        max_workers: 最大工作线程数
+        max_workers: 最大工作进程/线程数
         use_cache: 是否使用缓存机制，支持增量更新
+        verify_cache: 是否通过内容哈希校验所有文件，而不是信任未变化的文件状态
+        use_multiprocessing: 并行处理时是否使用进程池，否则使用线程池
     
     Yields:
         Dict[str, Any]: AST映射
     """
-    from .parallel_utils import get_all_source_files, ParallelProcessor
-    from .cache_utils import FileCacheManager
+    from .parallel_utils import get_all_source_files
+    from .cache_utils import FileCacheManager, ExtractionResultCache
+    
+    # 过滤计数包括重新提取的文件和回放缓存结果的文件(缓存中记录了提取时的过滤计数)
+    string_filter = get_string_filter()
+    string_filter.reset_stats()
     
     # 获取所有需要处理的文件
     file_extensions = ['.java', '.kt', '.kts', '.py']
@@ -403,65 +578,114 @@ def extract_ast_mappings(root_dir: str, use_parallel: bool = False, max_workers:
     # 需要处理的文件列表
     files_to_process = all_files
     
-    # 缓存管理器
+    # 缓存管理器和提取结果缓存
     cache_manager = None
+    result_cache = None
+    changed_files = set(all_files)
     
     if use_cache:
-        # 初始化缓存管理器
-        cache_manager = FileCacheManager()
+        # 初始化缓存管理器，缓存变更在处理结束后一次性写入
+        cache_manager = FileCacheManager(deferred=True, verify=verify_cache)
+        # 缓存结果已经过滤，过滤规则变更后缓存结果失效
+        result_cache = ExtractionResultCache(rules_digest=string_filter.digest)
         
         # 获取已变更的文件
-        files_to_process = cache_manager.get_changed_files(all_files)
+        changed_files = set(cache_manager.get_changed_files(all_files))
         
-        if files_to_process:
-            print(f"[INFO] 检测到 {len(files_to_process)} 个文件已变更，开始处理")
-            print(f"[INFO] 跳过 {len(all_files) - len(files_to_process)} 个未变更文件")
+        if changed_files:
+            print(f"[INFO] 检测到 {len(changed_files)} 个文件已变更，开始处理")
+            print(f"[INFO] 跳过 {len(all_files) - len(changed_files)} 个未变更文件，使用缓存结果")
         else:
-            print(f"[INFO] 没有检测到已变更文件，跳过处理")
+            print(f"[INFO] 没有检测到已变更文件，使用缓存结果")
+    
+    def load_cached_result(file_path: str) -> Optional[List[Dict[str, Any]]]:
+        """未变更文件从提取结果缓存中读取，缓存缺失时返回None"""
+        if not use_cache or file_path in changed_files:
+            return None
+        file_hash = cache_manager.get_cached_files().get(os.path.abspath(file_path), {}).get("hash")
+        entry = result_cache.get_entry(file_path, root_dir, file_hash)
+        if entry is None:
+            return None
+        strings, filter_counts = entry
+        string_filter.merge_stats(filter_counts)
+        return strings
+    
+    def store_result(file_path: str, strings: List[Dict[str, Any]], filter_counts: Dict[str, int]) -> None:
+        """合并过滤计数，更新文件缓存并保存提取结果"""
+        string_filter.merge_stats(filter_counts)
+        if not use_cache:
             return
+        file_hash = cache_manager.update_file_cache(file_path, {
+            'processed': True,
+            'strings_extracted': len(strings)
+        })
+        result_cache.put(file_path, root_dir, file_hash, strings, filter_counts)
     
-    if use_parallel and len(files_to_process) > 1:
-        # 使用并行处理
-        processor = ParallelProcessor(max_workers=max_workers, use_multiprocessing=False)
-        results = processor.process_files(files_to_process, _extract_strings_from_single_file, root_dir)
-        
-        # 输出并行处理结果
-        print(f"[INFO] 并行处理完成: 成功 {len(results['success'])} 个文件, 失败 {len(results['failed'])} 个文件, 耗时 {results['time']:.2f} 秒")
-        
-        # 逐个返回所有结果并更新缓存
-        for result in results['success']:
-            file_path = result['file']
-            yield from result['result']
+    replayed_count = 0
+    try:
+        if use_parallel and len(changed_files) > 1:
+            # 先回放未变更文件的缓存结果，缓存缺失的文件重新处理
+            files_to_process = []
+            for file_path in all_files:
+                cached = load_cached_result(file_path)
+                if cached is None:
+                    files_to_process.append(file_path)
+                else:
+                    replayed_count += 1
+                    yield from cached
             
-            # 更新缓存
-            if use_cache and cache_manager:
-                cache_manager.update_file_cache(file_path, {
-                    'processed': True,
-                    'strings_extracted': len(result['result'])
-                })
-    else:
-        # 顺序处理
-        for file_path in files_to_process:
-            strings = _extract_strings_from_single_file(file_path, root_dir)
-            yield from strings
+            # 使用并行处理，结果按完成顺序返回并更新缓存
+            start_time = time.time()
+            success_count = 0
+            failed_count = 0
+            for outcome in _iter_parallel_extraction(files_to_process, root_dir, max_workers, use_multiprocessing):
+                if outcome['error'] is not None:
+                    failed_count += 1
+                    print(f"[WARN]  提取文件失败: {outcome['file']} - {outcome['error']}")
+                    continue
+                success_count += 1
+                strings, filter_counts = outcome['result']
+                yield from strings
+                store_result(outcome['file'], strings, filter_counts)
             
-            # 更新缓存
-            if use_cache and cache_manager:
-                cache_manager.update_file_cache(file_path, {
-                    'processed': True,
-                    'strings_extracted': len(strings)
-                })
+            # 输出并行处理结果
+            print(f"[INFO] 并行处理完成: 成功 {success_count} 个文件, 失败 {failed_count} 个文件, 耗时 {time.time() - start_time:.2f} 秒")
+        else:
+            # 顺序处理，保持文件顺序
+            for file_path in all_files:
+                cached = load_cached_result(file_path)
+                if cached is not None:
+                    replayed_count += 1
+                    yield from cached
+                    continue
+                
+                strings, filter_counts = _extract_strings_with_filter_stats(file_path, root_dir)
+                yield from strings
+                store_result(file_path, strings, filter_counts)
+    finally:
+        if cache_manager:
+            cache_manager.flush()
+        if result_cache:
+            result_cache.close()
     
     if use_cache and cache_manager:
         # 输出缓存统计信息
         stats = cache_manager.get_cache_statistics()
+        print(f"[INFO] 从缓存回放 {replayed_count} 个文件的提取结果")
         print(f"[INFO] 缓存统计: 总文件 {stats['total_files']}, 缓存大小 {stats['total_size_mb']:.2f} MB")
+    
+    filter_stats = string_filter.get_stats()
+    if filter_stats:
+        details = ", ".join(f"{rule_name} {count}" for rule_name, count in
+                            sorted(filter_stats.items(), key=lambda item: item[1], reverse=True))
+        print(f"[INFO] 过滤字符串 {sum(filter_stats.values())} 个: {details}")
 
 
-import re
 import hashlib
 import json
 
+from .filter_utils import get_string_filter
+
 def generate_ast_signature(node: ASTNode) -> str:
     """
     生成稳定的AST签名，包含节点上下文信息和语法结构
@@ -506,74 +730,25 @@ def generate_occurrence_key(rel_path: str, ast_signature: str, literal_kind: str
     hash_input = f"{rel_path}|{ast_signature}|{literal_kind}"
     return hashlib.sha256(hash_input.encode()).hexdigest()[:16]
 
-def _should_filter_string(text: str) -> bool:
+def _should_filter_string(text: str, counters: Optional[Counter] = None) -> bool:
     """
     判断是否应该过滤字符串
     
+    过滤规则由config/string_filter.json配置，预编译后按从廉价到昂贵的顺序检查，
+    每条规则过滤的数量可通过get_string_filter().get_stats()获取
+    
     Args:
         text: 要判断的字符串
+        counters: 记录过滤计数的Counter，默认记录到模块级字符串过滤器
     
     Returns:
         bool: True表示应该过滤，False表示应该保留
     """
-    # 过滤空字符串
-    if not text:
-        return True
-    
-    # 过滤过短的字符串(长度小于2，除非是特殊字符'%'和'+')
-    if len(text) < 2 and text not in ['%', '+']:
-        return True
-    
-    # 通用标识符过滤(包含$开头和普通标识符)
-    if re.match(r'^\$?[a-zA-Z0-9_]+$', text):
-        return True
-    
-    # 过滤纯地址或者文件名的字符串
-    # 匹配规则：
-    # 1. 相对路径：以目录名开头，包含多个/或\分隔的目录，以文件名结尾
-    # 2. 绝对路径：以字母开头，包含多个/或\分隔的目录，以文件名结尾
-    # 3. 直接以文件名结尾，包含特定扩展名
-    is_path = re.match(r'^([a-zA-Z]:?[/\\]|[^/\\\s]+[/\\])[^/\\\s]+([/\\][^/\\\s]+)*$', text) is not None
-    is_config_file = re.match(r'^[^/\\]+\.(ini|xml|cfg|json|txt|yaml|yml)$', text) is not None
-    # 额外检查：如果包含/且不包含空格，并且路径中至少有一个/，可能是路径
-    is_likely_path = '/' in text and ' ' not in text and text.count('/') >= 1 and not re.search(r'[A-Z]', text) and not re.search(r'[^a-zA-Z0-9_./\\-]', text)
-    if is_path or is_config_file or is_likely_path:
-        return True
-    
-    # 过滤格式字符串相关
-    if text in ['%', '%s', ' sec', 'Level: ', 'DIR: ', 'placeholder_1', 'placeholder_2', 'sec', 'secs', 'second', 'seconds']:
-        return True
-    
-    # 过滤以example_开头的示例技能和属性名
-    if text.startswith('example_'):
-        return True
-    
-    # 过滤UI相关标识符
-    if 'icon_' in text or 'ui' in text.lower() or 'UI' in text:
-        return True
-    
-    # 过滤配置和设置项
-    config_items = ['noDeployCRPercent', 'cr_effect', 'deployCR', 'maxCR', 'minCR', 'cr', 'CR', 'dp', 'DP', 'deployPoints', 'deploy_points']
-    if text in config_items:
-        return True
-    
-    # 过滤注释中常见的调试字符串
-    debug_strings = ['wefwefwefwefe', 'efwefwefwefe', 'wefwefe', 'test', 'debug', 'DEBUG', 'Test', 'TEST']
-    if text in debug_strings:
-        return True
-    
-    # 过滤数值相关字符串
-    if re.match(r'^\d+(\.\d+)?$', text):
-        return True
-    
-    # 过滤仅包含特殊字符的字符串（排除%和+）
-    if text not in ['%', '+'] and re.match(r'^[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>/?~`]+$', text):
-        return True
-    
-    return False
+    return get_string_filter().should_filter(text, counters)
 
 
-def extract_strings_from_ast(tree: tree_sitter.Tree, file_path: str, root_dir: str = None) -> List[Dict[str, Any]]:
+def extract_strings_from_ast(tree: tree_sitter.Tree, file_path: str, root_dir: str = None,
+                             filter_counters: Optional[Counter] = None) -> List[Dict[str, Any]]:
     """
     从AST中提取字符串节点
     
@@ -581,6 +756,7 @@ def extract_strings_from_ast(tree: tree_sitter.Tree, file_path: str, root_dir: s
         tree: AST树
         file_path: 文件路径
         root_dir: 根目录路径，用于计算相对路径
+        filter_counters: 记录过滤计数的Counter，默认记录到模块级字符串过滤器
     
     Returns:
         List[Dict[str, Any]]: 提取的字符串列表
@@ -602,7 +778,7 @@ def extract_strings_from_ast(tree: tree_sitter.Tree, file_path: str, root_dir: s
                 text = text[1:-1]
             
             # 过滤不需要的字符串类型
-            if _should_filter_string(text):
+            if _should_filter_string(text, filter_counters):
                 # 跳过不需要的字符串
                 pass
             else:
@@ -660,21 +836,22 @@ def extract_strings_from_ast(tree: tree_sitter.Tree, file_path: str, root_dir: s
     return extracted_strings
 
 
-def extract_strings_from_file(file_path: str, root_dir: str = None) -> List[Dict[str, Any]]:
+def extract_strings_with_source(file_path: str, root_dir: str = None) -> Tuple[Optional[bytes], List[Dict[str, Any]]]:
     """
-    从单个文件中提取字符串
+    读取并解析文件一次，同时返回文件内容和提取的字符串
     
     Args:
         file_path: 文件路径
         root_dir: 根目录路径，用于计算相对路径
     
     Returns:
-        List[Dict[str, Any]]: 提取的字符串列表
+        Tuple[Optional[bytes], List[Dict[str, Any]]]: (文件内容, 提取的字符串列表)，
+            不支持的文件类型或读取失败时文件内容为None
     """
     # 获取解析器
     parser = get_parser(file_path)
     if not parser:
-        return []
+        return None, []
     
     # 读取文件内容
     try:
@@ -682,14 +859,14 @@ def extract_strings_from_file(file_path: str, root_dir: str = None) -> List[Dict
             code = f.read()
     except Exception as e:
         print(f"[WARN]  读取文件失败: {file_path} - {e}")
-        return []
+        return None, []
     
     # 解析代码生成AST
     try:
         tree = parser.parse(code)
     except Exception as e:
         print(f"[WARN]  解析文件失败: {file_path} - {e}")
-        return []
+        return code, []
     
     # 提取字符串
     strings = extract_strings_from_ast(tree, file_path, root_dir)
@@ -702,6 +879,20 @@ def extract_strings_from_file(file_path: str, root_dir: str = None) -> List[Dict
         original_literal = code[start_byte:end_byte].decode('utf-8')
         string["meta"]["literal"] = original_literal
     
-    return strings
+    return code, strings
+
+
+def extract_strings_from_file(file_path: str, root_dir: str = None) -> List[Dict[str, Any]]:
+    """
+    从单个文件中提取字符串
+    
+    Args:
+        file_path: 文件路径
+        root_dir: 根目录路径，用于计算相对路径
+    
+    Returns:
+        List[Dict[str, Any]]: 提取的字符串列表
+    """
+    return extract_strings_with_source(file_path, root_dir)[1]
 
 # 注意：不再在模块级别自动初始化，而是在需要时手动调用
\ No newline at end of file
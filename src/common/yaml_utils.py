@@ -6,12 +6,22 @@ YAML映射文件处理工具
 该模块包含YAML映射文件的加载、验证和应用功能。
 """
 
+import copy
 import os
 import yaml
 import re
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
+from .cache_utils import hash_file
 from .tree_sitter_utils import extract_ast_mappings
+from .rule_io import load_yaml, write_rule_file, write_rule_items
+from .translation_memory import DEFAULT_TRANSLATION_MEMORY_FILE, open_translation_memory
+
+
+# 按规则文件缓存的冲突检测结果：文件绝对路径 -> (文件状态签名, 内容哈希, 冲突信息)
+CONFLICT_CACHE_SIZE = 4
+_conflict_cache: "OrderedDict[str, Tuple[Tuple[int, int], str, Dict[str, Any]]]" = OrderedDict()
 
 
 class RuleConflictDetector:
@@ -21,41 +31,77 @@ class RuleConflictDetector:
     """
     
     @staticmethod
-    def detect_duplicate_ids(yaml_mappings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def iter_conflicts(yaml_mappings: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
         """
-        检测重复ID冲突
+        一次遍历检测所有类型的冲突
+        
+        遍历时同时按ID、原始字符串和翻译分组：重复ID在发现时立即返回，
+        重复原始字符串和翻译冲突需要完整的分组，在遍历结束后返回。
         
         Args:
-            yaml_mappings: YAML映射列表
+            yaml_mappings: YAML映射列表，可以是生成器
         
-        Returns:
-            List[Dict[str, Any]]: 冲突列表
+        Yields:
+            Dict[str, Any]: 冲突信息，type为duplicate_id、duplicate_original或translation_conflict
         """
-        conflicts = []
         id_map = {}
+        original_map = {}
+        # 原始字符串 -> (带翻译的映射列表, 按出现顺序去重的翻译)
+        translation_map = {}
         
         for i, mapping in enumerate(yaml_mappings):
             mapping_id = mapping.get("id")
             if mapping_id:
-                if mapping_id in id_map:
+                first = id_map.get(mapping_id)
+                if first is None:
+                    id_map[mapping_id] = (i, mapping)
+                else:
                     # 找到重复ID
-                    conflicts.append({
+                    yield {
                         "type": "duplicate_id",
                         "id": mapping_id,
                         "conflicts": [
-                            {"index": id_map[mapping_id][0], "mapping": id_map[mapping_id][1]},
+                            {"index": first[0], "mapping": first[1]},
                             {"index": i, "mapping": mapping}
                         ]
-                    })
-                else:
-                    id_map[mapping_id] = (i, mapping)
+                    }
+            
+            original = mapping.get("original")
+            if not original:
+                continue
+            original_map.setdefault(original, []).append({"index": i, "mapping": mapping})
+            
+            translated = mapping.get("translated")
+            if translated:
+                group = translation_map.get(original)
+                if group is None:
+                    group = translation_map[original] = ([], {})
+                group[0].append({"index": i, "mapping": mapping, "translated": translated})
+                group[1][translated] = None
+        
+        # 提取有多个映射的原始字符串
+        for original, mappings in original_map.items():
+            if len(mappings) > 1:
+                yield {
+                    "type": "duplicate_original",
+                    "original": original,
+                    "conflicts": mappings
+                }
         
-        return conflicts
+        # 提取有不同翻译的原始字符串
+        for original, (translations, unique_translations) in translation_map.items():
+            if len(unique_translations) > 1:
+                yield {
+                    "type": "translation_conflict",
+                    "original": original,
+                    "unique_translations": list(unique_translations),
+                    "conflicts": translations
+                }
     
     @staticmethod
-    def detect_duplicate_originals(yaml_mappings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def detect_duplicate_ids(yaml_mappings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        检测相同原始字符串但不同ID的冲突
+        检测重复ID冲突
         
         Args:
             yaml_mappings: YAML映射列表
@@ -63,28 +109,20 @@ class RuleConflictDetector:
         Returns:
             List[Dict[str, Any]]: 冲突列表
         """
-        conflicts = []
-        original_map = {}
-        
-        for i, mapping in enumerate(yaml_mappings):
-            original = mapping.get("original")
-            if original:
-                if original in original_map:
-                    # 找到相同原始字符串
-                    original_map[original].append({"index": i, "mapping": mapping})
-                else:
-                    original_map[original] = [{"index": i, "mapping": mapping}]
+        return RuleConflictDetector.detect_all_conflicts(yaml_mappings)["duplicate_ids"]
+    
+    @staticmethod
+    def detect_duplicate_originals(yaml_mappings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        检测相同原始字符串但不同ID的冲突
         
-        # 提取有多个映射的原始字符串
-        for original, mappings in original_map.items():
-            if len(mappings) > 1:
-                conflicts.append({
-                    "type": "duplicate_original",
-                    "original": original,
-                    "conflicts": mappings
-                })
+        Args:
+            yaml_mappings: YAML映射列表
         
-        return conflicts
+        Returns:
+            List[Dict[str, Any]]: 冲突列表
+        """
+        return RuleConflictDetector.detect_all_conflicts(yaml_mappings)["duplicate_originals"]
     
     @staticmethod
     def detect_translation_conflicts(yaml_mappings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -97,46 +135,10 @@ class RuleConflictDetector:
         Returns:
             List[Dict[str, Any]]: 冲突列表
         """
-        conflicts = []
-        original_map = {}
-        
-        for i, mapping in enumerate(yaml_mappings):
-            original = mapping.get("original")
-            translated = mapping.get("translated")
-            if original and translated:
-                if original in original_map:
-                    # 检查翻译是否不同
-                    existing_translations = original_map[original]
-                    has_conflict = False
-                    for existing in existing_translations:
-                        if existing["translated"] != translated:
-                            has_conflict = True
-                            break
-                    
-                    if has_conflict:
-                        existing_translations.append({"index": i, "mapping": mapping, "translated": translated})
-                    else:
-                        existing_translations.append({"index": i, "mapping": mapping, "translated": translated})
-                else:
-                    original_map[original] = [{"index": i, "mapping": mapping, "translated": translated}]
-        
-        # 提取有冲突的原始字符串
-        for original, translations in original_map.items():
-            if len(translations) > 1:
-                # 检查是否有不同的翻译
-                unique_translations = set(t["translated"] for t in translations)
-                if len(unique_translations) > 1:
-                    conflicts.append({
-                        "type": "translation_conflict",
-                        "original": original,
-                        "unique_translations": list(unique_translations),
-                        "conflicts": [t for t in translations]
-                    })
-        
-        return conflicts
+        return RuleConflictDetector.detect_all_conflicts(yaml_mappings)["translation_conflicts"]
     
     @staticmethod
-    def detect_all_conflicts(yaml_mappings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def detect_all_conflicts(yaml_mappings: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
         """
         检测所有类型的冲突
         
@@ -146,9 +148,12 @@ class RuleConflictDetector:
         Returns:
             Dict[str, Any]: 所有冲突信息
         """
-        duplicate_ids = RuleConflictDetector.detect_duplicate_ids(yaml_mappings)
-        duplicate_originals = RuleConflictDetector.detect_duplicate_originals(yaml_mappings)
-        translation_conflicts = RuleConflictDetector.detect_translation_conflicts(yaml_mappings)
+        grouped = {"duplicate_id": [], "duplicate_original": [], "translation_conflict": []}
+        for conflict in RuleConflictDetector.iter_conflicts(yaml_mappings):
+            grouped[conflict["type"]].append(conflict)
+        duplicate_ids = grouped["duplicate_id"]
+        duplicate_originals = grouped["duplicate_original"]
+        translation_conflicts = grouped["translation_conflict"]
         
         return {
             "total_conflicts": len(duplicate_ids) + len(duplicate_originals) + len(translation_conflicts),
@@ -162,6 +167,49 @@ class RuleConflictDetector:
             }
         }
     
+    @staticmethod
+    def detect_file_conflicts(rule_file: str, rules: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        检测规则文件中的冲突，未传入rules时按规则文件缓存检测结果
+        
+        同一次运行中对未变化的规则文件重复检测时直接返回缓存结果的副本：先比较文件大小和修改时间，
+        不同时再比较内容哈希。传入rules时规则可能与磁盘上的文件不同(例如在内存中解决冲突后尚未保存)，
+        此时直接检测，不使用也不更新缓存。
+        
+        Args:
+            rule_file: 规则文件路径
+            rules: 要检测的规则，为None时从文件加载并使用缓存
+        
+        Returns:
+            Dict[str, Any]: 所有冲突信息，格式与detect_all_conflicts相同，调用方可以修改
+        """
+        if rules is not None:
+            return RuleConflictDetector.detect_all_conflicts(rules)
+        
+        cache_key = os.path.abspath(rule_file)
+        try:
+            stat = os.stat(rule_file)
+            signature = (stat.st_size, stat.st_mtime_ns)
+            cached = _conflict_cache.get(cache_key)
+            if cached is not None and cached[0] == signature:
+                file_hash = cached[1]
+            else:
+                file_hash = hash_file(rule_file)
+        except OSError:
+            return RuleConflictDetector.detect_all_conflicts(load_yaml_mappings(rule_file))
+        
+        if cached is not None and cached[1] == file_hash:
+            _conflict_cache[cache_key] = (signature, file_hash, cached[2])
+            _conflict_cache.move_to_end(cache_key)
+            return copy.deepcopy(cached[2])
+        
+        conflicts = RuleConflictDetector.detect_all_conflicts(load_yaml_mappings(rule_file))
+        _conflict_cache[cache_key] = (signature, file_hash, conflicts)
+        _conflict_cache.move_to_end(cache_key)
+        while len(_conflict_cache) > CONFLICT_CACHE_SIZE:
+            _conflict_cache.popitem(last=False)
+        return copy.deepcopy(conflicts)
+    
     @staticmethod
     def resolve_conflicts(mappings: List[Dict[str, Any]], conflicts: Dict[str, Any], resolution_strategy: str = "latest") -> List[Dict[str, Any]]:
         """
@@ -418,7 +466,7 @@ class YAMLMappingValidator:
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                yaml_data = yaml.safe_load(f)
+                yaml_data = load_yaml(f)
         except yaml.YAMLError as e:
             errors.append(f"YAML解析错误: {e}")
             return errors
@@ -451,7 +499,7 @@ def load_yaml_mappings(file_path: str) -> List[Dict[str, Any]]:
     """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            yaml_data = yaml.safe_load(f)
+            yaml_data = load_yaml(f)
         
         if not yaml_data:
             return []
@@ -608,7 +656,7 @@ def list_yaml_versions(directory: str) -> List[Dict[str, Any]]:
             file_path = os.path.join(backup_dir, file_name)
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    yaml_data = yaml.safe_load(f)
+                    yaml_data = load_yaml(f)
                 
                 # 提取版本信息
                 version = _get_yaml_version(yaml_data)
@@ -692,13 +740,13 @@ def _get_yaml_mappings(yaml_data: Any) -> List[Dict[str, Any]]:
         return yaml_data["mappings"]
     return []
 
-def _save_yaml_version(file_path: str, mappings: List[Dict[str, Any]], version: str = "1.0", mod_id: str = "") -> bool:
+def _save_yaml_version(file_path: str, mappings: Iterable[Dict[str, Any]], version: str = "1.0", mod_id: str = "") -> bool:
     """
     保存带有版本信息的YAML映射
     
     Args:
         file_path: 文件路径
-        mappings: 映射列表
+        mappings: 映射列表，可以是生成器
         version: 版本号
         mod_id: 模组ID，用于直接匹配文件夹
     
@@ -706,12 +754,11 @@ def _save_yaml_version(file_path: str, mappings: List[Dict[str, Any]], version:
         bool: 是否保存成功
     """
     try:
-        # 创建带有版本信息的YAML结构
-        yaml_data = {
+        # 创建带有版本信息的YAML结构，mappings字段在最后分批写入
+        metadata = {
             "version": version,
             "created_at": datetime.now().isoformat(),
             "id": mod_id,  # 添加mod_id字段，用于直接匹配文件夹
-            "mappings": mappings
         }
         
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -730,19 +777,19 @@ def _save_yaml_version(file_path: str, mappings: List[Dict[str, Any]], version:
             f.write("#   status: 翻译状态，可选值：untranslated, translated, needs_review\n")
             f.write("#   placeholders: 占位符列表\n")
             f.write("\n")
-            yaml.dump(yaml_data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+            write_rule_file(f, metadata, mappings)
         
         return True
     except Exception as e:
         print(f"[ERROR] 保存带版本信息的YAML映射失败: {file_path} - {e}")
         return False
 
-def save_yaml_mappings(mappings: List[Dict[str, Any]], file_path: str, version_control: bool = True, mod_id: str = "") -> bool:
+def save_yaml_mappings(mappings: Iterable[Dict[str, Any]], file_path: str, version_control: bool = True, mod_id: str = "") -> bool:
     """
     保存YAML映射到文件，支持版本控制
     
     Args:
-        mappings: YAML映射列表
+        mappings: YAML映射列表，可以是生成器，按顺序流式写入
         file_path: 文件路径
         version_control: 是否启用版本控制
         mod_id: 模组ID，用于直接匹配文件夹
@@ -788,7 +835,7 @@ def save_yaml_mappings(mappings: List[Dict[str, Any]], file_path: str, version_c
                 f.write("#   status: 翻译状态，可选值：untranslated, translated, needs_review\n")
                 f.write("#   placeholders: 占位符列表\n")
                 f.write("\n")
-                yaml.dump(mappings, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+                write_rule_items(f, mappings)
             success = True
         
         if success:
@@ -937,7 +984,106 @@ def generate_incremental_rules(english_mappings: List[Dict[str, Any]], existing_
     return incremental_rules
 
 
-def update_translation_rules(existing_rules_file: str, new_english_file: str, new_chinese_file: str, output_file: str, mod_id: str = "") -> bool:
+def merge_translation_rules(existing_rules: List[Dict[str, Any]], english_mappings: List[Dict[str, Any]],
+                            chinese_mappings: List[Dict[str, Any]]) -> Tuple[Iterator[Dict[str, Any]], Dict[str, int]]:
+    """
+    按原始字符串合并现有规则和新的双语对
+    
+    以现有规则为构建侧建立原始字符串哈希表，用双语对一次探测完成连接，统计在输出之前完成，
+    合并后的规则由生成器逐条产生，可以直接交给规则文件的流式写入。
+    
+    合并结果与逐条更新一致：
+    - 原始字符串已存在的双语对更新对应规则(同一原始字符串有多条规则时以最后一条为准)的翻译和状态，
+      按规则指纹判断翻译和状态都未变化时保持原规则不变，不刷新updated_at
+    - 其余双语对生成新规则
+    - 未被双语对命中的现有规则按原始字符串去重后保留在末尾
+    - 缺少原始字符串的现有规则以及被更新规则取代的重复规则被移除
+    
+    Args:
+        existing_rules: 现有规则列表
+        english_mappings: 新的英文映射列表，已与中文映射对齐
+        chinese_mappings: 新的中文映射列表
+    
+    Returns:
+        Tuple[Iterator[Dict[str, Any]], Dict[str, int]]: (合并后的规则生成器, 统计信息)，
+        统计信息包含new、updated、kept、removed、skipped和total
+    """
+    # 构建侧：原始字符串 -> 现有规则
+    existing_dict = {}
+    for rule in existing_rules:
+        original = rule.get('original')
+        if original:
+            existing_dict[original] = rule
+    
+    stats = {"new": 0, "updated": 0, "kept": 0, "removed": 0, "skipped": 0, "total": 0}
+    
+    # 探测侧：统计双语对命中情况
+    pairs = []
+    matched = set()
+    for i, (en_item, zh_item) in enumerate(zip(english_mappings, chinese_mappings)):
+        original = en_item.get('original')
+        if not original:
+            print(f"[WARN] 跳过缺少original字段的新英文映射条目 #{i+1}")
+            stats["skipped"] += 1
+            continue
+        
+        existing_rule = existing_dict.get(original)
+        if existing_rule is not None:
+            matched.add(original)
+            stats["updated"] += 1
+        else:
+            stats["new"] += 1
+        pairs.append((i, en_item, zh_item.get('original', ''), existing_rule))
+    
+    # 未被命中的现有规则，每个原始字符串保留第一条
+    kept_rules = []
+    kept_originals = set()
+    for rule in existing_rules:
+        original = rule.get('original')
+        if not original:
+            stats["removed"] += 1
+        elif original in matched:
+            if rule is not existing_dict[original]:
+                stats["removed"] += 1
+        elif original in kept_originals:
+            stats["removed"] += 1
+        else:
+            kept_originals.add(original)
+            kept_rules.append(rule)
+    stats["kept"] = len(kept_rules)
+    stats["total"] = len(pairs) + len(kept_rules)
+    
+    def generate() -> Iterator[Dict[str, Any]]:
+        for i, en_item, translated, existing_rule in pairs:
+            if existing_rule is not None:
+                # 已有该原始字符串的规则，只更新翻译和状态，保留其他字段
+                updated_rule = existing_rule.copy()
+                updated_rule['translated'] = translated
+                updated_rule['status'] = 'translated'
+                if (existing_rule.get('translated'), existing_rule.get('status')) != (translated, 'translated'):
+                    updated_rule['updated_at'] = datetime.now().isoformat()
+                yield updated_rule
+            else:
+                # 新的原始字符串，创建新规则
+                yield {
+                    'id': en_item.get('id', f'auto_{i+1}'),
+                    'original': en_item.get('original'),
+                    'translated': translated,
+                    'context': en_item.get('context', {}),
+                    'status': 'translated',
+                    'placeholders': en_item.get('placeholders', []),
+                    'created_at': datetime.now().isoformat()
+                }
+        
+        # 添加未在新映射中出现的现有规则（保留未翻译内容）
+        for rule in kept_rules:
+            yield rule.copy()
+    
+    return generate(), stats
+
+
+def update_translation_rules(existing_rules_file: str, new_english_file: str, new_chinese_file: str, output_file: str, mod_id: str = "",
+                             translation_memory_file: Optional[str] = DEFAULT_TRANSLATION_MEMORY_FILE) -> bool:
     """
     更新现有规则，确保增量学习
     
@@ -947,6 +1093,7 @@ def update_translation_rules(existing_rules_file: str, new_english_file: str, ne
         new_chinese_file: 新的中文映射文件路径
         output_file: 输出文件路径
         mod_id: 模组ID
+        translation_memory_file: 翻译记忆库文件路径，保存规则时顺带写入其中的翻译，为None时不写入
         
     Returns:
         bool: 是否更新成功
@@ -980,75 +1127,33 @@ def update_translation_rules(existing_rules_file: str, new_english_file: str, ne
         new_chinese_mappings = new_chinese_mappings[:min_len]
         print(f"[INFO] 只处理前{min_len}条新映射数据")
     
-    # 创建现有规则的字典，用于快速查找
-    existing_dict = {}
-    for rule in existing_rules:
-        original = rule.get('original')
-        if original:
-            existing_dict[original] = rule
-    
-    # 生成更新后的规则
-    updated_rules = []
-    new_entries = 0
-    updated_entries = 0
-    skipped_entries = 0
-    
-    for i, (en_item, zh_item) in enumerate(zip(new_english_mappings, new_chinese_mappings)):
-        original = en_item.get('original')
-        if not original:
-            print(f"[WARN] 跳过缺少original字段的新英文映射条目 #{i+1}")
-            skipped_entries += 1
-            continue
-        
-        translated = zh_item.get('original', '')
-        
-        if original in existing_dict:
-            # 已有该原始字符串的规则，更新翻译
-            existing_rule = existing_dict[original].copy()
-            
-            # 只更新翻译和状态，保留其他字段
-            existing_rule['translated'] = translated
-            existing_rule['status'] = 'translated'
-            existing_rule['updated_at'] = datetime.now().isoformat()
-            
-            updated_rules.append(existing_rule)
-            updated_entries += 1
-        else:
-            # 新的原始字符串，创建新规则
-            new_rule = {
-                'id': en_item.get('id', f'auto_{i+1}'),
-                'original': original,
-                'translated': translated,
-                'context': en_item.get('context', {}),
-                'status': 'translated',
-                'placeholders': en_item.get('placeholders', []),
-                'created_at': datetime.now().isoformat()
-            }
-            updated_rules.append(new_rule)
-            new_entries += 1
-    
-    # 添加未在新映射中出现的现有规则（保留未翻译内容）
-    for rule in existing_rules:
-        original = rule.get('original')
-        if original and original not in {r.get('original') for r in updated_rules}:
-            updated_rules.append(rule.copy())
-            skipped_entries += 1
+    # 合并规则，输出以生成器的形式流式写入规则文件
+    merged_rules, stats = merge_translation_rules(existing_rules, new_english_mappings, new_chinese_mappings)
     
     # 检查更新后的规则数量
-    if not updated_rules:
+    if not stats["total"]:
         print(f"[ERROR] 没有生成任何更新后的规则")
         return False
     
-    # 保存更新后的规则
-    success = save_yaml_mappings(updated_rules, output_file, version_control=True, mod_id=mod_id)
+    # 保存更新后的规则，同时增量写入翻译记忆库
+    translation_memory = open_translation_memory(translation_memory_file)
+    if translation_memory is not None:
+        merged_rules = translation_memory.record(merged_rules)
+    try:
+        success = save_yaml_mappings(merged_rules, output_file, version_control=True, mod_id=mod_id)
+    finally:
+        if translation_memory is not None:
+            translation_memory.close()
     
     if success:
         print(f"[OK] 翻译规则已更新到: {output_file}")
         print(f"[OK] 更新统计:")
-        print(f"      新增规则: {new_entries} 条")
-        print(f"      更新规则: {updated_entries} 条")
-        print(f"      跳过规则: {skipped_entries} 条")
-        print(f"      总规则数: {len(updated_rules)} 条")
+        print(f"      新增规则: {stats['new']} 条")
+        print(f"      更新规则: {stats['updated']} 条")
+        print(f"      保留规则: {stats['kept']} 条")
+        print(f"      移除规则: {stats['removed']} 条")
+        print(f"      跳过条目: {stats['skipped']} 条")
+        print(f"      总规则数: {stats['total']} 条")
     else:
         print(f"[ERROR] 翻译规则更新失败")
     
@@ -1147,76 +1252,236 @@ def generate_legal_literal_token(original_literal: str, translated_text: str) ->
     return f'{quote_type}{translated}{quote_type}'
 
 
-def apply_yaml_mapping(source_file: str, yaml_mappings: List[Dict[str, Any]]) -> str:
+def _build_mapping_dict(yaml_mappings: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     """
-    应用YAML映射到源代码文件
+    创建映射字典，使用occurrence_key作为键，只保留可以回写的映射
     
     Args:
-        source_file: 源代码文件路径
         yaml_mappings: YAML映射列表
     
     Returns:
-        str: 应用映射后的源代码
+        Dict[str, Dict[str, Any]]: occurrence_key到映射的字典
     """
-    from src.common.tree_sitter_utils import extract_strings_from_file
-    
-    # 提取源文件中的字符串
-    source_strings = extract_strings_from_file(source_file)
-    
-    if not source_strings:
-        print(f"[WARN]  未从文件 {source_file} 提取到任何字符串")
-        # 读取并返回原始内容
-        try:
-            with open(source_file, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            print(f"[WARN]  读取源文件失败: {source_file} - {e}")
-            return ""
-    
-    # 创建映射字典，使用occurrence_key作为键
     mapping_dict = {}
     for mapping in yaml_mappings:
         rule_id = mapping.get("id")
         if rule_id and "translated" in mapping and mapping["status"] in ["translated", "untranslated"]:
             mapping_dict[rule_id] = mapping
+    return mapping_dict
+
+
+class MappingRuleIndex:
+    """
+    映射规则索引
+    以occurrence_key为键保存可回写的映射规则，一次加载后可供多个文件只读共享
+    """
     
-    # 读取源文件内容
-    try:
-        with open(source_file, 'rb') as f:
-            content = f.read()
-    except Exception as e:
-        print(f"[WARN]  读取源文件失败: {source_file} - {e}")
-        return ""
+    def __init__(self, yaml_mappings: Optional[List[Dict[str, Any]]] = None):
+        """
+        初始化映射规则索引
+        
+        Args:
+            yaml_mappings: YAML映射列表
+        """
+        self.mapping_dict = _build_mapping_dict(yaml_mappings or [])
     
-    # 应用映射，从后往前替换，避免位置偏移问题
-    # 按start_byte从大到小排序
-    sorted_strings = sorted(source_strings, key=lambda x: x["meta"]["start_byte"], reverse=True)
+    @classmethod
+    def from_paths(cls, rules_path: Any) -> "MappingRuleIndex":
+        """
+        从规则文件或规则文件夹加载映射规则索引
+        
+        Args:
+            rules_path: 规则文件路径、规则文件夹路径或包含路径的列表
+        
+        Returns:
+            MappingRuleIndex: 映射规则索引
+        """
+        from .file_utils import load_mapping_rules
+        return cls(load_mapping_rules(rules_path))
     
-    result = content
+    def get(self, occurrence_key: str) -> Optional[Dict[str, Any]]:
+        """
+        根据occurrence_key获取映射规则
+        """
+        return self.mapping_dict.get(occurrence_key)
+    
+    def __contains__(self, occurrence_key: str) -> bool:
+        return occurrence_key in self.mapping_dict
+    
+    def __len__(self) -> int:
+        return len(self.mapping_dict)
+
+
+def _resolve_mapping_dict(yaml_mappings: Union[List[Dict[str, Any]], MappingRuleIndex]) -> Dict[str, Dict[str, Any]]:
+    """
+    获取映射字典，传入映射规则索引时直接复用其中已建好的字典
+    """
+    if isinstance(yaml_mappings, MappingRuleIndex):
+        return yaml_mappings.mapping_dict
+    return _build_mapping_dict(yaml_mappings)
+
+
+def _strip_literal_quotes(text: str) -> str:
+    """
+    去除字面量两端的引号，与提取时的处理保持一致
+    """
+    if text.startswith('"') and text.endswith('"'):
+        return text[1:-1]
+    if text.startswith("'") and text.endswith("'"):
+        return text[1:-1]
+    return text
+
+
+def _attach_literals(content: bytes, source_strings: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    使用提取时记录的字节范围从文件内容中取出原始字面量
+
+    Args:
+        content: 文件内容
+        source_strings: 提取结果，包含meta.start_byte/end_byte
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: 补充了meta.literal的提取结果，
+            字节范围与文件内容不一致(文件在提取后被修改)时返回None
+    """
+    resolved = []
+    for string_info in source_strings:
+        meta = string_info.get("meta", {})
+        start_byte = meta.get("start_byte")
+        end_byte = meta.get("end_byte")
+        if start_byte is None or end_byte is None or end_byte > len(content):
+            return None
+        try:
+            literal = content[start_byte:end_byte].decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+        if _strip_literal_quotes(literal) != string_info.get("original"):
+            return None
+        resolved.append({**string_info, "meta": {**meta, "literal": literal}})
+    return resolved
+
+
+def _apply_mappings_to_content(source_file: str, content: bytes, source_strings: List[Dict[str, Any]],
+                               mapping_dict: Dict[str, Dict[str, Any]]) -> Tuple[bytes, int, int]:
+    """
+    按字节范围将映射应用到文件内容
+    
+    Args:
+        source_file: 源代码文件路径，仅用于输出日志
+        content: 文件内容
+        source_strings: 提取结果，包含字节范围和原始字面量
+        mapping_dict: occurrence_key到映射的字典
+    
+    Returns:
+        Tuple[bytes, int, int]: (应用映射后的内容, 替换数量, 未映射数量)
+    """
+    # 按start_byte从小到大排序，收集替换片段后一次性拼接，避免逐个切片拼接带来的平方复杂度
+    # 起始位置相同时较长的范围在前，保证外层字面量优先
+    sorted_strings = sorted(source_strings, key=lambda x: (x["meta"]["start_byte"], -x["meta"]["end_byte"]))
+    
+    view = memoryview(content)
+    parts = []
+    last_end = 0
+    replaced_count = 0
+    unmapped_count = 0
     for string_info in sorted_strings:
         occurrence_key = string_info["id"]
+        line_num = string_info["meta"]["line"]
         if occurrence_key in mapping_dict:
             mapping = mapping_dict[occurrence_key]
             translated = mapping["translated"]
             
+            start_byte = string_info["meta"]["start_byte"]
+            end_byte = string_info["meta"]["end_byte"]
+            
+            # 校验替换范围，重叠或越界的范围会破坏输出，跳过
+            if start_byte < last_end or end_byte < start_byte or end_byte > len(content):
+                print(f"[WARN]  替换范围重叠或无效，已跳过: {source_file}:{line_num} - "
+                      f"{string_info['original']} ({start_byte}-{end_byte})")
+                continue
+            
             # 获取原始字面量（包含引号）
             original_literal = string_info.get("literal", string_info["meta"].get("literal", f'"{string_info["original"]}"'))
             
             # 生成合法的字面量token
             legal_literal = generate_legal_literal_token(original_literal, translated)
             
-            start_byte = string_info["meta"]["start_byte"]
-            end_byte = string_info["meta"]["end_byte"]
-            
-            # 替换字符串内容
-            result = result[:start_byte] + legal_literal.encode('utf-8') + result[end_byte:]
-            line_num = string_info["meta"]["line"]
+            # 记录替换片段
+            parts.append(view[last_end:start_byte])
+            parts.append(legal_literal.encode('utf-8'))
+            last_end = end_byte
+            replaced_count += 1
             print(f"OK 替换 {source_file}:{line_num} - {string_info['original']} -> {translated}")
         else:
             # 未在映射规则中找到的字符串，标记为未映射
-            line_num = string_info["meta"]["line"]
+            unmapped_count += 1
             print(f"[WARN]  未映射内容: {source_file}:{line_num} - {string_info['original']} (occurrence_key: {occurrence_key})")
     
+    if not parts:
+        return content, replaced_count, unmapped_count
+    
+    parts.append(view[last_end:])
+    result = b"".join(parts)
+    return result, replaced_count, unmapped_count
+
+
+def _load_source_for_apply(source_file: str, source_strings: Optional[List[Dict[str, Any]]] = None,
+                           root_dir: str = None) -> Tuple[Optional[bytes], List[Dict[str, Any]]]:
+    """
+    读取源文件并获取字符串的字节范围，每个文件最多读取和解析一次
+
+    提供了提取阶段的结果时直接复用其中的字节范围；
+    文件在提取后发生变化时重新解析。
+    """
+    from src.common.tree_sitter_utils import extract_strings_with_source
+    
+    if source_strings is not None:
+        try:
+            with open(source_file, 'rb') as f:
+                content = f.read()
+        except Exception as e:
+            print(f"[WARN]  读取源文件失败: {source_file} - {e}")
+            return None, []
+        resolved = _attach_literals(content, source_strings)
+        if resolved is not None:
+            return content, resolved
+        print(f"[WARN]  文件 {source_file} 在提取后已被修改，重新解析")
+    
+    content, strings = extract_strings_with_source(source_file, root_dir)
+    if content is None:
+        # 不支持解析的文件类型，原样读取
+        try:
+            with open(source_file, 'rb') as f:
+                content = f.read()
+        except Exception as e:
+            print(f"[WARN]  读取源文件失败: {source_file} - {e}")
+            return None, []
+    return content, strings
+
+
+def apply_yaml_mapping(source_file: str, yaml_mappings: Union[List[Dict[str, Any]], MappingRuleIndex],
+                       source_strings: Optional[List[Dict[str, Any]]] = None, root_dir: str = None) -> str:
+    """
+    应用YAML映射到源代码文件
+    
+    Args:
+        source_file: 源代码文件路径
+        yaml_mappings: YAML映射列表或映射规则索引
+        source_strings: 提取阶段得到的该文件字符串列表，提供时复用其字节范围而不重新解析
+        root_dir: 根目录路径，用于计算occurrence_key中的相对路径
+    
+    Returns:
+        str: 应用映射后的源代码
+    """
+    content, source_strings = _load_source_for_apply(source_file, source_strings, root_dir)
+    if content is None:
+        return ""
+    
+    if not source_strings:
+        print(f"[WARN]  未从文件 {source_file} 提取到任何字符串")
+    
+    result, _, _ = _apply_mappings_to_content(source_file, content, source_strings, _resolve_mapping_dict(yaml_mappings))
+    
     # 返回应用映射后的内容
     try:
         return result.decode('utf-8')
@@ -1225,6 +1490,64 @@ def apply_yaml_mapping(source_file: str, yaml_mappings: List[Dict[str, Any]]) ->
         return ""
 
 
+def write_yaml_mapping(source_file: str, target_file: str,
+                       yaml_mappings: Union[List[Dict[str, Any]], MappingRuleIndex],
+                       source_strings: Optional[List[Dict[str, Any]]] = None, root_dir: str = None,
+                       dry_run: bool = False) -> Dict[str, Any]:
+    """
+    应用YAML映射并将结果直接写入目标文件，每个文件只解析一次
+    
+    Args:
+        source_file: 源代码文件路径
+        target_file: 目标文件路径，可以与源文件相同
+        yaml_mappings: YAML映射列表或映射规则索引
+        source_strings: 提取阶段得到的该文件字符串列表，提供时复用其字节范围而不重新解析
+        root_dir: 根目录路径，用于计算occurrence_key中的相对路径
+        dry_run: 只生成差异，不写入目标文件
+    
+    Returns:
+        Dict[str, Any]: 处理结果，包含status、replaced、unmapped以及dry_run时的diff
+    """
+    result = {
+        "file": source_file,
+        "target": target_file,
+        "status": "success",
+        "replaced": 0,
+        "unmapped": 0,
+        "diff": ""
+    }
+    
+    content, source_strings = _load_source_for_apply(source_file, source_strings, root_dir)
+    if content is None:
+        result["status"] = "fail"
+        result["error"] = "读取源文件失败"
+        return result
+    
+    new_content, result["replaced"], result["unmapped"] = _apply_mappings_to_content(
+        source_file, content, source_strings, _resolve_mapping_dict(yaml_mappings)
+    )
+    
+    if dry_run:
+        import difflib
+        old_lines = content.decode('utf-8', errors='replace').splitlines(keepends=True)
+        new_lines = new_content.decode('utf-8', errors='replace').splitlines(keepends=True)
+        result["diff"] = "".join(difflib.unified_diff(old_lines, new_lines, fromfile=source_file, tofile=target_file))
+        return result
+    
+    try:
+        target_dir = os.path.dirname(target_file)
+        if target_dir:
+            os.makedirs(target_dir, exist_ok=True)
+        with open(target_file, 'wb') as f:
+            f.write(new_content)
+    except Exception as e:
+        print(f"[WARN]  写入目标文件失败: {target_file} - {e}")
+        result["status"] = "fail"
+        result["error"] = str(e)
+    
+    return result
+
+
 def create_yaml_mapping_from_directory(root_dir: str, output_file: str) -> bool:
     """
     从目录创建YAML映射文件
@@ -1459,7 +1782,8 @@ def generate_unmapped_report(rules: List[Dict[str, Any]], output_file: str = Non
     return report
 
 
-def generate_translation_report(rules: List[Dict[str, Any]], output_file: str = None, format: str = "markdown") -> Dict[str, Any]:
+def generate_translation_report(rules: List[Dict[str, Any]], output_file: str = None, format: str = "markdown",
+                                conflicts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     生成完整的翻译报告
     
@@ -1467,6 +1791,7 @@ def generate_translation_report(rules: List[Dict[str, Any]], output_file: str =
         rules: 映射规则列表
         output_file: 输出报告文件路径
         format: 报告格式，可选值：markdown, json
+        conflicts: 已对这些规则完成的冲突检测结果，为None时重新检测
     
     Returns:
         Dict[str, Any]: 翻译报告
@@ -1497,8 +1822,8 @@ def generate_translation_report(rules: List[Dict[str, Any]], output_file: str =
     translation_progress = (translated_count / total_rules) * 100 if total_rules > 0 else 0
     
     # 检测冲突
-    detector = RuleConflictDetector()
-    conflicts = detector.detect_all_conflicts(rules)
+    if conflicts is None:
+        conflicts = RuleConflictDetector.detect_all_conflicts(rules)
     
     # 按文件路径分组统计
     file_statistics = {}
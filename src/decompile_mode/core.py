@@ -24,6 +24,7 @@ from src.common.jar_utils import (
     decompile_all_jars_in_dir,
     extract_jar,
     find_jar_files,
+    TEXT_RESOURCE_EXTENSIONS,
     check_java_environment,
     check_decompiler_tools
 )
@@ -34,7 +35,8 @@ from src.common.flow_executor import FlowManager, FlowResult
 logger = setup_logger("decompile_mode")
 
 
-def run_decompile_sub_flow(sub_flow: str, base_path: str = None) -> Dict[str, Any]:
+def run_decompile_sub_flow(sub_flow: str, base_path: str = None, incremental: bool = False,
+                           use_workers: bool = False, resources_only: bool = False) -> Dict[str, Any]:
     """
     执行反编译指定子流程
 
@@ -45,6 +47,9 @@ def run_decompile_sub_flow(sub_flow: str, base_path: str = None) -> Dict[str, An
             - 提取单个JAR文件内容
             - 提取目录中所有JAR文件内容
         base_path: 基础路径，默认从配置获取
+        incremental: 反编译目录中所有JAR文件时是否增量反编译
+        use_workers: 反编译目录中所有JAR文件时是否使用常驻反编译进程池
+        resources_only: 提取JAR文件内容时是否只提取文本资源(.properties、.json、.csv等)
 
     Returns:
         Dict[str, Any]: 执行结果，包含output_path、mode和language
@@ -152,7 +157,8 @@ def run_decompile_sub_flow(sub_flow: str, base_path: str = None) -> Dict[str, An
                     all_fail_reasons.extend(result.data["fail_reasons"])
             elif sub_flow == "反编译目录中所有JAR文件":
                 # 实现反编译目录中所有JAR文件的逻辑
-                result = decompile_all_jars(language_source_dir, decompile_output_dir)
+                result = decompile_all_jars(language_source_dir, decompile_output_dir,
+                                            incremental=incremental, use_workers=use_workers)
                 all_results.append(result)
                 total_count += result.data["total_count"]
                 success_count += result.data["success_count"]
@@ -166,14 +172,14 @@ def run_decompile_sub_flow(sub_flow: str, base_path: str = None) -> Dict[str, An
                     jar_path = jar_files[0]
                     jar_name = os.path.basename(jar_path).replace(".jar", "")
                     jar_output_dir = os.path.join(extract_output_dir, jar_name)
-                    result = extract_single_jar(jar_path, jar_output_dir)
+                    result = extract_single_jar(jar_path, jar_output_dir, resources_only)
                     all_results.append(result)
                     success_count += result.data["success_count"]
                     fail_count += result.data["fail_count"]
                     all_fail_reasons.extend(result.data["fail_reasons"])
             elif sub_flow == "提取目录中所有JAR文件内容":
                 # 实现提取目录中所有JAR文件内容的逻辑
-                result = extract_all_jars(language_source_dir, extract_output_dir)
+                result = extract_all_jars(language_source_dir, extract_output_dir, resources_only)
                 all_results.append(result)
                 total_count += result.data["total_count"]
                 success_count += result.data["success_count"]
@@ -275,7 +281,8 @@ def decompile_single_jar(jar_path: str, output_dir: str, decompiler: str = "cfr"
         )
 
 
-def decompile_all_jars(input_dir: str, output_dir: str, max_workers: int = 4, decompiler: str = "cfr") -> FlowResult:
+def decompile_all_jars(input_dir: str, output_dir: str, max_workers: int = 4, decompiler: str = "cfr",
+                       incremental: bool = False, use_workers: bool = False) -> FlowResult:
     """
     反编译目录中所有JAR文件
     
@@ -284,13 +291,16 @@ def decompile_all_jars(input_dir: str, output_dir: str, max_workers: int = 4, de
         output_dir: 输出目录
         max_workers: 并行工作线程数
         decompiler: 反编译工具，可选值：cfr或procyon
+        incremental: 是否增量反编译，输出目录已有上次的反编译结果时只重新反编译变更的类
+        use_workers: 是否使用常驻反编译进程池
     
     Returns:
         FlowResult: 执行结果
     """
     try:
         # 执行批量反编译，使用并行处理
-        results = decompile_all_jars_in_dir(input_dir, output_dir, max_workers=max_workers, decompiler=decompiler)
+        results = decompile_all_jars_in_dir(input_dir, output_dir, max_workers=max_workers, decompiler=decompiler,
+                                            incremental=incremental, use_workers=use_workers)
         
         # 统计结果
         total_count = len(results)
@@ -358,20 +368,21 @@ def decompile_all_jars(input_dir: str, output_dir: str, max_workers: int = 4, de
         )
 
 
-def extract_single_jar(jar_path: str, output_dir: str) -> FlowResult:
+def extract_single_jar(jar_path: str, output_dir: str, resources_only: bool = False) -> FlowResult:
     """
     提取单个JAR文件内容
     
     Args:
         jar_path: JAR文件路径
         output_dir: 输出目录
+        resources_only: 是否只提取文本资源(.properties、.json、.csv等)，其余条目不写入磁盘
     
     Returns:
         FlowResult: 执行结果
     """
     try:
         # 执行提取
-        success = extract_jar(jar_path, output_dir)
+        success = extract_jar(jar_path, output_dir, TEXT_RESOURCE_EXTENSIONS if resources_only else None)
         
         # 生成结果
         status = "success" if success else "fail"
@@ -402,13 +413,14 @@ def extract_single_jar(jar_path: str, output_dir: str) -> FlowResult:
         )
 
 
-def extract_all_jars(input_dir: str, output_dir: str) -> FlowResult:
+def extract_all_jars(input_dir: str, output_dir: str, resources_only: bool = False) -> FlowResult:
     """
     提取目录中所有JAR文件内容
     
     Args:
         input_dir: 包含JAR文件的输入目录
         output_dir: 输出目录
+        resources_only: 是否只提取文本资源(.properties、.json、.csv等)，其余条目不写入磁盘
     
     Returns:
         FlowResult: 执行结果
@@ -441,7 +453,7 @@ def extract_all_jars(input_dir: str, output_dir: str) -> FlowResult:
             jar_name = os.path.basename(jar_path).replace(".jar", "")
             jar_output_dir = os.path.join(output_dir, jar_name)
             
-            if extract_jar(jar_path, jar_output_dir):
+            if extract_jar(jar_path, jar_output_dir, TEXT_RESOURCE_EXTENSIONS if resources_only else None):
                 success_count += 1
                 
                 # 为每个成功的提取生成单独的报告
@@ -16,7 +16,7 @@ Extend模式核心模块
 
 import os
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 # 注意：不需要添加sys.path，main.py已经设置了正确的Python搜索路径
 
@@ -27,6 +27,8 @@ from src.common import (generate_report,  # noqa: E402, E501
                         setup_logger, get_logger, log_progress, log_result)  # noqa: E402, E501
 from src.common.config_utils import get_directory  # noqa: E402
 from src.common.yaml_utils import (
+    MappingRuleIndex,
+    write_yaml_mapping,
     extract_mappings_from_processed_folder, 
     load_yaml_mappings, 
     merge_mapping_rules,
@@ -38,7 +40,7 @@ from src.common.yaml_utils import (
 logger = setup_logger("extend_mode")
 
 
-def run_extend_sub_flow(sub_flow: str, base_path: str = None) -> Dict[str, Any]:
+def run_extend_sub_flow(sub_flow: str, base_path: str = None, jobs: int = 1) -> Dict[str, Any]:
     """
     执行Extend指定子流程
 
@@ -51,6 +53,7 @@ def run_extend_sub_flow(sub_flow: str, base_path: str = None) -> Dict[str, Any]:
             - 没有英文src文件夹映射流程
             - 已有英文映射规则文件流程
         base_path: 基础路径，默认从配置获取
+        jobs: 并行回写的工作进程数，默认为1(顺序回写)
 
     Returns:
         Dict[str, Any]: 执行结果，包含output_path、mode和language
@@ -90,22 +93,22 @@ def run_extend_sub_flow(sub_flow: str, base_path: str = None) -> Dict[str, Any]:
             mapping_direction = "zh2en"
             
             if sub_flow == "已有中文src文件夹映射流程":
-                result = _process_existing_chinese_src(base_path, timestamp, report)
+                result = _process_existing_chinese_src(base_path, timestamp, report, jobs=jobs)
             elif sub_flow == "没有中文src文件夹映射流程":
-                result = _process_no_chinese_src(base_path, timestamp, report)
+                result = _process_no_chinese_src(base_path, timestamp, report, jobs=jobs)
             else:  # 已有中文映射规则文件流程
-                result = _process_existing_chinese_rules(base_path, timestamp, report)
+                result = _process_existing_chinese_rules(base_path, timestamp, report, jobs=jobs)
         elif sub_flow in ["已有英文src文件夹映射流程", "没有英文src文件夹映射流程", "已有英文映射规则文件流程"]:
             # 英文相关流程(英文映射到中文)
             language = "English"
             mapping_direction = "en2zh"
             
             if sub_flow == "已有英文src文件夹映射流程":
-                result = _process_existing_english_src(base_path, timestamp, report)
+                result = _process_existing_english_src(base_path, timestamp, report, jobs=jobs)
             elif sub_flow == "没有英文src文件夹映射流程":
-                result = _process_no_english_src(base_path, timestamp, report)
+                result = _process_no_english_src(base_path, timestamp, report, jobs=jobs)
             else:  # 已有英文映射规则文件流程
-                result = _process_existing_english_rules(base_path, timestamp, report)
+                result = _process_existing_english_rules(base_path, timestamp, report, jobs=jobs)
         else:
             # 未知子流程
             report = generate_report(
@@ -256,7 +259,7 @@ def _build_mod_mapping(base_path: str, chinese_file_path: str, english_file_path
 
 
 def _process_existing_chinese_src(
-    base_path: str, timestamp: str, report: Dict[str, Any]
+    base_path: str, timestamp: str, report: Dict[str, Any], jobs: int = 1
 ) -> Dict[str, Any]:
     """
     处理已有中文src文件夹映射流程
@@ -265,6 +268,7 @@ def _process_existing_chinese_src(
         base_path: 基础路径
         timestamp: 时间戳
         report: 报告
+        jobs: 并行回写的工作进程数
 
     Returns:
         Dict[str, Any]: 处理结果
@@ -302,7 +306,7 @@ def _process_existing_chinese_src(
         mod_mapping = _build_mod_mapping(base_path, chinese_file_path, english_file_path)
 
         # 7. 遍历映射关系，执行映射操作
-        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report)
+        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report, jobs=jobs)
 
         # 8. 生成符合框架要求的输出路径
         # 从mod_mapping中获取第一个mod的信息来构建输出路径
@@ -356,13 +360,91 @@ def _process_existing_chinese_src(
 # 移除反编译相关功能，反编译功能已迁移到decompile_mode模块
 
 
-def _process_mod_for_mapping(chinese_mod_path: str, english_mod_path: str) -> None:
+def _load_extend_rule_index(mapping_direction: str = "zh2en") -> MappingRuleIndex:
     """
-    处理单个mod的映射
-    
+    加载Extend模式使用的映射规则索引，每次运行只加载一次，供所有mod和文件共享
+
+    Args:
+        mapping_direction: 映射方向，zh2en或en2zh
+
+    Returns:
+        MappingRuleIndex: 映射规则索引
+    """
+    base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    # 使用正确的File路径（与Localization_Tool同级）
+    localization_file_path = os.path.join(os.path.dirname(base_path), "File")
+    rule_path = os.path.join(localization_file_path, "rule")
+
+    # 先检查File/rule文件夹
+    language = "Chinese" if mapping_direction == "zh2en" else "English"
+    rule_file_path = os.path.join(rule_path, language)
+    rule_index = MappingRuleIndex()
+    if os.path.exists(rule_file_path):
+        rule_index = MappingRuleIndex.from_paths(rule_file_path)
+
+    # 如果File/rule文件夹没有规则，从传统路径加载
+    if not rule_index:
+        strings_path = get_directory("rules")
+        strings_dir = os.path.join(strings_path, language)
+        rule_index = MappingRuleIndex.from_paths(strings_dir)
+
+    print(f"[INFO] 已加载 {len(rule_index)} 条映射规则")
+    return rule_index
+
+
+# 工作进程中共享的映射规则索引，由_init_mapping_worker在进程启动时设置一次
+_worker_rule_index: Optional[MappingRuleIndex] = None
+
+
+def _init_mapping_worker(rule_index: MappingRuleIndex) -> None:
+    """
+    初始化回写工作进程，保存只读共享的映射规则索引
+
+    Args:
+        rule_index: 映射规则索引
+    """
+    global _worker_rule_index
+    _worker_rule_index = rule_index
+
+
+def _write_mapped_file(task: Tuple[str, str, str], dry_run: bool = False,
+                       rule_index: Optional[MappingRuleIndex] = None) -> Dict[str, Any]:
+    """
+    将映射规则应用到单个源文件并写入目标文件，映射失败时直接复制源文件
+
+    Args:
+        task: (源文件路径, 目标文件路径, mod根目录)
+        dry_run: 只生成差异，不写入目标文件
+        rule_index: 映射规则索引，未提供时使用工作进程中共享的索引
+
+    Returns:
+        Dict[str, Any]: write_yaml_mapping的处理结果
+    """
+    source_file, target_file, mod_path = task
+    if rule_index is None:
+        rule_index = _worker_rule_index
+
+    # 应用映射规则，直接写入目标文件；
+    # 以mod文件夹为根目录计算occurrence_key，与Extract模式生成规则时保持一致
+    result = write_yaml_mapping(source_file, target_file, rule_index, root_dir=mod_path, dry_run=dry_run)
+    if not dry_run and result["status"] != "success":
+        # 如果映射失败，直接将源文件复制到目标文件(作为备选)
+        import shutil
+        shutil.copyfile(source_file, target_file)
+        result["fallback"] = "copy"
+    return result
+
+
+def _collect_mod_mapping_tasks(chinese_mod_path: str, english_mod_path: str) -> List[Tuple[str, str, str]]:
+    """
+    确定mod的映射源文件夹，收集需要回写的源文件
+
     Args:
         chinese_mod_path: 中文mod路径
         english_mod_path: 英文mod路径
+
+    Returns:
+        List[Tuple[str, str, str]]: (源文件路径, 目标文件路径, mod根目录)列表
     """
     mod_name = os.path.basename(chinese_mod_path)
     print(f"\n[NOTE] 处理mod: {mod_name}")
@@ -392,92 +474,162 @@ def _process_mod_for_mapping(chinese_mod_path: str, english_mod_path: str) -> No
         mapping_source = chinese_jar_path
         print("[LIST] 使用jar文件夹进行映射(src文件夹不存在或不包含中文)")
 
-    # 如果找到映射源，执行映射
-    if mapping_source:
-        # 执行字符串映射
-        print(f"[LIST] 开始对 {mapping_source} 执行字符串映射")
-        
-        # 遍历映射源下的所有文件
-        for root, _, files in os.walk(mapping_source):
-            for file in files:
-                if file.endswith(('.java', '.kt', '.kts')):
-                    source_file = os.path.join(root, file)
-                    # 计算相对路径
-                    relative_path = os.path.relpath(source_file, mapping_source)
-                    # 目标文件路径
-                    target_file = os.path.join(english_mod_path, "src", relative_path)
-                    # 确保目标目录存在
-                    os.makedirs(os.path.dirname(target_file), exist_ok=True)
-                    
-                    # 应用字符串映射
-                    from src.common.yaml_utils import apply_yaml_mapping
-                    
-                    # 从base_path获取映射规则
-                    base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-                    # 使用正确的File路径（与Localization_Tool同级）
-                    localization_file_path = os.path.join(os.path.dirname(base_path), "File")
-                    rule_path = os.path.join(localization_file_path, "rule")
-                    
-                    # 根据映射方向确定使用的规则
-                    mapping_direction = "zh2en"  # 默认中文映射到英文
-                    
-                    # 加载映射规则
-                    from src.common import load_mapping_rules
-                    mapping_rules = []
-                    
-                    # 先检查File/rule文件夹
-                    language = "Chinese" if mapping_direction == "zh2en" else "English"
-                    rule_file_path = os.path.join(rule_path, language)
-                    if os.path.exists(rule_file_path):
-                        mapping_rules = load_mapping_rules(rule_file_path)
-                    
-                    # 如果File/rule文件夹没有规则，从传统路径加载
-                    if not mapping_rules:
-                        from src.common.config_utils import get_directory
-                        strings_path = get_directory("rules")
-                        strings_dir = os.path.join(strings_path, language)
-                        mapping_rules = load_mapping_rules(strings_dir)
-                    
-                    # 应用映射规则
-                    result = apply_yaml_mapping(source_file, mapping_rules)
-                    if result:
-                        # 将结果写回目标文件
-                        with open(target_file, 'w', encoding='utf-8') as f:
-                            f.write(result)
-                        print(f"OK 成功将 {source_file} 映射到 {target_file}")
-                    else:
-                        # 如果映射失败，直接将源文件内容写入目标文件(作为备选)
-                        with open(source_file, 'r', encoding='utf-8') as f:
-                            source_content = f.read()
-                        with open(target_file, 'w', encoding='utf-8') as f:
-                            f.write(source_content)
-                        print(f"[WARN]  映射失败，直接复制文件内容到 {target_file}")
-    else:
+    tasks = []
+    if not mapping_source:
         print("[WARN]  未找到可用的src或jar文件夹")
+        return tasks
+
+    print(f"[LIST] 开始对 {mapping_source} 执行字符串映射")
+    # 遍历映射源下的所有文件
+    for root, _, files in os.walk(mapping_source):
+        for file in files:
+            if file.endswith(('.java', '.kt', '.kts')):
+                source_file = os.path.join(root, file)
+                # 计算相对路径
+                relative_path = os.path.relpath(source_file, mapping_source)
+                # 目标文件路径
+                target_file = os.path.join(english_mod_path, "src", relative_path)
+                # 确保目标目录存在
+                os.makedirs(os.path.dirname(target_file), exist_ok=True)
+                tasks.append((source_file, target_file, chinese_mod_path))
+    return tasks
+
+
+def _run_mapping_tasks(tasks: List[Tuple[str, str, str]], rule_index: MappingRuleIndex, jobs: int = 1,
+                       dry_run: bool = False) -> List[Dict[str, Any]]:
+    """
+    执行回写任务，jobs大于1时将文件分发到进程池，每个工作进程只接收一次映射规则索引
+
+    Args:
+        tasks: (源文件路径, 目标文件路径, mod根目录)列表
+        rule_index: 映射规则索引
+        jobs: 并行回写的工作进程数
+        dry_run: 只输出每个文件的差异，不写入目标文件
+
+    Returns:
+        List[Dict[str, Any]]: 每个文件的处理结果，包含mod、file、target、status、replaced、unmapped
+    """
+    if jobs > 1 and len(tasks) > 1:
+        from src.common.parallel_utils import ParallelProcessor
+        processor = ParallelProcessor(
+            max_workers=jobs,
+            use_multiprocessing=True,
+            chunk_size=max(1, min(32, len(tasks) // (jobs * 4))),
+            initializer=_init_mapping_worker,
+            initargs=(rule_index,),
+        )
+        outcomes = processor.iter_results(tasks, _write_mapped_file, dry_run)
+    else:
+        def sequential_outcomes():
+            for task in tasks:
+                try:
+                    yield {"file": task, "result": _write_mapped_file(task, dry_run, rule_index), "error": None}
+                except Exception as e:
+                    yield {"file": task, "result": None, "error": f"{type(e).__name__}: {e}"}
+        outcomes = sequential_outcomes()
+
+    file_results = []
+    for outcome in outcomes:
+        source_file, target_file, mod_path = outcome["file"]
+        result = outcome["result"] or {"status": "fail", "replaced": 0, "unmapped": 0, "diff": "",
+                                       "error": outcome["error"]}
+        if dry_run:
+            if result.get("diff"):
+                print(result["diff"])
+        elif result["status"] == "success":
+            print(f"OK 成功将 {source_file} 映射到 {target_file}")
+        elif result.get("fallback") == "copy":
+            print(f"[WARN]  映射失败，直接复制文件内容到 {target_file}")
+        else:
+            print(f"[ERROR] 回写失败: {source_file} - {result.get('error')}")
+        file_results.append({
+            "mod": mod_path,
+            "file": source_file,
+            "target": target_file,
+            "status": result["status"],
+            "replaced": result["replaced"],
+            "unmapped": result["unmapped"],
+            "error": result.get("error"),
+        })
+    return file_results
+
+
+def _summarize_file_results(file_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    汇总每个文件的回写结果，生成报告数据
+
+    Args:
+        file_results: 每个文件的处理结果
+
+    Returns:
+        Dict[str, Any]: 包含total_count、success_count、fail_count、fail_reasons和files的报告数据
+    """
+    failed = [r for r in file_results if r["status"] != "success"]
+    return {
+        "total_count": len(file_results),
+        "success_count": len(file_results) - len(failed),
+        "fail_count": len(failed),
+        "fail_reasons": [f"{r['file']}: {r['error']}" for r in failed],
+        "files": [
+            {key: r[key] for key in ("file", "target", "status", "replaced", "unmapped")}
+            for r in file_results
+        ],
+    }
+
+
+def _process_mod_for_mapping(chinese_mod_path: str, english_mod_path: str, dry_run: bool = False,
+                             rule_index: Optional[MappingRuleIndex] = None, jobs: int = 1) -> Dict[str, Any]:
+    """
+    处理单个mod的映射
+    
+    Args:
+        chinese_mod_path: 中文mod路径
+        english_mod_path: 英文mod路径
+        dry_run: 只输出每个文件的差异，不写入目标文件
+        rule_index: 已加载的映射规则索引，未提供时加载一次并用于该mod的所有文件
+        jobs: 并行回写的工作进程数
 
+    Returns:
+        Dict[str, Any]: 回写结果汇总
+    """
+    tasks = _collect_mod_mapping_tasks(chinese_mod_path, english_mod_path)
+    if tasks and rule_index is None:
+        rule_index = _load_extend_rule_index()
+    return _summarize_file_results(_run_mapping_tasks(tasks, rule_index, jobs=jobs, dry_run=dry_run))
 
-def _process_mod_mapping(mod_mapping: dict, base_path: str, timestamp: str, report: Dict[str, Any]) -> list:
+
+def _process_mod_mapping(mod_mapping: dict, base_path: str, timestamp: str, report: Dict[str, Any],
+                         jobs: int = 1) -> list:
     """
     处理mod映射关系
 
+    所有mod的源文件在同一个进程池中回写，映射规则每次运行只加载一次。
+
     Args:
         mod_mapping: mod映射关系字典
         base_path: 基础路径
         timestamp: 时间戳
         report: 报告
+        jobs: 并行回写的工作进程数
 
     Returns:
         list: 每个mod的映射结果列表
     """
     mod_results = []
+    # 映射规则每次运行只加载一次
+    rule_index = _load_extend_rule_index()
+    
+    tasks = []
+    for source_mod_path, target_mod_path in mod_mapping.items():
+        tasks.extend(_collect_mod_mapping_tasks(source_mod_path, target_mod_path))
+    
+    # 按mod分组每个文件的回写结果
+    results_by_mod = {source_mod_path: [] for source_mod_path in mod_mapping}
+    for file_result in _run_mapping_tasks(tasks, rule_index, jobs=jobs):
+        results_by_mod[file_result["mod"]].append(file_result)
     
     for source_mod_path, target_mod_path in mod_mapping.items():
         mod_name = os.path.basename(source_mod_path)
-        print(f"\n[NOTE] 处理mod: {mod_name}")
-        print("----------------------------------")
-        
-        # 处理单个mod的映射
-        _process_mod_for_mapping(source_mod_path, target_mod_path)
         
         # 构建输出路径
         from src.common.config_utils import get_directory
@@ -493,19 +645,15 @@ def _process_mod_mapping(mod_mapping: dict, base_path: str, timestamp: str, repo
             
             os.makedirs(output_path, exist_ok=True)
             
-            # 为每个mod生成单独的报告
+            # 为每个mod生成单独的报告，包含每个文件的回写状态
+            mod_data = _summarize_file_results(results_by_mod[source_mod_path])
+            mod_data["output_path"] = output_path
             mod_report = generate_report(
                 process_id=f"{timestamp}_extend_{mod_name}",
                 mode="Extend",
                 sub_flow=report["sub_flow"],
-                status="success",
-                data={
-                    "total_count": 1,
-                    "success_count": 1,
-                    "fail_count": 0,
-                    "fail_reasons": [],
-                    "output_path": output_path
-                }
+                status="success" if mod_data["fail_count"] == 0 else "fail",
+                data=mod_data
             )
             
             # 添加mode、language和mapping_direction到结果中
@@ -523,7 +671,7 @@ def _process_mod_mapping(mod_mapping: dict, base_path: str, timestamp: str, repo
 
 
 def _process_no_chinese_src(
-    base_path: str, timestamp: str, report: Dict[str, Any]
+    base_path: str, timestamp: str, report: Dict[str, Any], jobs: int = 1
 ) -> Dict[str, Any]:
     """
     处理没有中文src文件夹映射流程
@@ -532,6 +680,7 @@ def _process_no_chinese_src(
         base_path: 基础路径
         timestamp: 时间戳
         report: 报告
+        jobs: 并行回写的工作进程数
 
     Returns:
         Dict[str, Any]: 处理结果
@@ -560,7 +709,7 @@ def _process_no_chinese_src(
         mod_mapping = _build_mod_mapping(base_path, chinese_file_path, english_file_path)
 
         # 7. 处理映射关系
-        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report)
+        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report, jobs=jobs)
 
         # 8. 生成符合框架要求的输出路径
         # 从mod_mapping中获取第一个mod的信息来构建输出路径
@@ -655,7 +804,7 @@ def extract_rules_from_processed(processed_folder: str, rule_file: str, language
 
 
 def _process_existing_chinese_rules(
-    base_path: str, timestamp: str, report: Dict[str, Any]
+    base_path: str, timestamp: str, report: Dict[str, Any], jobs: int = 1
 ) -> Dict[str, Any]:
     """
     处理已有中文映射规则文件流程
@@ -664,6 +813,7 @@ def _process_existing_chinese_rules(
         base_path: 基础路径
         timestamp: 时间戳
         report: 报告
+        jobs: 并行回写的工作进程数
 
     Returns:
         Dict[str, Any]: 处理结果
@@ -743,7 +893,7 @@ def _process_existing_chinese_rules(
         mod_mapping = _build_mod_mapping(base_path, chinese_file_path, english_file_path)
         
         # 9. 遍历映射关系，执行映射操作
-        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report)
+        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report, jobs=jobs)
         
         # 10. 生成符合框架要求的输出路径
         # 从mod_mapping中获取第一个mod的信息来构建输出路径
@@ -798,7 +948,7 @@ def _process_existing_chinese_rules(
 
 
 def _process_existing_english_src(
-    base_path: str, timestamp: str, report: Dict[str, Any]
+    base_path: str, timestamp: str, report: Dict[str, Any], jobs: int = 1
 ) -> Dict[str, Any]:
     """
     处理已有英文src文件夹映射流程(英文映射到中文)
@@ -807,6 +957,7 @@ def _process_existing_english_src(
         base_path: 基础路径
         timestamp: 时间戳
         report: 报告
+        jobs: 并行回写的工作进程数
 
     Returns:
         Dict[str, Any]: 处理结果
@@ -844,7 +995,7 @@ def _process_existing_english_src(
         mod_mapping = _build_mod_mapping(base_path, english_file_path, chinese_file_path)
 
         # 7. 遍历映射关系，执行映射操作
-        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report)
+        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report, jobs=jobs)
 
         # 8. 生成符合框架要求的输出路径
         # 从mod_mapping中获取第一个mod的信息来构建输出路径
@@ -896,7 +1047,7 @@ def _process_existing_english_src(
 
 
 def _process_no_english_src(
-    base_path: str, timestamp: str, report: Dict[str, Any]
+    base_path: str, timestamp: str, report: Dict[str, Any], jobs: int = 1
 ) -> Dict[str, Any]:
     """
     处理没有英文src文件夹映射流程(英文映射到中文)
@@ -905,6 +1056,7 @@ def _process_no_english_src(
         base_path: 基础路径
         timestamp: 时间戳
         report: 报告
+        jobs: 并行回写的工作进程数
 
     Returns:
         Dict[str, Any]: 处理结果
@@ -947,7 +1099,7 @@ def _process_no_english_src(
         mod_mapping = _build_mod_mapping(base_path, english_file_path, chinese_file_path)
 
         # 7. 处理映射关系
-        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report)
+        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report, jobs=jobs)
 
         # 8. 生成符合框架要求的输出路径
         # 从mod_mapping中获取第一个mod的信息来构建输出路径
@@ -1006,7 +1158,7 @@ def _process_no_english_src(
 
 
 def _process_existing_english_rules(
-    base_path: str, timestamp: str, report: Dict[str, Any]
+    base_path: str, timestamp: str, report: Dict[str, Any], jobs: int = 1
 ) -> Dict[str, Any]:
     """
     处理已有英文映射规则文件流程(英文映射到中文)
@@ -1015,6 +1167,7 @@ def _process_existing_english_rules(
         base_path: 基础路径
         timestamp: 时间戳
         report: 报告
+        jobs: 并行回写的工作进程数
 
     Returns:
         Dict[str, Any]: 处理结果
@@ -1094,7 +1247,7 @@ def _process_existing_english_rules(
         mod_mapping = _build_mod_mapping(base_path, english_file_path, chinese_file_path)
         
         # 9. 遍历映射关系，执行映射操作
-        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report)
+        mod_results = _process_mod_mapping(mod_mapping, base_path, timestamp, report, jobs=jobs)
         
         # 10. 生成符合框架要求的输出路径
         # 从mod_mapping中获取第一个mod的信息来构建输出路径
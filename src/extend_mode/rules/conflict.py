@@ -44,7 +44,7 @@ def detect_and_resolve_conflicts(
     
     # 检测冲突
     detector = RuleConflictDetector()
-    conflicts = detector.detect_all_conflicts(rules)
+    conflicts = detector.detect_file_conflicts(rule_file, rules)
     
     # 生成冲突报告
     if generate_report and report_file:
@@ -54,7 +54,7 @@ def detect_and_resolve_conflicts(
     
     # 解决冲突
     if resolve:
-        resolved = detector.resolve_conflicts(conflicts, resolve_strategy)
+        resolved = detector.resolve_conflicts(rules, conflicts, resolve_strategy)
         return {
             "status": "success",
             "message": "冲突检测完成",
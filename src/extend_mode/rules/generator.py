@@ -150,8 +150,7 @@ def auto_generate_rules(
     if success:
         # 检测规则冲突
         rules = load_yaml_mappings(output_file)
-        detector = RuleConflictDetector()
-        conflicts = detector.detect_all_conflicts(rules)
+        conflicts = RuleConflictDetector.detect_file_conflicts(output_file, rules)
         
         conflict_info = {
             "total_conflicts": conflicts['total_conflicts'],
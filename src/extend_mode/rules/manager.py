@@ -17,6 +17,8 @@ from src.common.yaml_utils import (
     save_yaml_mappings,
     RuleConflictDetector
 )
+from src.common.rule_io import RULE_TIMESTAMP_FIELDS, is_rule_unchanged
+from src.common.rules_store import RuleFieldIndex
 
 
 class RuleManager:
@@ -32,7 +34,9 @@ class RuleManager:
             rule_file: 规则文件路径
         """
         self.rule_file = rule_file
-        self.rules = []
+        self._rules: List[Dict[str, Any]] = []
+        # 规则列表的二级索引，首次查询时建立
+        self._indexes: Optional[RuleFieldIndex] = None
         self.conflict_detector = RuleConflictDetector()
         self.original_rules = []  # 用于恢复和比较
         
@@ -40,6 +44,26 @@ class RuleManager:
             self.load_rules()
             self.original_rules = self.rules.copy()
     
+    @property
+    def rules(self) -> List[Dict[str, Any]]:
+        """
+        规则列表
+        """
+        return self._rules
+    
+    @rules.setter
+    def rules(self, rules: List[Dict[str, Any]]):
+        self._rules = rules
+        self._indexes = None
+    
+    def _get_indexes(self) -> RuleFieldIndex:
+        """
+        获取规则列表的二级索引，不存在时建立
+        """
+        if self._indexes is None:
+            self._indexes = RuleFieldIndex(self._rules)
+        return self._indexes
+    
     def load_rules(self, rule_file: str = None) -> bool:
         """
         加载规则文件
@@ -105,6 +129,7 @@ class RuleManager:
         
         # 添加规则
         self.rules.append(rule)
+        self._get_indexes().add(rule)
         
         return {
             "status": "success",
@@ -141,7 +166,10 @@ class RuleManager:
             }
         
         # 更新规则
+        indexes = self._get_indexes()
+        before = indexes.snapshot(self.rules[rule_index])
         self.rules[rule_index].update(updates)
+        indexes.reindex(self.rules[rule_index], before)
         
         return {
             "status": "success",
@@ -169,6 +197,7 @@ class RuleManager:
         
         # 删除规则
         deleted_rule = self.rules.pop(rule_index)
+        self._get_indexes().remove(deleted_rule)
         
         return {
             "status": "success",
@@ -186,10 +215,7 @@ class RuleManager:
         Returns:
             Optional[Dict[str, Any]]: 找到的规则，找不到返回None
         """
-        for rule in self.rules:
-            if rule.get("id") == rule_id:
-                return rule
-        return None
+        return self._get_indexes().first("id", rule_id)
     
     def get_rule_by_original(self, original: str) -> Optional[Dict[str, Any]]:
         """
@@ -201,14 +227,12 @@ class RuleManager:
         Returns:
             Optional[Dict[str, Any]]: 找到的规则，找不到返回None
         """
-        for rule in self.rules:
-            if rule.get("original") == original:
-                return rule
-        return None
+        return self._get_indexes().first("original", original)
     
     def query_rules(self, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
         查询规则
+        条件中包含id、original或status时通过索引缩小候选范围
         
         Args:
             filters: 查询条件，例如{"status": "translated"}
@@ -219,17 +243,7 @@ class RuleManager:
         if not filters:
             return self.rules.copy()
         
-        result = []
-        for rule in self.rules:
-            match = True
-            for key, value in filters.items():
-                if rule.get(key) != value:
-                    match = False
-                    break
-            if match:
-                result.append(rule)
-        
-        return result
+        return self._get_indexes().query(filters)
     
     def import_rules(self, import_file: str, merge: bool = True) -> Dict[str, Any]:
         """
@@ -255,24 +269,33 @@ class RuleManager:
                 "message": "导入文件内容无效"
             }
         
+        skipped_count = 0
         if not merge:
             # 替换现有规则
             self.rules = imported_rules
         else:
-            # 合并规则
+            # 合并规则，通过ID索引查找现有规则
+            indexes = self._get_indexes()
             for rule in imported_rules:
-                existing_index = self._get_rule_index_by_id(rule.get("id"))
-                if existing_index == -1:
+                existing_rule = indexes.first("id", rule.get("id"))
+                if existing_rule is None:
                     # 添加新规则
                     self.rules.append(rule)
+                    indexes.add(rule)
+                elif is_rule_unchanged(existing_rule, rule, RULE_TIMESTAMP_FIELDS):
+                    # 除时间戳以外的字段都未变更，跳过该规则
+                    skipped_count += 1
                 else:
                     # 更新现有规则
-                    self.rules[existing_index].update(rule)
+                    before = indexes.snapshot(existing_rule)
+                    existing_rule.update(rule)
+                    indexes.reindex(existing_rule, before)
         
         return {
             "status": "success",
             "message": f"成功导入{len(imported_rules)}条规则",
-            "imported_count": len(imported_rules)
+            "imported_count": len(imported_rules),
+            "skipped_count": skipped_count
         }
     
     def export_rules(self, export_file: str, filters: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -445,10 +468,9 @@ class RuleManager:
         Returns:
             int: 规则索引，找不到返回-1
         """
-        for i, rule in enumerate(self.rules):
-            if rule.get("id") == rule_id:
-                return i
-        return -1
+        indexes = self._get_indexes()
+        rule = indexes.first("id", rule_id)
+        return indexes.position(rule) if rule is not None else -1
     
     def _get_rule_by_id(self, rule_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -111,7 +111,7 @@ def run_complete_workflow(
     # 2. 检测规则冲突
     rules = load_yaml_mappings(rules_file)
     detector = RuleConflictDetector()
-    conflicts = detector.detect_all_conflicts(rules)
+    conflicts = detector.detect_file_conflicts(rules_file, rules)
     
     resolved_rules = rules
     if conflicts['total_conflicts'] > 0:
@@ -124,9 +124,10 @@ def run_complete_workflow(
         
         # 重新加载规则
         resolved_rules = load_yaml_mappings(rules_file)
+        conflicts = detector.detect_file_conflicts(rules_file, resolved_rules)
     
-    # 3. 生成翻译报告
-    generate_translation_report(resolved_rules, report_file, "markdown")
+    # 3. 生成翻译报告，复用已完成的冲突检测结果
+    generate_translation_report(resolved_rules, report_file, "markdown", conflicts=conflicts)
     
     # 4. 提取AST映射
     ast_mappings = list(extract_ast_mappings(
@@ -138,33 +139,30 @@ def run_complete_workflow(
     
     # 5. 应用翻译到源代码
     print(f"[INFO] 开始将翻译应用到源代码...")
-    from src.common.yaml_utils import apply_yaml_mapping
-    from src.common.tree_sitter_utils import extract_ast_mappings
+    from src.common.yaml_utils import write_yaml_mapping
     import shutil
     
     # 复制源代码到翻译目录
     shutil.copytree(source_dir, translated_dir, dirs_exist_ok=True)
     
-    # 提取源代码中的字符串映射
-    source_files = []
-    for root, dirs, files in os.walk(translated_dir):
-        for file in files:
-            if file.endswith('.java') or file.endswith('.kt') or file.endswith('.kts'):
-                source_files.append(os.path.join(root, file))
+    # 按文件分组提取结果，回写时直接复用提取阶段记录的字节范围，无需再次解析
+    strings_by_file: Dict[str, list] = {}
+    for mapping in ast_mappings:
+        strings_by_file.setdefault(os.path.abspath(mapping["meta"]["file"]), []).append(mapping)
     
     # 应用翻译到每个源文件
     applied_count = 0
-    for source_file in source_files:
-        # 提取文件中的字符串
-        file_ast_mappings = extract_ast_mappings(source_file, root_dir=translated_dir)
-        
-        if file_ast_mappings:
-            # 应用映射
-            translated_content = apply_yaml_mapping(source_file, resolved_rules)
-            
-            # 保存翻译后的内容
-            with open(source_file, 'w', encoding='utf-8') as f:
-                f.write(translated_content)
+    for source_file, source_strings in strings_by_file.items():
+        relative_path = os.path.relpath(source_file, source_dir)
+        target_file = os.path.join(translated_dir, relative_path)
+        apply_result = write_yaml_mapping(
+            source_file,
+            target_file,
+            resolved_rules,
+            source_strings=source_strings,
+            root_dir=source_dir
+        )
+        if apply_result["status"] == "success":
             applied_count += 1
     
     print(f"[OK] 成功将翻译应用到 {applied_count} 个源文件")
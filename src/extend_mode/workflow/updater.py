@@ -56,8 +56,7 @@ def update_translation_rules_func(
     if success:
         # 检测规则冲突
         rules = load_yaml_mappings(output_file)
-        detector = RuleConflictDetector()
-        conflicts = detector.detect_all_conflicts(rules)
+        conflicts = RuleConflictDetector.detect_file_conflicts(output_file, rules)
         
         conflict_info = {
             "total_conflicts": conflicts['total_conflicts'],
@@ -16,6 +16,7 @@ Extract模式核心模块
 
 import os
 import json
+import zipfile
 from typing import Any, Dict, List
 
 # 注意：不需要添加sys.path，main.py已经设置了正确的Python搜索路径
@@ -92,7 +93,45 @@ def generate_mapping_rules(mappings: List[Dict[str, Any]], base_path: str, langu
         logger.info(f"映射规则已复制到output目录: {output_mod_dir}")
 
 
-def _extract_strings_from_source(source_path: str, language: str, base_path: str, timestamp: str) -> Dict[str, Any]:
+def _collect_ast_mappings(source_path: str, include_source_jars: bool = False) -> List[Dict[str, Any]]:
+    """
+    提取模组文件夹中的AST映射，可选包括jars文件夹中源码JAR内的Java/Kotlin源文件
+    
+    源码JAR直接从zip中解析，不解压到磁盘，结果与把JAR解压到同名文件夹(去掉.jar扩展名)后提取一致；
+    同名文件夹已存在时其中的源文件已经在磁盘上提取，不再重复读取JAR。
+    
+    Args:
+        source_path: 模组文件夹路径
+        include_source_jars: 是否同时提取jars文件夹中源码JAR内的字符串
+    
+    Returns:
+        List[Dict[str, Any]]: AST映射列表
+    """
+    from src.common.jar_utils import find_jar_files
+    from src.common.tree_sitter_utils import extract_ast_mappings, extract_jar_mappings
+    
+    ast_mappings = list(extract_ast_mappings(source_path))
+    
+    jars_dir = os.path.join(source_path, "jars")
+    if include_source_jars and os.path.isdir(jars_dir):
+        for jar_path in sorted(find_jar_files(jars_dir)):
+            extract_dir = os.path.splitext(jar_path)[0]
+            if os.path.exists(extract_dir):
+                continue
+            try:
+                jar_mappings = list(extract_jar_mappings(jar_path, source_path, extract_dir))
+            except (OSError, zipfile.BadZipFile) as e:
+                print(f"[WARN]  读取JAR文件失败: {jar_path} - {e}")
+                continue
+            if jar_mappings:
+                print(f"[INFO] 从源码JAR提取 {len(jar_mappings)} 个字符串: {os.path.basename(jar_path)}")
+                ast_mappings.extend(jar_mappings)
+    
+    return ast_mappings
+
+
+def _extract_strings_from_source(source_path: str, language: str, base_path: str, timestamp: str,
+                                 include_source_jars: bool = False) -> Dict[str, Any]:
     """
     从指定源路径提取字符串
     
@@ -101,6 +140,7 @@ def _extract_strings_from_source(source_path: str, language: str, base_path: str
         language: 语言类型(Chinese或English)
         base_path: 基础路径
         timestamp: 时间戳
+        include_source_jars: 是否同时提取jars文件夹中源码JAR内的字符串
     
     Returns:
         Dict[str, Any]: 提取结果，包含output_path
@@ -162,8 +202,9 @@ def _extract_strings_from_source(source_path: str, language: str, base_path: str
         print(f"[WARN]  mod文件夹 {mod_folder} 缺少id信息，使用文件夹名称作为mod_id: {mod_id}")
     
     # 提取AST映射
-    from src.common.tree_sitter_utils import extract_ast_mappings
-    ast_mappings = list(extract_ast_mappings(source_path))
+    from src.common.filter_utils import get_string_filter
+    ast_mappings = _collect_ast_mappings(source_path, include_source_jars)
+    filter_stats = get_string_filter().get_stats()
     
     if not ast_mappings:
         return {
@@ -220,6 +261,8 @@ def _extract_strings_from_source(source_path: str, language: str, base_path: str
         "fail_count": 0,
         "fail_reasons": [],
         "unmapped_count": sum(1 for m in yaml_mappings if m["status"] == "unmapped"),
+        "filtered_count": sum(filter_stats.values()),
+        "filter_stats": filter_stats,
         "output_path": output_path
     }
     
@@ -232,7 +275,8 @@ def _extract_strings_from_source(source_path: str, language: str, base_path: str
     }
 
 
-def _process_extract_flow(language: str, base_path: str, timestamp: str, report: Dict[str, Any]) -> Dict[str, Any]:
+def _process_extract_flow(language: str, base_path: str, timestamp: str, report: Dict[str, Any],
+                          include_source_jars: bool = False) -> Dict[str, Any]:
     """
     处理提取流程
     
@@ -241,6 +285,7 @@ def _process_extract_flow(language: str, base_path: str, timestamp: str, report:
         base_path: 基础路径
         timestamp: 时间戳
         report: 报告
+        include_source_jars: 是否同时提取jars文件夹中源码JAR内的字符串
     
     Returns:
         Dict[str, Any]: 处理结果
@@ -322,7 +367,8 @@ def _process_extract_flow(language: str, base_path: str, timestamp: str, report:
             print(f"[INFO] 使用模组文件夹作为提取源：{extract_source}")
             
             # 执行提取
-            extract_result = _extract_strings_from_source(extract_source, language, base_path, timestamp)
+            extract_result = _extract_strings_from_source(extract_source, language, base_path, timestamp,
+                                                          include_source_jars)
             
             if extract_result["success"]:
                 success_count += 1
@@ -391,13 +437,14 @@ def _process_extract_flow(language: str, base_path: str, timestamp: str, report:
         )
 
 
-def run_extract_sub_flow(sub_flow: str, base_path: str) -> Dict[str, Any]:
+def run_extract_sub_flow(sub_flow: str, base_path: str, include_source_jars: bool = False) -> Dict[str, Any]:
     """
     运行Extract子流程
     
     Args:
         sub_flow: 子流程类型
         base_path: 基础路径
+        include_source_jars: 是否同时直接从jars文件夹中的源码JAR提取字符串，默认关闭
     
     Returns:
         Dict[str, Any]: 处理结果
@@ -443,7 +490,7 @@ def run_extract_sub_flow(sub_flow: str, base_path: str) -> Dict[str, Any]:
         return report
     
     # 5. 执行提取流程
-    result = _process_extract_flow(language, base_path, timestamp, report)
+    result = _process_extract_flow(language, base_path, timestamp, report, include_source_jars)
     
     # 6. 保存报告
     from src.common.config_utils import get_directory
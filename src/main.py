@@ -1133,13 +1133,16 @@ python main.py extract -h
 
 === Extend模式示例 ===
 python main.py extend "已有中文src文件夹映射流程"
+python main.py extend "已有中文src文件夹映射流程" --jobs 4
 python main.py extend -h
 
 === Decompile模式示例 ===
 python main.py decompile "反编译单个JAR文件"
 python main.py decompile "反编译目录中所有JAR文件"
+python main.py decompile "反编译目录中所有JAR文件" --incremental --use-workers
 python main.py decompile "提取单个JAR文件内容"
 python main.py decompile "提取目录中所有JAR文件内容"
+python main.py decompile "提取目录中所有JAR文件内容" --resources-only
 python main.py decompile -h
 
 === 映射规则管理示例 ===
@@ -1188,6 +1191,11 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
             "  简化模式可用：英文提取流程, 中文提取流程\n"  \
             "  高级模式可用：已有英文src文件夹提取流程, 没有英文src文件夹提取流程, 已有中文src文件夹提取流程, 没有中文src文件夹提取流程",
         )
+        extract_parser.add_argument(
+            "--include-source-jars",
+            action="store_true",
+            help="同时直接从jars文件夹中的源码JAR提取Java/Kotlin字符串，不解压到磁盘",
+        )
 
         # Extend模式子命令
         extend_parser = subparsers.add_parser(
@@ -1203,6 +1211,12 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
             "  没有中文src文件夹映射流程\n"  \
             "  已有中文映射规则文件流程",
         )
+        extend_parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="并行回写的工作进程数，默认为1(顺序回写)",
+        )
         
         # Decompile模式子命令
         decompile_parser = subparsers.add_parser(
@@ -1222,6 +1236,21 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
             "  提取单个JAR文件内容\n"  \
             "  提取目录中所有JAR文件内容",
         )
+        decompile_parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="反编译目录中所有JAR文件时增量反编译，只重新反编译上次以来变更的类",
+        )
+        decompile_parser.add_argument(
+            "--use-workers",
+            action="store_true",
+            help="反编译目录中所有JAR文件时使用常驻反编译进程池，减少JVM启动次数",
+        )
+        decompile_parser.add_argument(
+            "--resources-only",
+            action="store_true",
+            help="提取JAR文件内容时只写入文本资源(.properties、.json、.csv等)，类文件和贴图不解压",
+        )
         
         # 映射规则管理子命令
         localization_parser = subparsers.add_parser(
@@ -1303,6 +1332,12 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
             help="是否使用缓存机制",
             default=True,
         )
+        bootstrap_parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="通过内容哈希校验所有源文件，不信任未变化的文件大小和修改时间",
+            default=False,
+        )
         
         # Rules命令，用于规则管理
         rules_parser = subparsers.add_parser(
@@ -1373,7 +1408,7 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
                 print(f"模式：Extract")
                 print(f"流程：{args.sub_flow}")
                 print("==========================================")
-                result = run_extract_sub_flow(args.sub_flow, None)
+                result = run_extract_sub_flow(args.sub_flow, None, include_source_jars=args.include_source_jars)
             else:
                 # 让用户选择子流程
                 logger.info("用户未指定子流程，显示Extract子流程选择菜单")
@@ -1383,7 +1418,7 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
                 print(f"模式：Extract")
                 print(f"流程：{sub_flow}")
                 print("==========================================")
-                result = run_extract_sub_flow(sub_flow, None)
+                result = run_extract_sub_flow(sub_flow, None, include_source_jars=args.include_source_jars)
         elif args.mode == "extend":
             logger.info("选择Extend模式")
             if args.sub_flow:
@@ -1392,8 +1427,9 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
                 print(f"\n执行配置：")
                 print(f"模式：Extend")
                 print(f"流程：{args.sub_flow}")
+                print(f"并行回写进程数：{args.jobs}")
                 print("==========================================")
-                result = run_extend_sub_flow(args.sub_flow, None)
+                result = run_extend_sub_flow(args.sub_flow, None, jobs=args.jobs)
             else:
                 # 让用户选择子流程
                 logger.info("用户未指定子流程，显示Extend子流程选择菜单")
@@ -1403,7 +1439,7 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
                 print(f"模式：Extend")
                 print(f"流程：{sub_flow}")
                 print("==========================================")
-                result = run_extend_sub_flow(sub_flow, None)
+                result = run_extend_sub_flow(sub_flow, None, jobs=args.jobs)
         elif args.mode == "decompile":
             logger.info("选择Decompile模式")
             if args.sub_flow:
@@ -1413,7 +1449,8 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
                 print(f"模式：Decompile")
                 print(f"流程：{args.sub_flow}")
                 print("==========================================")
-                result = run_decompile_sub_flow(args.sub_flow, None)
+                result = run_decompile_sub_flow(args.sub_flow, None, incremental=args.incremental,
+                                                use_workers=args.use_workers, resources_only=args.resources_only)
             else:
                 # 让用户选择子流程
                 logger.info("用户未指定子流程，显示Decompile子流程选择菜单")
@@ -1423,7 +1460,8 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
                 print(f"模式：Decompile")
                 print(f"流程：{sub_flow}")
                 print("==========================================")
-                result = run_decompile_sub_flow(sub_flow, None)
+                result = run_decompile_sub_flow(sub_flow, None, incremental=args.incremental,
+                                                use_workers=args.use_workers, resources_only=args.resources_only)
         elif args.mode == "localization":
             logger.info("选择映射规则管理模式")
             print(f"\n执行配置：")
@@ -1577,6 +1615,7 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
             print(f"模组ID：{args.mod_id}")
             print(f"输出文件：{args.out}")
             print(f"使用缓存：{args.use_cache}")
+            print(f"哈希校验：{args.verify}")
             print("===========================================")
             
             try:
@@ -1588,12 +1627,12 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
                 
                 # 从英文源码目录提取AST映射
                 print(f"[INFO] 从英文源码目录提取映射规则：{args.en_src}")
-                english_mappings = list(extract_ast_mappings(args.en_src, use_cache=args.use_cache))
+                english_mappings = list(extract_ast_mappings(args.en_src, use_cache=args.use_cache, verify_cache=args.verify))
                 print(f"[OK] 成功提取英文映射规则 {len(english_mappings)} 条")
                 
                 # 从中文源码目录提取AST映射
                 print(f"[INFO] 从中文源码目录提取映射规则：{args.zh_src}")
-                chinese_mappings = list(extract_ast_mappings(args.zh_src, use_cache=args.use_cache))
+                chinese_mappings = list(extract_ast_mappings(args.zh_src, use_cache=args.use_cache, verify_cache=args.verify))
                 print(f"[OK] 成功提取中文映射规则 {len(chinese_mappings)} 条")
                 
                 # 使用occurrence_key进行双语对齐
@@ -1626,8 +1665,7 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
                 if success:
                     # 检测规则冲突
                     rules = load_yaml_mappings(args.out)
-                    detector = RuleConflictDetector()
-                    conflicts = detector.detect_all_conflicts(rules)
+                    conflicts = RuleConflictDetector.detect_file_conflicts(args.out, rules)
                     
                     conflict_info = {
                         "total_conflicts": conflicts['total_conflicts'],
@@ -1753,35 +1791,35 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
                     list_parser.add_argument("--file", help="按文件过滤规则")
                     list_args = list_parser.parse_args(args.args)
                     
-                    # 创建RulesStore实例
+                    # 创建RulesStore实例，流式读取规则，不把整个规则列表加载到内存
                     rules_store = RulesStore(list_args.rules_file)
-                    if rules_store.load_rules():
-                        # 过滤规则
-                        filtered_rules = rules_store.rules
-                        if list_args.status:
-                            filtered_rules = rules_store.get_rules_by_status(list_args.status)
-                        if list_args.file:
-                            filtered_rules = rules_store.get_rules_by_file(list_args.file)
-                        
-                        # 输出规则列表
-                        print(f"[INFO] 规则列表 ({len(filtered_rules)} 条):")
-                        for rule in filtered_rules:
+                    try:
+                        total_rules = 0
+                        filtered_count = 0
+                        print("[INFO] 规则列表:")
+                        for rule in rules_store.iter_rules():
+                            total_rules += 1
+                            if not RulesStore.rule_matches(rule, list_args.status, list_args.file):
+                                continue
+                            filtered_count += 1
                             print(f"ID: {rule['id']}")
                             print(f"  Original: {rule['original']}")
                             print(f"  Translated: {rule.get('translated', '')}")
                             print(f"  Status: {rule.get('status', 'untranslated')}")
                             print(f"  File: {rule.get('meta', {}).get('file', '')}")
                             print()
+                        print(f"[INFO] 共 {filtered_count} 条规则")
                         
                         result = {
                             "status": "success",
-                            "message": f"成功列出 {len(filtered_rules)} 条规则",
+                            "message": f"成功列出 {filtered_count} 条规则",
                             "data": {
-                                "total_rules": len(rules_store.rules),
-                                "filtered_rules": len(filtered_rules)
+                                "total_rules": total_rules,
+                                "filtered_rules": filtered_count
                             }
                         }
-                    else:
+                    except Exception as e:
+                        print(f"[ERROR] 加载规则文件失败: {list_args.rules_file} - {e}")
                         result = {
                             "status": "error",
                             "message": "加载规则文件失败"
@@ -1793,9 +1831,9 @@ python main.py --test-mode "4,1"  # 测试Decompile模式-反编译单个JAR文
                     show_parser.add_argument("--rule-id", required=True, help="规则ID")
                     show_args = show_parser.parse_args(args.args)
                     
-                    # 创建RulesStore实例
+                    # 创建RulesStore实例，有.rules.idx索引时只解析目标规则
                     rules_store = RulesStore(show_args.rules_file)
-                    if rules_store.load_rules():
+                    if rules_store.load_rules(lazy=True):
                         # 获取规则
                         rule = rules_store.get_rule(show_args.rule_id)
                         if rule:
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+rules子模块 - manager.py测试
+"""
+
+from src.common.yaml_utils import save_yaml_mappings
+from src.extend_mode.rules.manager import RuleManager
+
+
+def _rule(i, status=None):
+    return {
+        "id": f"{i:04d}",
+        "original": f"text {i % 5}",
+        "translated": f"文本 {i % 5}",
+        "status": status or ["translated", "untranslated", "needs_review"][i % 3],
+    }
+
+
+class TestRuleManager:
+    """
+    测试规则管理器的索引查询
+    """
+    
+    def test_query_and_import_use_indexes(self, tmp_path):
+        """
+        测试索引在增删改和合并导入后与顺序扫描的结果一致
+        """
+        manager = RuleManager()
+        manager.rules = [_rule(i) for i in range(20)]
+
+        filters = {"status": "translated", "original": "text 1"}
+        expected = [r for r in manager.rules if r["status"] == "translated" and r["original"] == "text 1"]
+        assert manager.query_rules(filters) == expected
+        assert manager.query_rules({"translated": "文本 2"}) == [r for r in manager.rules if r["translated"] == "文本 2"]
+
+        assert manager.update_rule(_rule(6)["id"], {"status": "KEEP"})["status"] == "success"
+        assert manager.query_rules({"status": "KEEP"}) == [manager.rules[6]]
+        assert manager.delete_rule(_rule(3)["id"])["status"] == "success"
+        assert manager._get_rule_index_by_id(_rule(10)["id"]) == 9
+
+        import_file = str(tmp_path / "import.yaml")
+        save_yaml_mappings([_rule(i, status="needs_review") for i in range(15, 25)], import_file,
+                           version_control=False)
+        result = manager.import_rules(import_file)
+        assert (result["imported_count"], result["skipped_count"]) == (10, 1)
+        assert manager.import_rules(import_file)["skipped_count"] == 10
+
+        # 指纹字段以外的变更(注释、字节偏移)不会被跳过，时间戳不参与比较
+        changed = _rule(15, status="needs_review")
+        changed["comment"] = "reviewed"
+        changed["meta"] = dict(changed.get("meta") or {}, start_byte=120)
+        save_yaml_mappings([changed, dict(_rule(16, status="needs_review"), updated_at="later")], import_file,
+                           version_control=False)
+        assert manager.import_rules(import_file)["skipped_count"] == 1
+        assert manager.query_rules({"comment": "reviewed"})[0]["meta"]["start_byte"] == 120
+        assert len(manager.rules) == 24
+        assert manager.query_rules({"status": "needs_review", "original": "text 0"}) == [
+            r for r in manager.rules if r["status"] == "needs_review" and r["original"] == "text 0"
+        ]
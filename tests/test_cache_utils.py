@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存工具测试
+
+测试文件变更检测和提取结果缓存
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.cache_utils import HASH_ALGORITHM, ExtractionResultCache, FileCacheManager, hash_file
+from src.common.filter_utils import DEFAULT_FILTER_RULES, StringFilter, get_string_filter, set_string_filter
+from src.common.tree_sitter_utils import extract_ast_mappings
+
+JAVA_A = '''
+public class A {
+    String title = "Start the game";
+}
+'''
+
+JAVA_B = '''
+public class B {
+    String title = "Exit the game";
+}
+'''
+
+
+def _write(path, content):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+class TestFileCacheManager:
+    """
+    测试文件缓存管理器
+    """
+
+    def test_deferred_updates_are_written_on_flush(self, tmp_path):
+        cache_dir = str(tmp_path / ".cache")
+        source = tmp_path / "A.java"
+        _write(source, JAVA_A)
+
+        with FileCacheManager(cache_dir) as cache_manager:
+            assert cache_manager.get_changed_files([str(source)]) == [str(source)]
+            cache_manager.update_file_cache(str(source), {"processed": True})
+            # 退出上下文前不写入磁盘
+            assert FileCacheManager(cache_dir).get_cached_files() == {}
+
+        reloaded = FileCacheManager(cache_dir)
+        assert reloaded.get_changed_files([str(source)]) == []
+        assert reloaded.get_cached_files()[str(source)]["processed"] is True
+
+    def test_update_reuses_hash_from_change_detection(self, tmp_path, monkeypatch):
+        source = tmp_path / "A.java"
+        _write(source, JAVA_A)
+        cache_dir = str(tmp_path / ".cache")
+        FileCacheManager(cache_dir).update_file_cache(str(source))
+        _write(source, JAVA_B)
+
+        cache_manager = FileCacheManager(cache_dir, deferred=True)
+        assert cache_manager.get_changed_files([str(source)]) == [str(source)]
+
+        def fail_hash(file_path):
+            raise AssertionError("文件不应被重复哈希")
+
+        monkeypatch.setattr(cache_manager, "calculate_file_hash", fail_hash)
+        assert cache_manager.update_file_cache(str(source)) is not None
+
+    def test_remove_and_clear(self, tmp_path):
+        cache_dir = str(tmp_path / ".cache")
+        sources = [tmp_path / "A.java", tmp_path / "B.java"]
+        _write(sources[0], JAVA_A)
+        _write(sources[1], JAVA_B)
+
+        cache_manager = FileCacheManager(cache_dir)
+        for source in sources:
+            cache_manager.update_file_cache(str(source))
+        cache_manager.remove_file_cache(str(sources[0]))
+        assert list(FileCacheManager(cache_dir).get_cached_files()) == [str(sources[1])]
+
+        cache_manager.clear_cache()
+        assert FileCacheManager(cache_dir).get_cached_files() == {}
+
+    def test_migrates_legacy_json_cache(self, tmp_path):
+        cache_dir = tmp_path / ".cache"
+        cache_dir.mkdir()
+        source = tmp_path / "A.java"
+        _write(source, JAVA_A)
+        other = tmp_path / "B.java"
+        _write(other, JAVA_B)
+        legacy_hash = hashlib.sha256(source.read_bytes()).hexdigest()
+        legacy = {"version": "1.0", "files": {
+            str(source): {"hash": legacy_hash, "size": 1, "processed": True},
+            str(other): {"hash": "0" * 64, "size": 1},
+        }}
+        with open(cache_dir / "file_cache.json", "w", encoding="utf-8") as f:
+            json.dump(legacy, f)
+
+        # 旧版SHA-256记录与文件内容一致时视为未变更，并按当前哈希算法重写
+        cache_manager = FileCacheManager(str(cache_dir))
+        assert cache_manager.get_changed_files([str(source), str(other)]) == [str(other)]
+        cache_manager.flush()
+        assert os.path.exists(cache_dir / "file_cache.db")
+
+        entry = FileCacheManager(str(cache_dir)).get_cached_files()[str(source)]
+        assert entry["hash_algorithm"] == HASH_ALGORITHM
+        assert entry["hash"] == hash_file(str(source))
+        assert entry["processed"] is True
+        assert FileCacheManager(str(cache_dir)).get_changed_files([str(source)]) == []
+
+    def test_stat_fast_path_skips_hashing(self, tmp_path, monkeypatch):
+        source = tmp_path / "A.java"
+        _write(source, JAVA_A)
+        cache_dir = str(tmp_path / ".cache")
+        FileCacheManager(cache_dir).update_file_cache(str(source))
+
+        def fail_hash(file_path):
+            raise AssertionError("文件状态未变时不应计算哈希")
+
+        cache_manager = FileCacheManager(cache_dir)
+        monkeypatch.setattr(cache_manager, "calculate_file_hash", fail_hash)
+        assert cache_manager.get_changed_files([str(source)]) == []
+
+    def test_stat_mismatch_falls_back_to_hash(self, tmp_path):
+        source = tmp_path / "A.java"
+        _write(source, JAVA_A)
+        cache_dir = str(tmp_path / ".cache")
+        FileCacheManager(cache_dir).update_file_cache(str(source))
+
+        # 仅修改时间变化时，内容哈希一致仍视为未变更，并刷新缓存的文件状态
+        stat = os.stat(source)
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        with FileCacheManager(cache_dir) as cache_manager:
+            assert cache_manager.get_changed_files([str(source)]) == []
+
+        # 保持文件状态不变但修改内容，只有verify模式能够发现
+        stat = os.stat(source)
+        _write(source, JAVA_A.replace("Start", "Begin"))
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert FileCacheManager(cache_dir).get_changed_files([str(source)]) == []
+        assert FileCacheManager(cache_dir, verify=True).get_changed_files([str(source)]) == [str(source)]
+
+
+class TestExtractionResultCache:
+    """
+    测试提取结果缓存
+    """
+
+    def test_put_and_get(self, tmp_path):
+        cache = ExtractionResultCache(str(tmp_path / ".cache"))
+        strings = [{"id": "abc", "original": "Hello world", "meta": {"line": 1}, "context": {}}]
+        cache.put("A.java", "src", "hash1", strings)
+        cache.close()
+
+        cache = ExtractionResultCache(str(tmp_path / ".cache"))
+        assert cache.get("A.java", "src", "hash1") == strings
+        # 哈希不匹配或根目录不同都视为未命中
+        assert cache.get("A.java", "src", "hash2") is None
+        assert cache.get("A.java", "other", "hash1") is None
+        cache.close()
+
+    def test_incremental_extract_replays_unchanged_files(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        src = tmp_path / "src"
+        src.mkdir()
+        _write(src / "A.java", JAVA_A)
+        _write(src / "B.java", JAVA_B)
+
+        first = list(extract_ast_mappings(str(src)))
+        assert sorted(m["original"] for m in first) == ["Exit the game", "Start the game"]
+
+        # 只修改一个文件，未变更文件的字符串应从缓存中回放
+        _write(src / "B.java", JAVA_B.replace("Exit the game", "Leave the game"))
+        second = list(extract_ast_mappings(str(src)))
+        assert sorted(m["original"] for m in second) == ["Leave the game", "Start the game"]
+
+        third = list(extract_ast_mappings(str(src)))
+        assert third == second
+
+    def test_filter_change_invalidates_cached_results(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("src.common.filter_utils._string_filter", StringFilter())
+        src = tmp_path / "src"
+        src.mkdir()
+        _write(src / "A.java", JAVA_A)
+        _write(src / "B.java", JAVA_B)
+
+        first = list(extract_ast_mappings(str(src)))
+        assert sorted(m["original"] for m in first) == ["Exit the game", "Start the game"]
+
+        # 文件未变更，但过滤规则变更后不能回放按旧规则过滤的结果
+        rules = json.loads(json.dumps(DEFAULT_FILTER_RULES))
+        rules["exact"]["blocked"] = ["Exit the game"]
+        set_string_filter(StringFilter(rules))
+        second = list(extract_ast_mappings(str(src)))
+        assert [m["original"] for m in second] == ["Start the game"]
+        assert get_string_filter().get_stats() == {"blocked": 1}
+
+        # 回放缓存结果时同样计入提取时的过滤计数
+        third = list(extract_ast_mappings(str(src)))
+        assert third == second
+        assert get_string_filter().get_stats() == {"blocked": 1}
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻反编译进程测试
+
+使用按相同协议工作的Python脚本代替JVM，测试进程复用、进程退出和无法启动时的回退
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common import jar_utils
+from src.common.decompiler_worker import DecompilerWorkerPool, get_worker_pool_size
+
+FAKE_WORKER = '''
+import os
+import sys
+
+print("READY", flush=True)
+for line in sys.stdin:
+    decompiler, jar_path, output_dir, extra_classpath = line.rstrip("\\n").split("\\t")
+    if decompiler == "procyon":
+        sys.exit(1)
+    if not os.path.exists(jar_path):
+        print("ERROR\\tmissing jar", flush=True)
+        continue
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "A.java"), "w", encoding="utf-8") as f:
+        f.write(f"{os.getpid()} {extra_classpath}")
+    print("OK", flush=True)
+'''
+
+
+def _worker_command(tmp_path):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER, encoding="utf-8")
+    return [sys.executable, str(script)]
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_worker_pool_reuses_process(tmp_path):
+    jar_path = tmp_path / "mod.jar"
+    jar_path.write_bytes(b"jar")
+
+    with DecompilerWorkerPool(_worker_command(tmp_path), size=1) as pool:
+        assert pool.decompile("cfr", str(jar_path), str(tmp_path / "out1"))
+        assert pool.decompile("cfr", str(jar_path), str(tmp_path / "out2"), str(jar_path))
+        first_pid = _read(tmp_path / "out1" / "A.java").split()[0]
+        assert _read(tmp_path / "out2" / "A.java") == f"{first_pid} {jar_path}"
+
+        # 任务失败时进程保持可用
+        assert pool.decompile("cfr", str(tmp_path / "missing.jar"), str(tmp_path / "out3")) is False
+        assert pool.decompile("cfr", str(jar_path), str(tmp_path / "out3"))
+        assert _read(tmp_path / "out3" / "A.java").split()[0] == first_pid
+
+        # 进程在任务中退出时回退，该反编译工具之后不再使用常驻进程
+        assert pool.decompile("procyon", str(jar_path), str(tmp_path / "out4")) is None
+        assert pool.decompile("procyon", str(jar_path), str(tmp_path / "out4")) is None
+        assert pool.decompile("cfr", str(jar_path), str(tmp_path / "out5"))
+
+
+def test_worker_pool_unavailable_falls_back(monkeypatch, tmp_path):
+    pool = DecompilerWorkerPool([sys.executable, "-c", "import sys; sys.exit(1)"], size=2)
+    assert pool.decompile("cfr", str(tmp_path / "mod.jar"), str(tmp_path / "out")) is None
+    assert not pool.available
+    pool.close()
+
+    assert get_worker_pool_size(4, heap_mb=1) >= 1
+    monkeypatch.setattr("src.common.decompiler_worker._get_available_memory_mb", lambda: 3000)
+    assert get_worker_pool_size(8, heap_mb=1024) == 2
+    monkeypatch.setattr("src.common.decompiler_worker._get_available_memory_mb", lambda: 100)
+    assert get_worker_pool_size(8, heap_mb=1024) == 1
+
+
+def test_decompile_with_cfr_uses_active_pool(monkeypatch, tmp_path):
+    fake_tool = tmp_path / "cfr.jar"
+    fake_tool.write_bytes(b"")
+    jar_path = tmp_path / "mod.jar"
+    jar_path.write_bytes(b"jar")
+    monkeypatch.setattr(jar_utils, "cfr_path", str(fake_tool))
+
+    def no_process(*args, **kwargs):
+        raise AssertionError("不应单独启动java进程")
+
+    monkeypatch.setattr(jar_utils.subprocess, "run", no_process)
+    with jar_utils.use_decompiler_workers(max_workers=2, command=_worker_command(tmp_path)) as pool:
+        with jar_utils.use_decompiler_workers() as nested:
+            assert nested is pool
+        assert jar_utils._decompile_with_cfr(str(jar_path), str(tmp_path / "out"))
+    assert os.path.exists(tmp_path / "out" / "A.java")
+    assert jar_utils._active_worker_pool is None
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字符串过滤规则引擎测试
+
+测试规则配置加载、各类规则的命中以及过滤计数
+"""
+
+import json
+import os
+import sys
+from collections import Counter
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.filter_utils import DEFAULT_FILTER_CONFIG, DEFAULT_FILTER_RULES, StringFilter
+
+
+def test_config_file_matches_builtin_rules():
+    with open(DEFAULT_FILTER_CONFIG, 'r', encoding='utf-8') as f:
+        assert json.load(f) == DEFAULT_FILTER_RULES
+
+
+def test_match_reports_rule_names():
+    string_filter = StringFilter()
+    assert string_filter.match("") == "empty"
+    assert string_filter.match("a") == "too_short"
+    assert string_filter.match("%s") == "format_string"
+    assert string_filter.match("deployCR") == "config_item"
+    assert string_filter.match("example_skill") == "example_name"
+    assert string_filter.match("Open Menu UI") == "ui_identifier"
+    assert string_filter.match("player_name") == "identifier"
+    assert string_filter.match("data/config/ships.csv") == "path"
+    assert string_filter.match("12.5") == "number"
+    assert string_filter.match("!?") == "special_chars"
+    # keep中的字符串只会被完全匹配规则过滤
+    assert string_filter.match("+") is None
+    assert string_filter.match("%") == "format_string"
+    assert string_filter.match("Start the game") is None
+
+
+def test_counters_record_filtered_strings():
+    string_filter = StringFilter()
+    for text in ["1.5", "2.25", "%s", "Hello there", ""]:
+        string_filter.should_filter(text)
+    assert string_filter.get_stats() == {"number": 2, "format_string": 1, "empty": 1}
+
+    string_filter.reset_stats()
+    assert string_filter.get_stats() == {}
+
+    # 并行任务记录到各自的Counter，再合并到过滤器
+    counters = Counter()
+    assert string_filter.should_filter("3.5", counters)
+    assert string_filter.get_stats() == {}
+    string_filter.merge_stats(counters)
+    string_filter.merge_stats({"number": 2})
+    assert string_filter.get_stats() == {"number": 3}
+
+
+def test_rules_loaded_from_config_file(tmp_path):
+    config_file = tmp_path / "string_filter.json"
+    config_file.write_text(json.dumps({
+        "min_length": 3,
+        "exact": {"blocked": ["Secret text"]},
+        "pattern": {"version": r"^v\d+(\.\d+)*$"},
+    }), encoding="utf-8")
+
+    string_filter = StringFilter.from_file(str(config_file))
+    assert string_filter.match("ok") == "too_short"
+    assert string_filter.match("Secret text") == "blocked"
+    assert string_filter.match("v1.2.3") == "version"
+    assert string_filter.match("player_name") is None
+
+    # 配置文件无法解析时回退到内置规则
+    config_file.write_text("{invalid", encoding="utf-8")
+    assert StringFilter.from_file(str(config_file)).match("player_name") == "identifier"
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JAR工具测试
+
+测试反编译结果缓存：相同JAR只反编译一次，缓存文件被修改后重新反编译，超出大小上限时淘汰最久未使用的条目
+测试增量反编译：只重新反编译CRC32变更的顶层类及其内部类
+测试Unicode转义转换：代理对、转义的反斜杠以及不包含转义序列的文件不被改写
+测试直接从JAR读取：源码JAR的AST映射以及提取流程生成的YAML与解压后提取一致
+"""
+
+import os
+import pytest
+import sys
+import zipfile
+
+import yaml
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common import jar_utils
+from src.common.tree_sitter_utils import extract_ast_mappings, extract_jar_mappings
+
+JAVA_SOURCE = 'public class A {\n    String title = "\\u5f00\\u59cb";\n}\n'
+
+
+def _make_jar(path, content=b"class-bytes"):
+    with zipfile.ZipFile(path, "w") as jar:
+        jar.writestr("com/example/A.class", content)
+    return path
+
+
+def _patch_decompiler(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_cfr(jar_path, output_dir):
+        calls.append(jar_path)
+        package_dir = os.path.join(output_dir, "com", "example")
+        os.makedirs(package_dir, exist_ok=True)
+        with open(os.path.join(package_dir, "A.java"), "w", encoding="latin-1") as f:
+            f.write(JAVA_SOURCE)
+        return True
+
+    fake_tool = tmp_path / "cfr.jar"
+    fake_tool.write_bytes(b"")
+    monkeypatch.setattr(jar_utils, "DECOMPILE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(jar_utils, "cfr_path", str(fake_tool))
+    monkeypatch.setattr(jar_utils, "check_java_environment", lambda: True)
+    monkeypatch.setattr(jar_utils, "check_decompiler_tools", lambda download_missing=True: True)
+    monkeypatch.setattr(jar_utils, "_decompile_with_cfr", fake_cfr)
+    return calls
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_decompile_cache_hit_links_output(monkeypatch, tmp_path):
+    calls = _patch_decompiler(monkeypatch, tmp_path)
+    jar_path = _make_jar(str(tmp_path / "mod.jar"))
+    copy_path = _make_jar(str(tmp_path / "mod-copy.jar"))
+
+    first_dir = str(tmp_path / "out1")
+    assert jar_utils.decompile_jar(jar_path, first_dir)
+    first_file = os.path.join(first_dir, "com", "example", "A.java")
+    assert "开始" in _read(first_file)
+
+    second_dir = str(tmp_path / "out2")
+    assert jar_utils.decompile_jar(copy_path, second_dir)
+    second_file = os.path.join(second_dir, "com", "example", "A.java")
+    assert len(calls) == 1
+    assert _read(second_file) == _read(first_file)
+
+    # 不同的JAR内容或关闭缓存时重新反编译
+    assert jar_utils.decompile_jar(_make_jar(str(tmp_path / "other.jar"), b"other"), str(tmp_path / "out3"))
+    assert jar_utils.decompile_jar(jar_path, str(tmp_path / "out4"), use_cache=False)
+    assert len(calls) == 3
+    assert not [name for name in os.listdir(jar_utils.DECOMPILE_CACHE_DIR) if name.startswith(".staging-")]
+
+
+def test_decompile_cache_invalidated_by_modified_output(monkeypatch, tmp_path):
+    calls = _patch_decompiler(monkeypatch, tmp_path)
+    jar_path = _make_jar(str(tmp_path / "mod.jar"))
+    output_dir = str(tmp_path / "out")
+    assert jar_utils.decompile_jar(jar_path, output_dir)
+
+    # 原地修改输出文件，硬链接的缓存文件随之变化
+    output_file = os.path.join(output_dir, "com", "example", "A.java")
+    with open(output_file, "a", encoding="utf-8") as f:
+        f.write("// edited\n")
+    os.utime(output_file, ns=(0, 0))
+
+    assert jar_utils.decompile_jar(jar_path, output_dir)
+    assert "edited" not in _read(output_file)
+    expected_calls = 2 if os.stat(output_file).st_nlink > 1 else 1
+    assert len(calls) == expected_calls
+
+
+def _write_classes(path, classes):
+    with zipfile.ZipFile(path, "w") as jar:
+        for name, content in classes.items():
+            jar.writestr(name, content)
+    return path
+
+
+def test_incremental_decompile_only_changed_classes(monkeypatch, tmp_path):
+    _patch_decompiler(monkeypatch, tmp_path)
+    decompiled = []
+
+    def fake_cfr(jar_path, output_dir, extra_classpath=None):
+        with zipfile.ZipFile(jar_path) as jar:
+            names = jar.namelist()
+            decompiled.append(sorted(names))
+            for name in names:
+                top_level = name[:-len(".class")].split("$")[0]
+                target = os.path.join(output_dir, *top_level.split("/")) + ".java"
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "a", encoding="utf-8") as f:
+                    f.write(f"// {name} {jar.read(name).decode()}\n")
+        return True
+
+    monkeypatch.setattr(jar_utils, "_decompile_with_cfr", fake_cfr)
+    jar_path = str(tmp_path / "mod.jar")
+    output_dir = str(tmp_path / "out")
+    _write_classes(jar_path, {"com/example/A.class": "a1", "com/example/A$Inner.class": "i1",
+                              "com/example/B.class": "b1", "com/example/C.class": "c1"})
+    assert jar_utils.decompile_jar_incremental(jar_path, output_dir)
+    assert len(decompiled) == 1
+
+    # 修改内部类、删除C、新增D
+    _write_classes(jar_path, {"com/example/A.class": "a1", "com/example/A$Inner.class": "i2",
+                              "com/example/B.class": "b1", "com/example/D.class": "d1"})
+    assert jar_utils.decompile_jar_incremental(jar_path, output_dir)
+    assert decompiled[1] == ["com/example/A$Inner.class", "com/example/A.class", "com/example/D.class"]
+    package_dir = os.path.join(output_dir, "com", "example")
+    assert sorted(os.listdir(package_dir)) == ["A.java", "B.java", "D.java"]
+    assert "i2" in _read(os.path.join(package_dir, "A.java"))
+    assert "i1" not in _read(os.path.join(package_dir, "A.java"))
+
+    # 未变更时不启动反编译，输出文件丢失时只补齐丢失的类
+    assert jar_utils.decompile_jar_incremental(jar_path, output_dir)
+    assert len(decompiled) == 2
+    os.remove(os.path.join(package_dir, "B.java"))
+    assert jar_utils.decompile_jar_incremental(jar_path, output_dir)
+    assert decompiled[2] == ["com/example/B.class"]
+    assert os.path.exists(os.path.join(package_dir, "B.java"))
+
+
+def test_class_groups_split_on_dollar_only_for_existing_outer_class(tmp_path):
+    jar_path = _write_classes(str(tmp_path / "mod.jar"), {
+        "com/example/A.class": "a", "com/example/A$B$1.class": "ab1", "com/example/Gen$Proxy.class": "p",
+        "com/example/$Lambda.class": "l", "META-INF/versions/9/X.class": "x"})
+    groups = jar_utils.get_class_crcs(jar_path)
+    assert sorted(groups) == ["com/example/$Lambda", "com/example/A", "com/example/Gen$Proxy"]
+    assert sorted(groups["com/example/A"]) == ["com/example/A$B$1.class", "com/example/A.class"]
+
+
+def test_incremental_decompile_with_procyon_runs_full_decompile(monkeypatch, tmp_path):
+    full_runs = []
+
+    def fake_decompile_jar(jar_path, output_dir, decompiler="cfr", use_cache=True):
+        full_runs.append(decompiler)
+        os.makedirs(output_dir, exist_ok=True)
+        return True
+
+    monkeypatch.setattr(jar_utils, "DECOMPILE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(jar_utils, "decompile_jar", fake_decompile_jar)
+    monkeypatch.setattr(jar_utils, "_decompile_changed_classes",
+                        lambda *args: pytest.fail("Procyon不支持只反编译部分类"))
+    jar_path = _write_classes(str(tmp_path / "mod.jar"), {"com/example/A.class": "a1"})
+    output_dir = str(tmp_path / "out")
+    assert jar_utils.decompile_jar_incremental(jar_path, output_dir, "procyon")
+    _write_classes(jar_path, {"com/example/A.class": "a2"})
+    assert jar_utils.decompile_jar_incremental(jar_path, output_dir, "procyon")
+    assert full_runs == ["procyon", "procyon"]
+
+
+def test_convert_unicode_escapes(tmp_path):
+    source = tmp_path / "A.java"
+    source.write_bytes(b'String a = "\\u5f00\\uu59cb \\ud83d\\ude00 \\\\u0041 \\\\\\u0042 \\ud800x";\n')
+    assert jar_utils.convert_unicode_escapes(str(source))
+    assert source.read_bytes().decode("utf-8") == 'String a = "开始 😀 \\\\u0041 \\\\B \\ud800x";\n'
+
+    # 不包含转义序列或只有单独代理项的文件不被改写
+    plain = tmp_path / "B.java"
+    plain.write_bytes(b"class B {}\n")
+    mtime_ns = os.stat(plain).st_mtime_ns
+    assert not jar_utils.convert_unicode_escapes(str(plain))
+    assert os.stat(plain).st_mtime_ns == mtime_ns
+    lone = tmp_path / "C.java"
+    lone.write_bytes(b'"\\udc00"\n')
+    assert not jar_utils.convert_unicode_escapes(str(lone))
+
+    # 已有的UTF-8字符保持不变，latin-1文件转换为UTF-8
+    utf8 = tmp_path / "D.kt"
+    utf8.write_bytes('"开始 \\u6e38\\u620f"\n'.encode("utf-8"))
+    latin1 = tmp_path / "E.java"
+    latin1.write_bytes('"é \\u00e9"\n'.encode("latin-1"))
+    assert jar_utils.convert_unicode_escapes_in_dir(str(tmp_path)) == 2
+    assert utf8.read_bytes().decode("utf-8") == '"开始 游戏"\n'
+    assert latin1.read_bytes().decode("utf-8") == '"é é"\n'
+
+
+def test_extract_jar_mappings_match_extracted_tree(tmp_path):
+    jar_path = _write_classes(str(tmp_path / "mod-sources.jar"), {
+        "com/example/Screen.java": 'class Screen { String title = "Welcome to the screen"; }',
+        "com/example/Dialog.kt": 'class Dialog { val text = "Dialog text here" }',
+        "com/example/Screen.class": "class-bytes",
+        "assets/mod/textures/gem.png": "png",
+    })
+
+    # 直接从JAR提取的映射与解压后提取的映射一致
+    full_dir = str(tmp_path / "full")
+    assert jar_utils.extract_jar(jar_path, full_dir)
+    from_disk = list(extract_ast_mappings(full_dir, use_cache=False))
+    from_jar = list(extract_jar_mappings(jar_path, full_dir))
+    assert len(from_jar) == 2
+    assert sorted(from_jar, key=lambda m: m["id"]) == sorted(from_disk, key=lambda m: m["id"])
+
+
+def test_decompile_cache_evicts_least_recently_used(monkeypatch, tmp_path):
+    calls = _patch_decompiler(monkeypatch, tmp_path)
+    first_jar = _make_jar(str(tmp_path / "first.jar"), b"first")
+    second_jar = _make_jar(str(tmp_path / "second.jar"), b"second")
+    assert jar_utils.decompile_jar(first_jar, str(tmp_path / "out1"))
+    assert jar_utils.decompile_jar(second_jar, str(tmp_path / "out2"))
+
+    # 再次使用第一个JAR的缓存，第二个JAR成为最久未使用的条目
+    entries = sorted(os.listdir(jar_utils.DECOMPILE_CACHE_DIR))
+    for entry in entries:
+        os.utime(os.path.join(jar_utils.DECOMPILE_CACHE_DIR, entry, "manifest.json"), ns=(0, 0))
+    assert jar_utils.decompile_jar(first_jar, str(tmp_path / "out3"))
+    assert len(calls) == 2
+
+    entry_size = os.path.getsize(tmp_path / "out1" / "com" / "example" / "A.java")
+    assert jar_utils.prune_decompile_cache(entry_size) == 1
+    assert jar_utils.decompile_jar(first_jar, str(tmp_path / "out4"))
+    assert jar_utils.decompile_jar(second_jar, str(tmp_path / "out5"))
+    assert len(calls) == 3
+    assert "开始" in _read(tmp_path / "out2" / "com" / "example" / "A.java")
+
+    # 上限为0时清空缓存
+    assert jar_utils.prune_decompile_cache(0) == 2
+    assert os.listdir(jar_utils.DECOMPILE_CACHE_DIR) == []
+
+
+def test_extract_flow_reads_source_jars_directly(monkeypatch, tmp_path):
+    from src.common.yaml_utils import generate_initial_yaml_mappings, save_yaml_mappings
+    from src.extract_mode.core import _collect_ast_mappings
+
+    monkeypatch.chdir(tmp_path)
+    mod_dir = tmp_path / "mod"
+    (mod_dir / "src").mkdir(parents=True)
+    (mod_dir / "src" / "Menu.java").write_text('class Menu { String label = "Open the menu"; }', encoding="utf-8")
+    (mod_dir / "jars").mkdir()
+    jar_path = _write_classes(str(mod_dir / "jars" / "mod-sources.jar"), {
+        "com/example/Screen.java": 'class Screen { String title = "Welcome to the screen"; }',
+        "com/example/Dialog.kt": 'class Dialog { val text = "Dialog text here" }',
+        "com/example/Screen.class": "class-bytes",
+    })
+
+    # 默认不合并源码JAR中的字符串
+    assert len(_collect_ast_mappings(str(mod_dir))) == 1
+
+    def write_yaml(file_name):
+        yaml_path = str(tmp_path / file_name)
+        mappings = generate_initial_yaml_mappings(_collect_ast_mappings(str(mod_dir), include_source_jars=True),
+                                                  mark_unmapped=True)
+        assert save_yaml_mappings(mappings, yaml_path, version_control=False, mod_id="mod")
+        with open(yaml_path, "r", encoding="utf-8") as f:
+            return sorted(yaml.safe_load(f), key=lambda mapping: mapping["id"])
+
+    from_jar = write_yaml("from_jar.yaml")
+    assert len(from_jar) == 3
+    assert not os.path.exists(mod_dir / "jars" / "mod-sources")
+
+    # 解压到同名文件夹后从磁盘提取，生成的YAML与直接读取JAR一致，且不重复读取JAR
+    assert jar_utils.extract_jar(jar_path, str(mod_dir / "jars" / "mod-sources"))
+    assert write_yaml("from_disk.yaml") == from_jar
+
+
+def test_extract_jar_writes_only_text_resources(tmp_path):
+    jar_path = _write_classes(str(tmp_path / "mod.jar"), {
+        "assets/lang/en_us.properties": "menu.open=Open", "data/items.json": "{}", "data/Table.CSV": "a,b",
+        "com/example/A.class": "class-bytes", "assets/textures/icon.png": "png"})
+    output_dir = tmp_path / "out"
+    assert jar_utils.extract_jar(jar_path, str(output_dir), jar_utils.TEXT_RESOURCE_EXTENSIONS)
+    written = sorted(os.path.relpath(os.path.join(root, name), output_dir).replace(os.sep, "/")
+                     for root, _, files in os.walk(output_dir) for name in files)
+    assert written == ["assets/lang/en_us.properties", "data/Table.CSV", "data/items.json"]
+    assert (output_dir / "assets" / "lang" / "en_us.properties").read_text(encoding="utf-8") == "menu.open=Open"
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模糊匹配索引测试
+
+测试FuzzyMatchIndex的查询结果与逐条比较一致、带上界的Levenshtein距离、上下文签名索引，以及批量建议接口
+"""
+
+import os
+import random
+import sys
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.levenshtein_utils import (ContextSignatureIndex, FuzzyMatchIndex, LevenshteinDistance,
+                                          get_contextual_suggestions, get_fuzzy_suggestions, get_ranked_suggestions)
+from src.common import suggestion_generator
+from src.common.suggestion_generator import SuggestionGenerator
+
+ALPHABET = "abcde %{}$s"
+
+
+def _random_text(rng):
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 14)))
+
+
+def _pairs(suggestions):
+    return [(suggestion["item"]["id"], suggestion["similarity"]) for suggestion in suggestions]
+
+
+def test_index_matches_linear_scan():
+    rng = random.Random(7)
+    for _ in range(100):
+        localization_db = [{"id": i, "original": _random_text(rng)} for i in range(40)]
+        for clean_placeholders in (True, False):
+            fuzzy_index = FuzzyMatchIndex(localization_db, clean_placeholders=clean_placeholders)
+            for threshold in (0.0, 0.5, 0.8, 0.9, 1.0):
+                query = _random_text(rng)
+                expected = get_fuzzy_suggestions(query, localization_db, threshold, clean_placeholders)
+                assert _pairs(fuzzy_index.search(query, threshold)) == _pairs(expected)
+
+
+def test_bounded_distance():
+    assert LevenshteinDistance.calculate("kitten", "sitting") == 3
+    assert LevenshteinDistance.bounded("kitten", "sitting", 3) == 3
+    assert LevenshteinDistance.bounded("kitten", "sitting", 2) == 3
+    assert LevenshteinDistance.bounded("short", "much longer text", 4) == 5
+    assert LevenshteinDistance.bounded("", "abc", 5) == 3
+
+
+def test_generator_rebuilds_index_when_db_changes():
+    generator = SuggestionGenerator([{"id": "a", "original": "Start the game", "translated": "开始游戏"}])
+    item = {"id": "q", "original": "Start the game!"}
+    assert generator.generate_suggestions(item, threshold=0.8)[0]["item"]["id"] == "a"
+
+    fuzzy_index = generator.get_fuzzy_index()
+    assert generator.get_fuzzy_index() is fuzzy_index
+
+    generator.add_to_localization_db([{"id": "b", "original": "Start the game!", "translated": "开始游戏！"}])
+    assert generator.get_fuzzy_index() is not fuzzy_index
+    assert generator.generate_suggestions(item, threshold=0.8)[0]["item"]["id"] == "b"
+
+
+def _batch_fixture(rng, count):
+    localization_db = [
+        {"id": f"db{i}", "original": _random_text(rng), "translated": f"译文{i}",
+         "context": {"parent_types": ["method_invocation"], "node_type": "string_literal"}}
+        for i in range(count)
+    ]
+    items = [{"id": f"item{i}", "original": localization_db[i % 7]["original"] if i % 3 else _random_text(rng)}
+             for i in range(count)]
+    items[0]["context"] = {"parent_types": ["method_invocation"], "node_type": "string_literal"}
+    return localization_db, items
+
+
+def test_suggest_many_matches_single_item_suggestions():
+    localization_db, items = _batch_fixture(random.Random(11), 60)
+    generator = SuggestionGenerator(localization_db)
+    suggestions = generator.suggest_many(items, threshold=0.5, k=3, max_workers=1)
+
+    assert list(suggestions) == [item["id"] for item in items]
+    for item in items:
+        expected = generator.generate_suggestions(item, threshold=0.5, max_suggestions=3)
+        assert _pairs(suggestions[item["id"]]) == _pairs(expected)
+
+
+def test_suggest_many_deduplicates_originals(monkeypatch):
+    localization_db, items = _batch_fixture(random.Random(12), 30)
+    generator = SuggestionGenerator(localization_db)
+    fuzzy_index = generator.get_fuzzy_index()
+    queries = []
+    original_search = fuzzy_index.search
+    limits = set()
+    monkeypatch.setattr(fuzzy_index, "search", lambda query, threshold, limit=None: queries.append(query) or
+                        limits.add(limit) or original_search(query, threshold, limit))
+
+    generator.suggest_many(items, threshold=0.5, k=4, max_workers=1)
+    assert sorted(queries) == sorted({item["original"] for item in items})
+    # 每个查询只取前k条模糊匹配
+    assert limits == {4}
+
+
+def test_suggest_many_process_pool(monkeypatch):
+    localization_db, items = _batch_fixture(random.Random(13), 40)
+    generator = SuggestionGenerator(localization_db)
+    expected = generator.suggest_many(items, threshold=0.5, k=2, max_workers=1)
+
+    monkeypatch.setattr(suggestion_generator, "MIN_PARALLEL_QUERIES", 1)
+    monkeypatch.setattr(suggestion_generator, "SUGGESTION_CHUNK_SIZE", 4)
+    suggestions = generator.suggest_many(items, threshold=0.5, k=2, max_workers=2)
+    assert {key: _pairs(value) for key, value in suggestions.items()} == \
+        {key: _pairs(value) for key, value in expected.items()}
+
+
+NODE_TYPES = ["string_literal", "identifier", "method_invocation", "argument_list", "class_body"]
+
+
+def _random_context(rng):
+    context = {}
+    if rng.random() < 0.9:
+        context["parent_types"] = [rng.choice(NODE_TYPES) for _ in range(rng.randint(0, 6))]
+    if rng.random() < 0.8:
+        context["node_type"] = rng.choice(NODE_TYPES[:2])
+    return context
+
+
+def test_context_index_matches_linear_scan():
+    rng = random.Random(17)
+    for _ in range(50):
+        localization_db = [{"id": i, "original": _random_text(rng)} for i in range(40)]
+        for entry in localization_db:
+            if rng.random() < 0.9:
+                entry["context"] = _random_context(rng)
+        context_index = ContextSignatureIndex(localization_db)
+        for _ in range(10):
+            item = {"id": "q", "original": "", "context": _random_context(rng)}
+            for max_suggestions in (1, 5, 100):
+                expected = get_contextual_suggestions(item, localization_db, max_suggestions)
+                actual = get_contextual_suggestions(item, localization_db, max_suggestions, context_index)
+                assert [entry["id"] for entry in actual] == [entry["id"] for entry in expected]
+
+
+def test_ranked_suggestions_prefer_closer_context():
+    call_site = ["argument_list", "method_invocation", "block", "method_declaration"]
+    localization_db = [
+        {"id": "near", "original": "Open the menu", "translated": "打开菜单",
+         "context": {"node_type": "string_literal", "parent_types": call_site}},
+        {"id": "far", "original": "Open the menu", "translated": "打开菜单",
+         "context": {"node_type": "string_literal", "parent_types": ["field_declaration", "class_body"]}},
+        {"id": "same_bucket", "original": "Close", "translated": "关闭",
+         "context": {"node_type": "string_literal", "parent_types": call_site[:3] + ["lambda_expression"]}},
+    ]
+    item = {"id": "q", "original": "Open the menu",
+            "context": {"node_type": "string_literal", "parent_types": call_site}}
+
+    context_index = ContextSignatureIndex(localization_db)
+    assert [entry["id"] for entry in context_index.bucket(item["context"])] == ["near", "same_bucket"]
+
+    suggestions = get_ranked_suggestions(item, localization_db, threshold=0.8, context_index=context_index)
+    assert [suggestion["item"]["id"] for suggestion in suggestions] == ["near", "same_bucket", "far"]
+    assert suggestions[0]["type"] == "contextual" and suggestions[0]["score"] == 1.0
+    assert suggestions[2]["type"] == "fuzzy"
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并行提取测试
+
+测试解析器缓存、按文件大小分块以及多进程/多线程提取结果和过滤计数与顺序提取一致
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.common.filter_utils import get_string_filter
+from src.common.tree_sitter_utils import _split_files_by_size, extract_ast_mappings, get_parser
+
+
+def _create_sources(source_dir, count):
+    for i in range(count):
+        with open(os.path.join(source_dir, f"Screen{i}.java"), 'w', encoding='utf-8') as f:
+            f.write('class Screen%d { String title = "Welcome to screen %d"; String key = "screen_%d"; }' % (i, i, i))
+        with open(os.path.join(source_dir, f"Dialog{i}.kt"), 'w', encoding='utf-8') as f:
+            f.write('class Dialog%d { val text = "Dialog text number %d" }' % (i, i))
+
+
+def test_get_parser_reuses_parser_per_language():
+    assert get_parser("A.java") is get_parser("B.java")
+    assert get_parser("A.kt") is get_parser("B.kts")
+    assert get_parser("A.java") is not get_parser("A.kt")
+    assert get_parser("script.py") is None
+
+
+def test_split_files_by_size_balances_chunks(tmp_path):
+    sizes = [900, 500, 400, 300, 200, 100]
+    file_paths = []
+    for i, size in enumerate(sizes):
+        file_path = tmp_path / f"F{i}.java"
+        file_path.write_bytes(b"x" * size)
+        file_paths.append(str(file_path))
+
+    chunks = _split_files_by_size(file_paths, 2)
+    totals = sorted(sum(os.path.getsize(p) for p in chunk) for chunk in chunks)
+    assert totals == [1200, 1200]
+    assert sorted(p for chunk in chunks for p in chunk) == sorted(file_paths)
+    # 分块数不超过文件数
+    assert len(_split_files_by_size(file_paths[:1], 8)) == 1
+
+
+@pytest.mark.parametrize("use_multiprocessing", [True, False])
+def test_parallel_extract_matches_sequential(tmp_path, use_multiprocessing):
+    _create_sources(str(tmp_path), 10)
+
+    sequential = list(extract_ast_mappings(str(tmp_path), use_cache=False))
+    sequential_stats = get_string_filter().get_stats()
+    parallel = list(extract_ast_mappings(str(tmp_path), use_parallel=True, max_workers=2, use_cache=False,
+                                         use_multiprocessing=use_multiprocessing))
+
+    assert len(sequential) == 20
+    # 工作进程中的过滤计数合并回主进程
+    assert sequential_stats == {"identifier": 10}
+    assert get_string_filter().get_stats() == sequential_stats
+    assert sorted(parallel, key=lambda m: m["id"]) == sorted(sequential, key=lambda m: m["id"])
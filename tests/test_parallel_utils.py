@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并行处理工具测试
+
+测试ParallelProcessor的参数传递、分块、错误捕获和流式返回
+"""
+
+import os
+import sys
+import threading
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.parallel_utils import ParallelProcessor, batch_process_files, chunk_items
+
+
+def _scale(value, factor, offset=0):
+    if value < 0:
+        raise ValueError("negative value")
+    return value * factor + offset
+
+
+def _tag(file_path, prefix, suffix=""):
+    return prefix + os.path.basename(file_path) + suffix
+
+
+class TestParallelProcessor:
+    """
+    测试并行处理器
+    """
+
+    def test_process_files_passes_extra_args(self):
+        processor = ParallelProcessor(max_workers=2)
+        results = processor.process_files([1, 2, 3], _scale, 10, offset=1)
+        assert sorted(r["result"] for r in results["success"]) == [11, 21, 31]
+        assert results["failed"] == []
+        assert all(r["time"] >= 0 for r in results["success"])
+
+    def test_errors_are_captured_per_task(self):
+        processor = ParallelProcessor(max_workers=2, chunk_size=2)
+        outcomes = {o["file"]: o for o in processor.iter_results([1, -1, 2], _scale, 2)}
+        assert outcomes[1]["result"] == 2 and outcomes[1]["error"] is None
+        assert outcomes[2]["result"] == 4
+        assert outcomes[-1]["result"] is None
+        assert "negative value" in outcomes[-1]["error"]
+
+    def test_multiprocessing_mode(self):
+        processor = ParallelProcessor(max_workers=2, use_multiprocessing=True, chunk_size=3)
+        results = sorted(o["result"] for o in processor.iter_results(range(10), _scale, 3))
+        assert results == [i * 3 for i in range(10)]
+
+    def test_in_flight_chunks_are_bounded(self):
+        submitted = []
+        lock = threading.Lock()
+
+        def items():
+            for i in range(20):
+                with lock:
+                    submitted.append(i)
+                yield i
+
+        processor = ParallelProcessor(max_workers=1, chunk_size=2, max_in_flight=2)
+        stream = processor.iter_results(items(), _scale, 1)
+        first = next(stream)
+        # 第一个结果返回时最多只取出了(max_in_flight + 1)个分块
+        assert len(submitted) <= 6
+        assert sorted([first["result"]] + [o["result"] for o in stream]) == list(range(20))
+
+
+def test_chunk_items():
+    assert list(chunk_items(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunk_items([], 3)) == []
+
+
+def test_batch_process_files_passes_worker_args(tmp_path):
+    for name in ("a.java", "b.java", "c.txt"):
+        (tmp_path / name).write_text("", encoding="utf-8")
+
+    # 额外参数通过args/kwargs传递，不会占用max_workers等位置参数
+    results = batch_process_files(str(tmp_path), [".java"], _tag, 2, chunk_size=2,
+                                  args=("<",), kwargs={"suffix": ">"})
+    assert sorted(r["result"] for r in results["success"]) == ["<a.java>", "<b.java>"]
+    assert results["failed"] == []
+
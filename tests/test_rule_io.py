@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则文件读写测试
+
+测试流式写入与yaml.dump的输出一致、流式读取与一次性加载的结果一致
+"""
+
+import io
+import os
+import sys
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml
+
+from src.common.rule_io import count_rule_file, iter_rule_file, read_rule_file_metadata, write_rule_file
+from src.common.rules_store import RulesStore
+from src.common.yaml_utils import load_yaml_mappings, save_yaml_mappings
+
+TEXTS = ["Start the game", "开始游戏", "long text " * 20, "line1\nline2", "'quoted' \"text\"", "yes", "123",
+         "emoji 😀", "#hash", ""]
+
+
+def _mappings(count):
+    return [
+        {
+            "id": f"{i:016x}",
+            "original": TEXTS[i % len(TEXTS)],
+            "translated": TEXTS[(i * 3) % len(TEXTS)],
+            "context": {"node_type": "string_literal"},
+            "status": "translated" if i % 3 else "untranslated",
+            "placeholders": [],
+            "meta": {"line": i, "file": f"src/F{i % 4}.java"},
+        }
+        for i in range(count)
+    ]
+
+
+def test_streaming_write_matches_yaml_dump():
+    mappings = _mappings(50)
+    metadata = {"version": "1.0", "created_at": "2026-01-01T00:00:00", "id": "demo"}
+    expected = yaml.dump(dict(metadata, mappings=mappings), default_flow_style=False, allow_unicode=True,
+                         sort_keys=False)
+
+    stream = io.StringIO()
+    assert write_rule_file(stream, metadata, iter(mappings), batch_size=7) == 50
+    assert stream.getvalue() == expected
+
+    stream = io.StringIO()
+    write_rule_file(stream, metadata, [])
+    assert yaml.safe_load(stream.getvalue())["mappings"] == []
+
+
+def test_streaming_read_matches_full_load(tmp_path):
+    mappings = _mappings(30)
+    rules_file = str(tmp_path / "rules.yaml")
+    assert save_yaml_mappings(mappings, rules_file, mod_id="demo")
+
+    with open(rules_file, 'r', encoding='utf-8') as f:
+        assert f.readline() == "# YAML映射规则文件\n"
+    assert list(iter_rule_file(rules_file)) == mappings
+    assert load_yaml_mappings(rules_file) == mappings
+    assert read_rule_file_metadata(rules_file)["id"] == "demo"
+    assert count_rule_file(rules_file, lambda rule: rule["status"] == "untranslated") == 10
+
+    # 传统列表格式
+    save_yaml_mappings(mappings, rules_file, version_control=False)
+    assert list(iter_rule_file(rules_file)) == mappings
+    assert read_rule_file_metadata(rules_file) == {}
+
+
+def test_rules_store_iter_rules_filters(tmp_path):
+    rules_file = str(tmp_path / "rules.yaml")
+    save_yaml_mappings(_mappings(12), rules_file, mod_id="demo")
+
+    rules_store = RulesStore(rules_file)
+    selected = list(rules_store.iter_rules(status="translated", file_path="src/F1.java"))
+    assert [rule["meta"]["line"] for rule in selected] == [1, 5]
+
+    assert rules_store.load_rules()
+    assert rules_store.metadata["mod_id"] == "demo"
+    assert len(rules_store.rules) == 12
+
+
+def test_shared_sub_objects_across_batches(tmp_path):
+    shared_context = {"node_type": "string_literal", "parent_types": ["argument_list"]}
+    mappings = _mappings(7)
+    for mapping in mappings:
+        mapping["context"] = shared_context
+
+    stream = io.StringIO()
+    assert write_rule_file(stream, {"version": "1.0"}, mappings, batch_size=2) == 7
+    assert "&id" not in stream.getvalue()
+    assert yaml.safe_load(stream.getvalue())["mappings"] == mappings
+
+    # 超过一批的规则文件保存后可以完整加载
+    rules_file = str(tmp_path / "rules.yaml")
+    many = _mappings(2500)
+    for mapping in many:
+        mapping["context"] = shared_context
+    assert save_yaml_mappings(many, rules_file, mod_id="demo")
+    assert load_yaml_mappings(rules_file) == many
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则文件索引测试
+
+测试保存规则时生成.rules.idx索引、延迟加载时按索引查询单条记录以及规则文件变化后索引失效
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.rules_index import RulesIndex, build_rules_index, get_index_path
+from src.common.rules_store import RulesStore
+from src.common.yaml_utils import save_yaml_mappings
+
+TEXTS = ["Start the game", "开始游戏", "long text " * 20, "line1\nline2", "'quoted' \"text\"", "yes"]
+
+
+def _mappings(count):
+    return [
+        {
+            "id": f"{i * 7919 % 1000:016x}",
+            "original": TEXTS[i % len(TEXTS)],
+            "translated": TEXTS[(i * 5) % len(TEXTS)],
+            "context": {"node_type": "string_literal"},
+            "status": ["translated", "untranslated", "needs_review"][i % 3],
+            "placeholders": ["%s"] if i % 4 == 0 else [],
+            "meta": {"line": i, "file": f"src/F{i % 4}.java"},
+        }
+        for i in range(count)
+    ]
+
+
+def _saved_store(tmp_path, count=40):
+    rules_file = str(tmp_path / "rich_rules.yaml")
+    rules_store = RulesStore(rules_file)
+    rules_store.metadata["mod_id"] = "demo"
+    rules_store.rules = _mappings(count)
+    assert rules_store.save_rules()
+    return rules_file
+
+
+def test_lazy_queries_match_full_load(tmp_path):
+    rules_file = _saved_store(tmp_path)
+    assert os.path.exists(get_index_path(rules_file))
+
+    full_store = RulesStore(rules_file)
+    assert full_store.load_rules()
+
+    lazy_store = RulesStore(rules_file)
+    assert lazy_store.load_rules(lazy=True)
+    assert lazy_store._index is not None
+    assert lazy_store.metadata["mod_id"] == "demo"
+    assert len(lazy_store) == 40
+
+    for rule in full_store.rules:
+        assert lazy_store.get_rule(rule["id"]) == rule
+    assert lazy_store.get_rule("missing") is None
+    for status in ["translated", "untranslated", "needs_review", "unknown"]:
+        assert lazy_store.get_rules_by_status(status) == full_store.get_rules_by_status(status)
+    for text in TEXTS + ["missing"]:
+        assert lazy_store.get_rules_by_original(text) == full_store.get_rules_by_original(text)
+
+    # 查询没有改变延迟加载状态，访问规则列表时完整加载
+    assert lazy_store._rules is None
+    assert lazy_store.rules == full_store.rules
+    assert lazy_store._index is None
+
+
+def test_index_invalidated_when_rules_file_changes(tmp_path):
+    rules_file = _saved_store(tmp_path, count=10)
+    index = RulesIndex.open(rules_file)
+    assert index is not None and len(index) == 10
+    index.close()
+
+    # 绕过RulesStore修改规则文件，索引按内容哈希失效
+    save_yaml_mappings(_mappings(12), rules_file, mod_id="demo")
+    assert RulesIndex.open(rules_file) is None
+
+    lazy_store = RulesStore(rules_file)
+    assert lazy_store.load_rules(lazy=True)
+    assert lazy_store._index is None
+    assert len(lazy_store.rules) == 12
+
+    # 重新生成后可以继续使用，传统列表格式同样支持
+    save_yaml_mappings(_mappings(12), rules_file, version_control=False)
+    assert build_rules_index(rules_file)
+    index = RulesIndex.open(rules_file)
+    assert index.metadata == {}
+    assert index.get(_mappings(12)[3]["id"]) == _mappings(12)[3]
+    index.close()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则存储索引测试
+
+测试RulesStore的二级索引在增删改和排序后与顺序扫描的结果一致，以及规则指纹
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.rule_io import rule_fingerprint
+from src.common.rules_store import RulesStore
+from src.common.yaml_utils import save_yaml_mappings
+
+STATUSES = ["translated", "untranslated", "needs_review"]
+
+
+def _rule(i, status=None):
+    return {
+        "id": f"{i * 7919 % 1000:016x}",
+        "original": f"text {i % 5}",
+        "translated": f"文本 {i % 5}",
+        "status": status or STATUSES[i % 3],
+        "context": {"file": f"src/F{i % 4}.java"},
+        "meta": {"file": f"src/F{i % 4}.java", "line": i},
+    }
+
+
+def _assert_indexes_match_scan(rules_store):
+    rules = rules_store.rules
+    for status in STATUSES + ["KEEP"]:
+        assert rules_store.get_rules_by_status(status) == [r for r in rules if r.get("status") == status]
+    for i in range(6):
+        original = f"text {i}"
+        assert rules_store.get_rules_by_original(original) == [r for r in rules if r.get("original") == original]
+        file_path = f"src/F{i}.java"
+        assert rules_store.get_rules_by_file(file_path) == [r for r in rules if r["meta"].get("file") == file_path
+                                                              or r["context"].get("file") == file_path]
+    for rule in rules:
+        assert rules_store.get_rule(rule["id"]) is rule
+
+
+def test_rules_store_indexes_follow_mutations():
+    rules_store = RulesStore()
+    for i in range(30):
+        assert rules_store.add_rule(_rule(i))
+    assert not rules_store.add_rule(_rule(0))
+    _assert_indexes_match_scan(rules_store)
+
+    rule_id = _rule(4)["id"]
+    assert rules_store.update_rule(rule_id, {"status": "KEEP", "original": "text 5",
+                                             "meta": {"file": "src/F5.java"}})
+    assert rules_store.delete_rule(_rule(7)["id"])
+    assert not rules_store.delete_rule("missing")
+    assert rules_store.get_rule(_rule(7)["id"]) is None
+    _assert_indexes_match_scan(rules_store)
+    assert [r["id"] for r in rules_store.get_rules_by_status("KEEP")] == [rule_id]
+
+    rules_store.rules = [_rule(i) for i in range(10)]
+    _assert_indexes_match_scan(rules_store)
+
+
+def test_rules_store_indexes_detect_direct_edits():
+    rules_store = RulesStore()
+    for i in range(12):
+        assert rules_store.add_rule(_rule(i))
+    _assert_indexes_match_scan(rules_store)
+
+    # 绕过update_rule直接修改规则和规则列表
+    rules_store.rules[2]["status"] = "KEEP"
+    rules_store.rules[3]["original"] = "text 9"
+    rules_store.rules.append(_rule(40))
+    del rules_store.rules[0]
+    assert rules_store.get_rule(_rule(0)["id"]) is None
+    assert rules_store.get_rule(_rule(40)["id"]) is rules_store.rules[-1]
+
+    rules_store.rules[5]["status"] = "KEEP"
+    rules_store.refresh_indexes()
+    _assert_indexes_match_scan(rules_store)
+    assert rules_store.get_rules_by_original("text 9") == [rules_store.rules[2]]
+
+
+def test_rules_store_merge_import(tmp_path):
+    source_file = str(tmp_path / "source.yaml")
+    save_yaml_mappings([dict(_rule(i), translated=f"new {i}") for i in range(20, 40)], source_file,
+                       version_control=False)
+
+    rules_store = RulesStore()
+    rules_store.rules = [_rule(i, status="translated") for i in range(30)]
+    result = rules_store.import_rules(source_file)
+
+    assert (result["imported_count"], result["merged_count"]) == (10, 10)
+    assert len(rules_store) == 40
+    assert [r["id"] for r in rules_store.rules] == sorted(r["id"] for r in rules_store.rules)
+    merged = rules_store.get_rule(_rule(25)["id"])
+    assert merged["translated"] == "new 25" and merged["status"] == "translated"
+    _assert_indexes_match_scan(rules_store)
+
+
+
+def test_rule_fingerprint_is_canonical():
+    rule = dict(_rule(1), context={"node_type": "string_literal", "parent_types": ["argument_list", "block"]})
+    reordered = {key: rule[key] for key in reversed(list(rule))}
+    reordered["meta"] = {"line": 1, "file": "src/F1.java"}
+    assert rule_fingerprint(reordered) == rule_fingerprint(rule)
+    assert rule_fingerprint(dict(rule, created_at="2026-01-01")) == rule_fingerprint(rule)
+
+    for changed in (dict(rule, translated="其他"), dict(rule, status="KEEP"),
+                    dict(rule, context={"node_type": "string_literal", "parent_types": ["block"]}),
+                    dict(rule, meta={"file": "src/F1.java", "line": 2})):
+        assert rule_fingerprint(changed) != rule_fingerprint(rule)
+
+    rules_store = RulesStore()
+    rules_store.rules = [_rule(i) for i in range(5)]
+    assert rules_store.add_fingerprints() == 5
+    assert rules_store.rules[0]["fingerprint"] == rule_fingerprint(rules_store.rules[0])
+    rules_store.update_rule(rules_store.rules[0]["id"], {"translated": "新的翻译"})
+    assert rules_store.rules[0]["fingerprint"] == rule_fingerprint(rules_store.rules[0])
+
+
+def test_legacy_fingerprints_upgraded(tmp_path):
+    rules_file = str(tmp_path / "rules.yaml")
+    legacy = [dict(_rule(i), fingerprint="0123456789abcdef") for i in range(3)]
+    save_yaml_mappings(legacy, rules_file, version_control=False)
+
+    # 加载时升级旧格式的指纹，相同规则的指纹一致
+    rules_store = RulesStore()
+    assert rules_store.load_rules(rules_file)
+    assert all(rule["fingerprint"] == rule_fingerprint(rule) for rule in rules_store.rules)
+    assert all(rule["fingerprint"].startswith("b2:") for rule in rules_store.rules)
+
+    # add_fingerprints重新计算所有指纹，包括过期的指纹
+    rules_store.rules[0]["fingerprint"] = "0123456789abcdef"
+    rules_store.rules[1]["translated"] = "原地修改"
+    assert rules_store.add_fingerprints() == 2
+    assert all(rule["fingerprint"] == rule_fingerprint(rule) for rule in rules_store.rules)
+
+
+def test_rules_store_import_skips_unchanged_rules(tmp_path):
+    source_file = str(tmp_path / "source.yaml")
+    save_yaml_mappings([_rule(i) for i in range(10)] + [dict(_rule(10), translated="new")], source_file,
+                       version_control=False)
+
+    rules_store = RulesStore()
+    rules_store.rules = [dict(_rule(i), updated_at="old") for i in range(11)]
+    result = rules_store.import_rules(source_file)
+
+    assert (result["imported_count"], result["merged_count"], result["skipped_count"]) == (0, 1, 10)
+    assert [rule["updated_at"] == "old" for rule in rules_store.rules].count(True) == 10
+
+
+def test_rules_store_import_merges_changes_outside_fingerprint(tmp_path):
+    source_file = str(tmp_path / "source.yaml")
+    changed = _rule(0)
+    changed["context"] = dict(changed.get("context") or {}, enclosing_method="render")
+    save_yaml_mappings([changed], source_file, version_control=False)
+
+    rules_store = RulesStore()
+    rules_store.rules = [_rule(0)]
+    assert rule_fingerprint(changed) == rule_fingerprint(rules_store.rules[0])
+    result = rules_store.import_rules(source_file)
+
+    assert (result["merged_count"], result["skipped_count"]) == (1, 0)
+    assert rules_store.rules[0]["context"]["enclosing_method"] == "render"
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译记忆库测试
+
+测试去重写入、模糊匹配与逐条比较一致、并发写入，以及与智能建议生成器的集成
+"""
+
+import os
+import random
+import sys
+import threading
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.levenshtein_utils import get_fuzzy_suggestions
+from src.common.suggestion_generator import SuggestionGenerator
+from src.common.translation_memory import TranslationMemory
+
+ALPHABET = "abcde %{}$s\"'"
+
+
+def _random_text(rng):
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 14)))
+
+
+def _pairs(suggestions):
+    return [(suggestion["item"]["id"], suggestion["similarity"]) for suggestion in suggestions]
+
+
+def test_add_deduplicates_translations(tmp_path):
+    db_file = str(tmp_path / "tm.db")
+    mappings = [
+        {"id": "a", "original": "Start", "translated": "开始"},
+        {"id": "b", "original": "Start", "translated": "开始"},
+        {"id": "c", "original": "Start", "translated": "启动"},
+        {"id": "d", "original": "Stop", "translated": ""},
+        {"id": "e", "original": "OK", "translated": "OK"},
+    ]
+    with TranslationMemory(db_file) as memory:
+        assert memory.add(mappings) == 2
+        assert memory.add(mappings) == 0
+
+    with TranslationMemory(db_file) as memory:
+        assert len(memory) == 2
+        assert [entry["id"] for entry in memory.get_by_original("Start")] == ["a", "c"]
+        recorded = list(memory.record(iter([{"id": "f", "original": "Quit", "translated": "退出"}])))
+        assert recorded[0]["id"] == "f"
+        assert [entry["id"] for entry in memory.iter_entries()] == ["a", "c", "f"]
+
+
+def test_search_matches_linear_scan(tmp_path):
+    rng = random.Random(19)
+    with TranslationMemory(str(tmp_path / "tm.db")) as memory:
+        memory.add({"id": i, "original": _random_text(rng), "translated": f"译文{i % 5}"} for i in range(300))
+        entries = list(memory.iter_entries())
+        for fts_enabled in (True, False):
+            memory.fts_enabled = fts_enabled
+            for threshold in (0.0, 0.5, 0.8, 1.0):
+                for _ in range(30):
+                    query = _random_text(rng)
+                    expected = get_fuzzy_suggestions(query, entries, threshold)
+                    assert _pairs(memory.search(query, threshold)) == _pairs(expected)
+                    assert _pairs(memory.search(query, threshold, limit=3)) == _pairs(expected)[:3]
+
+
+def test_concurrent_writers(tmp_path):
+    db_file = str(tmp_path / "tm.db")
+    TranslationMemory(db_file).close()
+
+    def write(offset):
+        with TranslationMemory(db_file) as memory:
+            for start in range(0, 200, 20):
+                memory.add({"id": i, "original": f"text {i}", "translated": f"文本 {i}"}
+                           for i in range(offset + start, offset + start + 20))
+
+    threads = [threading.Thread(target=write, args=(offset,)) for offset in (0, 100, 100, 150)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with TranslationMemory(db_file) as memory:
+        assert len(memory) == 350
+
+
+def test_generator_queries_translation_memory(tmp_path):
+    db_file = str(tmp_path / "tm.db")
+    generator = SuggestionGenerator([{"id": "local", "original": "Open the door", "translated": "开门"}])
+    assert generator.save_localization_db(db_file)
+
+    generator = SuggestionGenerator()
+    assert generator.load_localization_db(db_file)
+    generator.add_to_localization_db([{"id": "new", "original": "Open the doors", "translated": "打开门"}])
+
+    suggestions = generator.generate_suggestions({"id": "q", "original": "Open the door"}, threshold=0.8)
+    assert [suggestion["item"]["id"] for suggestion in suggestions] == ["local", "new"]
+    assert len(generator.translation_memory) == 2
+    generator.translation_memory.close()
+
+
+def test_generator_keeps_memory_pairs_with_clashing_ids(tmp_path):
+    with TranslationMemory(str(tmp_path / "tm.db")) as memory:
+        memory.add([{"id": "r1", "original": "Open the door", "translated": "打开门"},
+                    {"id": "r1", "original": "Open the door", "translated": "开门"}])
+        generator = SuggestionGenerator([{"id": "r1", "original": "Open the door", "translated": "开门"}],
+                                        translation_memory=memory)
+        suggestions = generator.suggest_many([{"id": "q", "original": "Open the door"}], threshold=0.8, max_workers=1)
+        assert sorted(suggestion["item"]["translated"] for suggestion in suggestions["q"]) == ["开门", "打开门"]
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译回写引擎测试
+
+测试write_yaml_mapping复用提取阶段的字节范围、文件变化后重新解析以及dry-run差异输出
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python搜索路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import yaml
+
+import src.common.tree_sitter_utils as tree_sitter_utils
+import src.extend_mode.core as extend_core
+from src.common.tree_sitter_utils import extract_strings_from_file
+from src.common.yaml_utils import MappingRuleIndex, _apply_mappings_to_content, write_yaml_mapping
+
+SOURCE = '''public class Menu {
+    String start = "Start Game";
+    String exit = "Exit Game";
+}
+'''
+
+
+@pytest.fixture
+def source_setup(tmp_path):
+    source_file = tmp_path / "Menu.java"
+    source_file.write_text(SOURCE, encoding="utf-8")
+    strings = extract_strings_from_file(str(source_file), str(tmp_path))
+    rules = [
+        {"id": s["id"], "original": s["original"], "translated": f"[{s['original']}]", "status": "translated"}
+        for s in strings
+    ]
+    return source_file, strings, rules
+
+
+def test_write_reuses_extracted_byte_ranges(tmp_path, source_setup, monkeypatch):
+    source_file, strings, rules = source_setup
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("字节范围有效时不应重新解析")
+
+    monkeypatch.setattr(tree_sitter_utils, "extract_strings_with_source", fail_parse)
+    target_file = tmp_path / "out" / "Menu.java"
+    result = write_yaml_mapping(str(source_file), str(target_file), rules, source_strings=strings,
+                                root_dir=str(tmp_path))
+
+    assert result["status"] == "success"
+    assert result["replaced"] == 2
+    content = target_file.read_text(encoding="utf-8")
+    assert '"[Start Game]"' in content and '"[Exit Game]"' in content
+
+
+def test_write_reparses_when_file_changed(tmp_path, source_setup):
+    source_file, strings, rules = source_setup
+    # 字面量的行列位置不变，但字节偏移发生变化
+    source_file.write_text(SOURCE.replace("class Menu", "class MainMenu"), encoding="utf-8")
+
+    target_file = tmp_path / "Menu.out.java"
+    result = write_yaml_mapping(str(source_file), str(target_file), rules, source_strings=strings,
+                                root_dir=str(tmp_path))
+
+    assert result["status"] == "success"
+    content = target_file.read_text(encoding="utf-8")
+    assert content.startswith("public class MainMenu {")
+    assert '"[Start Game]"' in content and '"[Exit Game]"' in content
+
+
+def test_dry_run_returns_diff_without_writing(tmp_path, source_setup):
+    source_file, _, rules = source_setup
+    target_file = tmp_path / "Menu.out.java"
+
+    result = write_yaml_mapping(str(source_file), str(target_file), rules, root_dir=str(tmp_path), dry_run=True)
+
+    assert not target_file.exists()
+    assert '-    String start = "Start Game";' in result["diff"]
+    assert '+    String start = "[Start Game]";' in result["diff"]
+
+
+def test_apply_splices_in_one_pass_and_skips_overlaps():
+    content = b'a("one") b("two") c("three")'
+    strings = [
+        {"id": "k3", "original": "three", "literal": '"three"', "meta": {"start_byte": 20, "end_byte": 27, "line": 1}},
+        {"id": "k1", "original": "one", "literal": '"one"', "meta": {"start_byte": 2, "end_byte": 7, "line": 1}},
+        {"id": "k2", "original": "two", "literal": '"two"', "meta": {"start_byte": 11, "end_byte": 16, "line": 1}},
+        # 与"two"重叠的范围应被跳过
+        {"id": "k4", "original": "wo", "literal": '"wo"', "meta": {"start_byte": 13, "end_byte": 17, "line": 1}},
+    ]
+    mapping_dict = {key: {"translated": value} for key, value in
+                    [("k1", "一"), ("k2", "二"), ("k3", "三"), ("k4", "X")]}
+
+    result, replaced, unmapped = _apply_mappings_to_content("t.java", content, strings, mapping_dict)
+
+    assert result.decode("utf-8") == 'a("一") b("二") c("三")'
+    assert (replaced, unmapped) == (3, 0)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_rule_index_loaded_once_is_shared_across_files(tmp_path, monkeypatch, jobs):
+    mod_path = tmp_path / "Chinese" / "demo_mod"
+    (mod_path / "jar").mkdir(parents=True)
+    rules = []
+    for name in ("Menu", "Dialog"):
+        source_file = mod_path / "jar" / f"{name}.java"
+        source_file.write_text(SOURCE.replace("Menu", name), encoding="utf-8")
+        for s in extract_strings_from_file(str(source_file), str(mod_path)):
+            rules.append({"id": s["id"], "original": s["original"], "translated": f"<{s['original']}>",
+                          "status": "translated"})
+
+    rule_file = tmp_path / "rules.yaml"
+    rule_file.write_text(yaml.safe_dump({"mappings": rules}, allow_unicode=True), encoding="utf-8")
+    rule_index = MappingRuleIndex.from_paths(str(rule_file))
+    assert len(rule_index) == 4
+
+    def fail_load(*args, **kwargs):
+        raise AssertionError("映射规则不应按文件重复加载")
+
+    monkeypatch.setattr(extend_core, "_load_extend_rule_index", fail_load)
+    english_mod_path = tmp_path / "English" / "demo_mod"
+    summary = extend_core._process_mod_for_mapping(str(mod_path), str(english_mod_path), rule_index=rule_index,
+                                                   jobs=jobs)
+
+    assert (summary["total_count"], summary["success_count"], summary["fail_count"]) == (2, 2, 0)
+    assert sorted(f["replaced"] for f in summary["files"]) == [2, 2]
+
+    for name in ("Menu", "Dialog"):
+        content = (english_mod_path / "src" / f"{name}.java").read_text(encoding="utf-8")
+        assert '"<Start Game>"' in content and '"<Exit Game>"' in content
@@ -18,6 +18,7 @@ from src.common.yaml_utils import (
     save_yaml_mappings,
     generate_translation_rules,
     update_translation_rules,
+    merge_translation_rules,
     generate_translation_report,
     apply_yaml_mapping,
     RuleConflictDetector
@@ -149,6 +150,28 @@ class TestYAMLUtils(unittest.TestCase):
         rules = load_yaml_mappings(updated_rules)
         self.assertEqual(len(rules), 3)  # 应该有3条规则
         
+    def test_merge_translation_rules(self):
+        """测试规则合并的统计和输出顺序"""
+        existing_rules = [
+            {"id": "e1", "original": "Start Game", "translated": "开始", "status": "translated"},
+            {"id": "e2", "original": "Options", "translated": "", "status": "untranslated"},
+            {"id": "e3", "original": "Options", "translated": "选项", "status": "translated"},
+            {"id": "e4", "original": "", "translated": ""},
+        ]
+        english_mappings = [{"id": "n1", "original": "Start Game"}, {"id": "n2", "original": "Exit Game"},
+                            {"id": "n3"}]
+        chinese_mappings = [{"original": "开始游戏"}, {"original": "退出游戏"}, {"original": "无效"}]
+        
+        merged, stats = merge_translation_rules(existing_rules, english_mappings, chinese_mappings)
+        self.assertEqual(stats, {"new": 1, "updated": 1, "kept": 1, "removed": 2, "skipped": 1, "total": 3})
+        
+        merged = list(merged)
+        self.assertEqual([rule["id"] for rule in merged], ["e1", "n2", "e2"])
+        self.assertEqual(merged[0]["translated"], "开始游戏")
+        self.assertEqual(merged[1]["translated"], "退出游戏")
+        # 现有规则不被修改
+        self.assertEqual(existing_rules[0]["translated"], "开始")
+    
     def test_conflict_detection(self):
         """测试冲突检测功能"""
         # 创建有冲突的映射数据
@@ -217,6 +240,61 @@ class TestYAMLUtils(unittest.TestCase):
         self.assertEqual(len(resolved), 1)  # 应该只有1条规则
         self.assertEqual(resolved[0]["translated"], "启动游戏")  # 使用最新的翻译
     
+    def test_iter_conflicts_single_pass(self):
+        """测试一次遍历检测冲突，重复ID在遍历中即时返回"""
+        mappings = [
+            {"id": "a", "original": "Start", "translated": "开始"},
+            {"id": "b", "original": "Start", "translated": "启动"},
+            {"id": "a", "original": "Exit", "translated": "退出"},
+            {"id": "c", "original": "Exit"},
+        ]
+
+        consumed = []
+
+        def stream():
+            for mapping in mappings:
+                consumed.append(mapping)
+                yield mapping
+
+        conflicts = RuleConflictDetector.iter_conflicts(stream())
+        first = next(conflicts)
+        self.assertEqual(first["type"], "duplicate_id")
+        self.assertEqual(len(consumed), 3)
+
+        remaining = list(conflicts)
+        self.assertEqual([c["type"] for c in remaining],
+                         ["duplicate_original", "duplicate_original", "translation_conflict"])
+        self.assertEqual(remaining[2]["unique_translations"], ["开始", "启动"])
+
+        result = RuleConflictDetector.detect_all_conflicts(mappings)
+        self.assertEqual(result["conflict_summary"],
+                         {"duplicate_ids": 1, "duplicate_originals": 2, "translation_conflicts": 1})
+
+    def test_detect_file_conflicts_memoized(self):
+        """测试规则文件冲突检测结果按文件缓存，内存中的规则不使用缓存"""
+        rule_file = os.path.join(self.temp_dir, "rules_conflicts.yaml")
+        rules = [
+            {"id": "a", "original": "Start", "translated": "开始"},
+            {"id": "b", "original": "Start", "translated": "启动"},
+        ]
+        save_yaml_mappings(rules, rule_file, version_control=False)
+
+        conflicts = RuleConflictDetector.detect_file_conflicts(rule_file)
+        self.assertEqual(conflicts["total_conflicts"], 2)
+
+        # 缓存命中时返回副本，修改返回值不影响之后的调用
+        conflicts["duplicate_originals"].clear()
+        cached = RuleConflictDetector.detect_file_conflicts(rule_file)
+        self.assertEqual(cached["total_conflicts"], 2)
+        self.assertEqual(len(cached["duplicate_originals"]), 1)
+
+        # 传入与磁盘文件不同的规则时直接检测
+        self.assertEqual(RuleConflictDetector.detect_file_conflicts(rule_file, rules[:1])["total_conflicts"], 0)
+
+        # 内容变化后重新检测
+        save_yaml_mappings(rules[:1], rule_file, version_control=False)
+        self.assertEqual(RuleConflictDetector.detect_file_conflicts(rule_file)["total_conflicts"], 0)
+
     def test_generate_translation_report(self):
         """测试生成翻译报告"""
         # 生成测试规则
@@ -0,0 +1,85 @@
+import java.io.BufferedReader;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.nio.charset.StandardCharsets;
+import java.util.Collections;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+/**
+ * 常驻反编译进程
+ *
+ * 在同一个JVM中依次执行多个反编译任务，避免每个JAR都重新启动JVM和预热JIT。
+ * 协议：启动完成后在标准输出写入READY；之后每行读取一个制表符分隔的任务
+ * "反编译工具\tJAR路径\t输出目录\t额外类路径"，完成后写入OK或"ERROR\t错误信息"。
+ * 反编译工具自身的输出被重定向到标准错误，不会干扰协议。
+ *
+ * 使用Java 11+的单文件源码模式运行：
+ * java -cp cfr-0.152.jar:procyon-decompiler-0.6.0.jar DecompilerWorker.java
+ */
+public class DecompilerWorker {
+
+    public static void main(String[] args) throws Exception {
+        PrintStream protocol = new PrintStream(new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        System.setOut(System.err);
+
+        BufferedReader reader = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        protocol.println("READY");
+
+        String line;
+        while ((line = reader.readLine()) != null) {
+            if (line.isEmpty()) {
+                continue;
+            }
+            String[] fields = line.split("\t", -1);
+            try {
+                if (fields.length != 4) {
+                    throw new IllegalArgumentException("invalid request: " + line);
+                }
+                if ("cfr".equals(fields[0])) {
+                    decompileWithCfr(fields[1], fields[2], fields[3]);
+                } else if ("procyon".equals(fields[0])) {
+                    decompileWithProcyon(fields[1], fields[2]);
+                } else {
+                    throw new IllegalArgumentException("unsupported decompiler: " + fields[0]);
+                }
+                protocol.println("OK");
+            } catch (Throwable e) {
+                Throwable cause = e instanceof InvocationTargetException && e.getCause() != null ? e.getCause() : e;
+                protocol.println("ERROR\t" + String.valueOf(cause).replace('\r', ' ').replace('\n', ' '));
+            }
+        }
+    }
+
+    /**
+     * 通过CFR的CfrDriver API反编译，使用反射以便类路径中只有一个反编译工具时也能编译
+     */
+    private static void decompileWithCfr(String jarPath, String outputDir, String extraClasspath) throws Exception {
+        Map<String, String> options = new HashMap<>();
+        options.put("outputdir", outputDir);
+        if (!extraClasspath.isEmpty()) {
+            options.put("extraclasspath", extraClasspath);
+        }
+
+        Class<?> builderClass = Class.forName("org.benf.cfr.reader.api.CfrDriver$Builder");
+        Object builder = builderClass.getConstructor().newInstance();
+        builderClass.getMethod("withOptions", Map.class).invoke(builder, options);
+        Object driver = builderClass.getMethod("build").invoke(builder);
+        Class.forName("org.benf.cfr.reader.api.CfrDriver")
+                .getMethod("analyse", List.class)
+                .invoke(driver, Collections.singletonList(jarPath));
+    }
+
+    /**
+     * 调用Procyon的命令行入口反编译
+     */
+    private static void decompileWithProcyon(String jarPath, String outputDir) throws Exception {
+        Class.forName("com.strobel.decompiler.DecompilerDriver")
+                .getMethod("main", String[].class)
+                .invoke(null, (Object) new String[]{"-o", outputDir, jarPath});
+    }
+}